@@ -0,0 +1,35 @@
+import asyncio
+
+from pycardano import Address
+
+from bot.order_book_tracking import track_order_book_side
+from bot.order_management import update_open_positions, update_orders
+from bot.price import fetch_price
+from bot.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+async def collect_token_data(bot, token_name: str, token_info: dict, address: Address):
+    """
+    Fetch the price, both order book sides, the open positions and the orders
+    of a token concurrently.
+
+    The requests share the pooled MuesliSwap connector, so collecting the data
+    of a token takes roughly one round trip instead of one per request.
+    """
+    await asyncio.gather(
+        asyncio.to_thread(
+            fetch_price,
+            bot,
+            token_name,
+            token_info["policy_id"],
+            token_info["hexname"],
+        ),
+        asyncio.to_thread(track_order_book_side, bot, token_name, token_info, "Buy"),
+        asyncio.to_thread(track_order_book_side, bot, token_name, token_info, "Sell"),
+        asyncio.to_thread(update_open_positions, bot, address, token_name),
+        asyncio.to_thread(update_orders, bot, address, token_name),
+    )
+    logger.info(f"Collected market and order data for {token_name}.")
+
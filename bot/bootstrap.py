@@ -0,0 +1,30 @@
+import threading
+from typing import Dict, Optional
+
+from bot.chain_context import get_chain_context
+from bot.utils.logger import configure_logger, get_logger
+from bot.utils.utils import load_strategy_config
+
+logger = get_logger(__name__)
+
+_strategy_config: Optional[Dict] = None
+_bootstrap_lock = threading.Lock()
+
+
+def bootstrap() -> Dict:
+    """
+    Set up the bot's process once: configure logging, load the strategy
+    configuration and create the chain context.
+
+    Importing bot modules has no side effects, everything that touches the
+    filesystem or the network at startup happens here. Later calls return the
+    already loaded strategy configuration.
+    """
+    global _strategy_config
+    with _bootstrap_lock:
+        if _strategy_config is None:
+            configure_logger()
+            strategy_config = load_strategy_config()
+            get_chain_context()
+            _strategy_config = strategy_config
+        return _strategy_config
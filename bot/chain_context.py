@@ -0,0 +1,261 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Union
+
+import requests
+from pycardano import (
+    Address,
+    BlockFrostChainContext,
+    ChainContext,
+    GenesisParameters,
+    Network,
+    OgmiosChainContext,
+    ProtocolParameters,
+    Transaction,
+    UTxO,
+)
+
+from bot.utils.logger import get_logger
+from configs.config import (
+    CHAIN_BACKEND,
+    CHAIN_TIP_TTL,
+    KUPO_URL,
+    NETWORK,
+    OGMIOS_URL,
+    PROTOCOL_PARAMS_TTL,
+)
+from configs.msw_connector_config import HTTP_POOL_SIZE, HTTP_TIMEOUT
+
+logger = get_logger(__name__)
+
+
+class CachedChainContext(ChainContext):
+    """
+    Chain context that serves protocol parameters, genesis parameters and the
+    chain tip from memory.
+
+    The tip (slot and epoch) and the block height are queried at most once
+    every tip_ttl seconds and the slot is advanced by the elapsed time in
+    between. Block heights of confirmed transactions never change and are
+    kept for good. Protocol parameters
+    are refetched when the epoch changes or after params_ttl seconds, genesis
+    parameters only once. UTxO queries, submission and evaluation go straight
+    to the wrapped context, so building a transaction does no hidden requests.
+    """
+
+    def __init__(
+        self,
+        context: ChainContext,
+        tip_ttl: float = CHAIN_TIP_TTL,
+        params_ttl: float = PROTOCOL_PARAMS_TTL,
+    ):
+        self._context = context
+        self._tip_ttl = tip_ttl
+        self._params_ttl = params_ttl
+        self._lock = threading.RLock()
+        self._slot: Optional[int] = None
+        self._epoch: Optional[int] = None
+        self._tip_fetched_at = 0.0
+        self._protocol_param: Optional[ProtocolParameters] = None
+        self._protocol_param_epoch: Optional[int] = None
+        self._protocol_param_fetched_at = 0.0
+        self._genesis_param: Optional[GenesisParameters] = None
+        self._block_height: Optional[int] = None
+        self._block_height_fetched_at = 0.0
+        self._tx_heights: Dict[str, int] = {}
+
+    def __getattr__(self, name):
+        # Backend specific attributes, e.g. the Blockfrost api
+        if name == "_context":
+            raise AttributeError(name)
+        return getattr(self._context, name)
+
+    def _refresh_tip(self):
+        with self._lock:
+            if (
+                self._slot is not None
+                and time.time() - self._tip_fetched_at < self._tip_ttl
+            ):
+                return
+            self._slot = self._context.last_block_slot
+            self._epoch = self._context.epoch
+            self._tip_fetched_at = time.time()
+            logger.debug(f"Chain tip refreshed: slot {self._slot}, epoch {self._epoch}")
+
+    @property
+    def network(self) -> Network:
+        return self._context.network
+
+    @property
+    def epoch(self) -> int:
+        self._refresh_tip()
+        return self._epoch
+
+    @property
+    def last_block_slot(self) -> int:
+        self._refresh_tip()
+        with self._lock:
+            elapsed = time.time() - self._tip_fetched_at
+            return self._slot + int(elapsed / self.genesis_param.slot_length)
+
+    @property
+    def genesis_param(self) -> GenesisParameters:
+        with self._lock:
+            if self._genesis_param is None:
+                self._genesis_param = self._context.genesis_param
+            return self._genesis_param
+
+    @property
+    def protocol_param(self) -> ProtocolParameters:
+        epoch = self.epoch
+        with self._lock:
+            if (
+                self._protocol_param is None
+                or self._protocol_param_epoch != epoch
+                or time.time() - self._protocol_param_fetched_at > self._params_ttl
+            ):
+                logger.info(f"Fetching protocol parameters for epoch {epoch}.")
+                self._protocol_param = self._context.protocol_param
+                self._protocol_param_epoch = epoch
+                self._protocol_param_fetched_at = time.time()
+            return self._protocol_param
+
+    def slot_to_height(self, slot: int) -> int:
+        """
+        Approximate the block height of a slot from the active slots coefficient.
+        """
+        return int(slot * self.genesis_param.active_slots_coefficient)
+
+    def block_height(self) -> Optional[int]:
+        """
+        Height of the last block, approximated from its slot if the backend
+        cannot query heights. Served from memory for tip_ttl seconds.
+        """
+        with self._lock:
+            if (
+                self._block_height is None
+                or time.time() - self._block_height_fetched_at >= self._tip_ttl
+            ):
+                self._block_height = self._query_block_height()
+                self._block_height_fetched_at = time.time()
+            return self._block_height
+
+    def _query_block_height(self) -> Optional[int]:
+        if isinstance(self._context, BlockFrostChainContext):
+            return self._context.api.block_latest().height
+        if hasattr(self._context, "block_height"):
+            return self._context.block_height()
+        return self.slot_to_height(self.last_block_slot)
+
+    def tx_block_height(self, tx_hash: str) -> Optional[int]:
+        """
+        Height of the block that includes a transaction, None if unknown.
+        """
+        with self._lock:
+            if tx_hash in self._tx_heights:
+                return self._tx_heights[tx_hash]
+        height = self._query_tx_block_height(tx_hash)
+        if height is not None:
+            with self._lock:
+                self._tx_heights[tx_hash] = height
+        return height
+
+    def tx_block_heights(self, tx_hashes: Iterable[str]) -> Dict[str, Optional[int]]:
+        """
+        Heights of the blocks of several transactions, the ones not known yet
+        are queried concurrently. Failed queries give None.
+        """
+        tx_hashes = set(tx_hashes)
+        with self._lock:
+            heights = {
+                tx_hash: self._tx_heights[tx_hash]
+                for tx_hash in tx_hashes
+                if tx_hash in self._tx_heights
+            }
+        missing = list(tx_hashes - heights.keys())
+        if not missing:
+            return heights
+
+        def query(tx_hash: str) -> Optional[int]:
+            try:
+                return self.tx_block_height(tx_hash)
+            except Exception as e:
+                logger.warning(f"Failed to query the block height of {tx_hash}: {e}")
+                return None
+
+        with ThreadPoolExecutor(
+            max_workers=min(HTTP_POOL_SIZE, len(missing)), thread_name_prefix="height"
+        ) as executor:
+            heights.update(zip(missing, executor.map(query, missing)))
+        return heights
+
+    def _query_tx_block_height(self, tx_hash: str) -> Optional[int]:
+        if isinstance(self._context, BlockFrostChainContext):
+            return self._context.api.transaction(tx_hash).block_height
+        if hasattr(self._context, "tx_block_height"):
+            return self._context.tx_block_height(tx_hash)
+        if isinstance(self._context, OgmiosChainContext) and KUPO_URL:
+            # Kupo only knows the slot of the outputs of a transaction
+            response = requests.get(
+                f"{KUPO_URL}/matches/*@{tx_hash}", timeout=HTTP_TIMEOUT
+            )
+            response.raise_for_status()
+            slots = [match["created_at"]["slot_no"] for match in response.json()]
+            return self.slot_to_height(min(slots)) if slots else None
+        return None
+
+    def utxos(self, address: Union[str, Address]) -> List[UTxO]:
+        return self._context.utxos(address)
+
+    def _utxos(self, address: str) -> List[UTxO]:
+        return self._context.utxos(address)
+
+    def submit_tx(self, tx: Union[Transaction, bytes, str]):
+        return self._context.submit_tx(tx)
+
+    def submit_tx_cbor(self, cbor: Union[bytes, str]):
+        return self._context.submit_tx_cbor(cbor)
+
+    def evaluate_tx(self, tx: Transaction) -> dict:
+        return self._context.evaluate_tx(tx)
+
+    def evaluate_tx_cbor(self, cbor: Union[bytes, str]) -> dict:
+        return self._context.evaluate_tx_cbor(cbor)
+
+
+def create_chain_context(backend: str = CHAIN_BACKEND) -> ChainContext:
+    """
+    Create the chain context of the configured backend.
+    """
+    logger.info(f"Creating {backend} chain context.")
+    if backend == "blockfrost":
+        from configs.secret import blockfrost_project_id, blockfrost_base_url
+
+        return BlockFrostChainContext(
+            blockfrost_project_id, base_url=blockfrost_base_url
+        )
+    elif backend == "ogmios":
+        return OgmiosChainContext(OGMIOS_URL, NETWORK, kupo_url=KUPO_URL)
+    elif backend == "simulated":
+        from bot.simulated_ledger import SimulatedChainContext
+
+        return SimulatedChainContext(NETWORK)
+    else:
+        raise ValueError(f"Unknown chain backend: {backend}")
+
+
+_chain_context: Optional[CachedChainContext] = None
+_chain_context_lock = threading.Lock()
+
+
+def get_chain_context() -> CachedChainContext:
+    """
+    Return the shared caching chain context, creating the configured backend on
+    first use.
+    """
+    global _chain_context
+    with _chain_context_lock:
+        if _chain_context is None:
+            _chain_context = CachedChainContext(create_chain_context())
+        return _chain_context
@@ -1,42 +1,105 @@
-import requests
+import threading
 import time
+from typing import Dict, Optional
+
+import requests
 
 from configs.msw_connector_config import (
     MUESLISWAP_API_URL,
     MUESLISWAP_ONCHAIN_URL,
     HEALTH_CHECK_ENDPOINT,
+    HEALTH_CHECK_INTERVAL,
 )
+from bot.msw_connector import get_connector
 from bot.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+SERVICES = {
+    "API": MUESLISWAP_API_URL,
+    "Onchain": MUESLISWAP_ONCHAIN_URL,
+}
+
 
-def perform_health_check(loop_interval):
+class HealthMonitor:
     """
-    Perform a health check on the API & onchain and retry if one is unhealthy.
+    Probes the health endpoints of the API & onchain services in the background
+    and publishes the latest result.
+
+    The main loop only reads the cached state, so it never waits on a health
+    check and keeps running (e.g. cancelling stale orders) while a service is
+    degraded.
     """
-    urls = {
-        "API": f"{MUESLISWAP_API_URL}{HEALTH_CHECK_ENDPOINT}",
-        "Onchain": f"{MUESLISWAP_ONCHAIN_URL}{HEALTH_CHECK_ENDPOINT}",
-    }
-    for service, url in urls.items():
-        while True:
+
+    def __init__(self, interval: float = HEALTH_CHECK_INTERVAL):
+        self.interval = interval
+        self._status: Dict[str, Dict] = {
+            service: {"healthy": False, "last_checked": None}
+            for service in SERVICES
+        }
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """
+        Run a first check synchronously and start the background monitor.
+        """
+        self.check()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="health-monitor", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the background monitor.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def check(self):
+        """
+        Probe all services once and update the cached state.
+        """
+        connector = get_connector()
+        for service, base_url in SERVICES.items():
+            healthy = False
             try:
-                response = requests.get(url)
-                if response.status_code == 200:
-                    logger.info(
-                        f"{service} health check successful: {response.status_code}"
-                    )
-                    break
-                else:
+                response = connector.get(HEALTH_CHECK_ENDPOINT, base_url=base_url)
+                healthy = response.status_code == 200
+                if not healthy:
                     logger.warning(
-                        f"{service} health check failed with status: {response.status_code}. Retrying..."
+                        f"{service} health check failed with status: {response.status_code}."
                     )
-                    time.sleep(loop_interval)
             except requests.exceptions.RequestException as e:
-                logger.warning(f"{service} connection error: {e}. Retrying...")
-                time.sleep(loop_interval)
+                logger.warning(f"{service} connection error: {e}.")
             except Exception as e:
-                logger.warning(f"{service} unexpected error: {e}. Retrying...")
-                retry_count += 1
-                time.sleep(loop_interval)
+                logger.warning(f"{service} unexpected error: {e}.")
+            with self._lock:
+                previous = self._status[service]["healthy"]
+                self._status[service] = {"healthy": healthy, "last_checked": time.time()}
+            if healthy and not previous:
+                logger.info(f"{service} health check successful.")
+
+    def is_healthy(self, service: Optional[str] = None) -> bool:
+        """
+        Return whether the given service, or all services, are healthy.
+        """
+        with self._lock:
+            if service is not None:
+                return self._status[service]["healthy"]
+            return all(status["healthy"] for status in self._status.values())
+
+    def status(self) -> Dict[str, Dict]:
+        """
+        Return the health and last-checked timestamp of every service.
+        """
+        with self._lock:
+            return {service: dict(status) for service, status in self._status.items()}
@@ -1,15 +1,119 @@
 import json
 from datetime import datetime
-from typing import Dict
+from functools import partial
+from pathlib import Path
+from typing import Dict, Iterator, Optional
 import os
 
 from pycardano import ScriptHash, AssetName, Address
+from bot.utils.file_utils import atomic_write
 from bot.utils.logger import get_logger
-from configs.config import CONTEXT, INVENTORY_DIR
+from bot.utxo_cache import get_utxo_cache
+from configs.config import (
+    INVENTORY_DIR,
+    INVENTORY_LOG_FILE,
+    INVENTORY_LATEST_FILE,
+    STORAGE_BACKEND,
+)
 
 logger = get_logger(__name__)
 
 
+class InventoryLog:
+    """
+    Append-only JSONL log of the inventory of a token.
+
+    The last record is kept in memory and in a small sidecar file, so checking
+    for changes and appending a record cost the same no matter how long the
+    log is. A legacy `{token}_inventory.json` (newest first) is migrated once.
+    """
+
+    def __init__(self, path: Path, latest_path: Path, legacy_path: Optional[Path] = None):
+        self.path = path
+        self.latest_path = latest_path
+        self.latest: Optional[Dict] = None
+        if legacy_path is not None and not path.exists() and legacy_path.exists():
+            self._migrate(legacy_path)
+        self._load_latest()
+
+    def _migrate(self, legacy_path: Path):
+        with open(legacy_path, "r") as file:
+            records = json.load(file)
+        # The sidecar goes first, the log only exists once it is complete
+        if records:
+            self._write_latest(records[0])
+        atomic_write(
+            self.path,
+            lambda file: file.writelines(
+                json.dumps(record) + "\n" for record in reversed(records)
+            ),
+        )
+        logger.info(f"Migrated {len(records)} inventory records to {self.path.name}.")
+
+    def _load_latest(self):
+        try:
+            with open(self.latest_path, "r") as file:
+                self.latest = json.load(file)
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            logger.error(f"Invalid inventory sidecar {self.latest_path}: {e}")
+
+    def _write_latest(self, record: Dict):
+        atomic_write(self.latest_path, lambda file: json.dump(record, file))
+        self.latest = record
+
+    def append(self, record: Dict):
+        """
+        Append a record and make it the latest one.
+        """
+        with open(self.path, "a") as file:
+            file.write(json.dumps(record) + "\n")
+        self._write_latest(record)
+
+    def read(self, since: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Stream the logged records, oldest first, optionally only those logged
+        at or after the ISO timestamp since.
+        """
+        try:
+            with open(self.path, "r") as file:
+                for line in file:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    if since is None or record["timestamp"] >= since:
+                        yield record
+        except FileNotFoundError:
+            return
+
+
+def get_inventory_log(bot, token_name: str) -> InventoryLog:
+    """
+    Return the inventory log of a token, opening it on first use.
+    """
+    state = bot.token_states[token_name]
+    if state.inventory_log is not None:
+        return state.inventory_log
+    json_inventory_log = partial(
+        InventoryLog,
+        INVENTORY_DIR.joinpath(f"{token_name}_{INVENTORY_LOG_FILE}"),
+        INVENTORY_DIR.joinpath(f"{token_name}_{INVENTORY_LATEST_FILE}"),
+        INVENTORY_DIR.joinpath(f"{token_name}_inventory.json"),
+    )
+    if STORAGE_BACKEND == "sqlite":
+        from bot.sqlite_store import SqliteInventoryLog, get_sqlite_store
+
+        # The JSONL log is only opened to import it, once per token
+        state.inventory_log = SqliteInventoryLog(
+            get_sqlite_store(), token_name, legacy_log=json_inventory_log
+        )
+    else:
+        os.makedirs(INVENTORY_DIR, exist_ok=True)
+        state.inventory_log = json_inventory_log()
+    return state.inventory_log
+
+
 def update_inventory(bot, token_name: str, token_info: Dict, address: Address):
     """
     Checks and updates the bot's inventory for a specific token and address.
@@ -17,7 +121,7 @@ def update_inventory(bot, token_name: str, token_info: Dict, address: Address):
     policy_id, hexname = token_info["policy_id"], token_info["hexname"]
     try:
         logger.info(f"Querying UTXOs for {token_name} wallet.")
-        utxos = CONTEXT.utxos(address)
+        utxos = get_utxo_cache().utxos(address)
         total_lovelace = 0
         total_tokens = 0
         token_pid_script_hash = ScriptHash(bytes.fromhex(policy_id))
@@ -36,7 +140,10 @@ def update_inventory(bot, token_name: str, token_info: Dict, address: Address):
 
         total_lovelace_open_orders = 0
         total_tokens_open_orders = 0
-        for order in bot.open_orders:
+        open_orders = bot.order_history.get_orders(
+            address, "open", (policy_id, hexname)
+        )
+        for order in open_orders:
             if (
                 order["fromToken"]["address"]["policyId"] == ""
                 and order["fromToken"]["address"]["name"] == ""
@@ -60,36 +167,21 @@ def update_inventory(bot, token_name: str, token_info: Dict, address: Address):
             total_tokens,
         )
 
-        os.makedirs(INVENTORY_DIR, exist_ok=True)
-        inventory_file_name = INVENTORY_DIR.joinpath(f"{token_name}_inventory.json")
-
-        if os.path.exists(inventory_file_name):
-            with open(inventory_file_name, "r") as file:
-                data = json.load(file)
-                if data and data[0]["inventory"] == inventory_data:
-                    logger.info("No changes in inventory, skipping log entry.")
-                    return
+        inventory_log = get_inventory_log(bot, token_name)
+        latest = inventory_log.latest
+        if latest and latest["inventory"] == inventory_data:
+            logger.info("No changes in inventory, skipping log entry.")
+            return
 
         inventory_record = {
             "timestamp": datetime.now().isoformat(),
             "address": str(address),
             "inventory": inventory_data,
         }
-        with open(inventory_file_name, "r+") as file:
-            data.insert(0, inventory_record)
-            file.seek(0)
-            json.dump(data, file, indent=4)
-            file.truncate()
+        inventory_log.append(inventory_record)
 
         logger.info(f"Inventory updated and saved: {inventory_record}")
 
-    except FileNotFoundError:
-        with open(inventory_file_name, "w") as file:
-            json.dump([inventory_record], file, indent=4)
-            logger.info(
-                f"Inventory file created and first entry saved: {inventory_record}"
-            )
-
     except Exception as e:
         logger.exception(f"Inventory check error: {e}")
         raise
@@ -98,11 +190,9 @@ def update_inventory(bot, token_name: str, token_info: Dict, address: Address):
 def calculate_inventory(bot, token_name, token_info, total_lovelace, total_tokens):
     """Calculates the total value of the inventory in Lovelace."""
     try:
-        if (
-            token_name in bot.price_data
-            and bot.price_data[token_name].get("price") is not None
-        ):
-            price = bot.price_data[token_name]["price"]
+        price_data = bot.token_states[token_name].price_data
+        if price_data and price_data.get("price") is not None:
+            price = price_data["price"]
             if "decimals" in token_info:
                 total = int(
                     total_lovelace
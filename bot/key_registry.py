@@ -0,0 +1,88 @@
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from pycardano import (
+    Address,
+    PaymentSigningKey,
+    PaymentVerificationKey,
+    PlutusV2Script,
+)
+
+from bot.utils.logger import get_logger
+from bot.utils.transaction_utils import get_script
+from bot.utils.utils import get_signing_info
+
+logger = get_logger(__name__)
+
+SigningInfo = Tuple[PaymentVerificationKey, PaymentSigningKey, Address]
+
+CANCEL_SCRIPT = "script.cbor"
+
+
+class KeyRegistry:
+    """
+    In-memory registry of the wallets' signing material and the contract
+    scripts.
+
+    Keys and scripts are read from disk once, either at startup via load() or
+    on first use, so building transactions does no file I/O. reload() rereads
+    everything that is registered, e.g. after a key rotation.
+    """
+
+    def __init__(self):
+        self._signing_info: Dict[str, SigningInfo] = {}
+        self._scripts: Dict[str, PlutusV2Script] = {}
+        self._lock = threading.RLock()
+
+    def load(self, key_paths: Iterable, scripts: Iterable[str] = (CANCEL_SCRIPT,)):
+        """
+        Load the signing info of the wallets and the scripts.
+        """
+        with self._lock:
+            for key_path in key_paths:
+                self._signing_info[str(key_path)] = get_signing_info(key_path)
+            for name in scripts:
+                self._scripts[name] = get_script(name)
+        logger.info(
+            f"Loaded {len(self._signing_info)} wallets and {len(self._scripts)} scripts."
+        )
+
+    def reload(self):
+        """
+        Reread all registered signing keys and scripts from disk.
+        """
+        with self._lock:
+            self.load(list(self._signing_info), list(self._scripts))
+
+    def signing_info(self, key_path) -> SigningInfo:
+        """
+        Return the (verification key, signing key, address) of a wallet.
+        """
+        with self._lock:
+            if str(key_path) not in self._signing_info:
+                self._signing_info[str(key_path)] = get_signing_info(key_path)
+            return self._signing_info[str(key_path)]
+
+    def script(self, name: str = CANCEL_SCRIPT) -> PlutusV2Script:
+        """
+        Return a decoded contract script.
+        """
+        with self._lock:
+            if name not in self._scripts:
+                self._scripts[name] = get_script(name)
+            return self._scripts[name]
+
+
+_key_registry: Optional[KeyRegistry] = None
+_key_registry_lock = threading.Lock()
+
+
+def get_key_registry() -> KeyRegistry:
+    """
+    Return the shared key registry, creating it on first use.
+    """
+    global _key_registry
+    with _key_registry_lock:
+        if _key_registry is None:
+            _key_registry = KeyRegistry()
+        return _key_registry
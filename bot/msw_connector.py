@@ -0,0 +1,140 @@
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from configs.msw_connector_config import (
+    MUESLISWAP_API_URL,
+    HTTP_POOL_SIZE,
+    HTTP_TIMEOUT,
+    HTTP_MAX_RETRIES,
+    HTTP_BACKOFF_FACTOR,
+    HTTP_RETRY_STATUS_CODES,
+)
+from bot.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class EndpointStats:
+    """
+    Latency counters of a single API endpoint.
+    """
+
+    __slots__ = ("requests", "errors", "total_latency", "max_latency")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def record(self, latency: float, error: bool):
+        self.requests += 1
+        self.errors += int(error)
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+    def to_dict(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "avg_latency": (
+                self.total_latency / self.requests if self.requests else 0.0
+            ),
+            "max_latency": self.max_latency,
+        }
+
+
+class MuesliSwapConnector:
+    """
+    Shared HTTP client for the MuesliSwap API & onchain services.
+
+    Connections are kept alive in a pool and reused by all tokens. Every request
+    has a timeout and is retried with exponential backoff on connection errors
+    and retryable status codes.
+    """
+
+    def __init__(self):
+        self.session = requests.Session()
+        retry = Retry(
+            total=HTTP_MAX_RETRIES,
+            backoff_factor=HTTP_BACKOFF_FACTOR,
+            status_forcelist=HTTP_RETRY_STATUS_CODES,
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_POOL_SIZE,
+            pool_maxsize=HTTP_POOL_SIZE,
+            max_retries=retry,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(
+            {"Accept": "application/json", "Accept-Encoding": "gzip, deflate"}
+        )
+        self._stats: Dict[str, EndpointStats] = {}
+        self._stats_lock = threading.Lock()
+
+    def get(
+        self,
+        endpoint: str,
+        query: str = "",
+        base_url: str = MUESLISWAP_API_URL,
+    ) -> requests.Response:
+        """
+        Send a GET request to the endpoint and record its latency.
+        """
+        start = time.perf_counter()
+        error = True
+        try:
+            response = self.session.get(
+                f"{base_url}{endpoint}{query}", timeout=HTTP_TIMEOUT
+            )
+            error = not response.ok
+            return response
+        finally:
+            self._record(endpoint, time.perf_counter() - start, error)
+
+    def _record(self, endpoint: str, latency: float, error: bool):
+        with self._stats_lock:
+            self._stats.setdefault(endpoint, EndpointStats()).record(latency, error)
+
+    def latency_stats(self) -> Dict[str, Dict]:
+        """
+        Return the latency counters per endpoint.
+        """
+        with self._stats_lock:
+            return {
+                endpoint: stats.to_dict() for endpoint, stats in self._stats.items()
+            }
+
+    def log_latency_stats(self):
+        """
+        Log the latency counters per endpoint.
+        """
+        for endpoint, stats in self.latency_stats().items():
+            logger.info(
+                f"{endpoint}: {stats['requests']} requests, {stats['errors']} errors, "
+                f"avg {stats['avg_latency'] * 1000:.0f} ms, "
+                f"max {stats['max_latency'] * 1000:.0f} ms"
+            )
+
+
+_connector: Optional[MuesliSwapConnector] = None
+_connector_lock = threading.Lock()
+
+
+def get_connector() -> MuesliSwapConnector:
+    """
+    Return the shared connector, creating it on first use.
+    """
+    global _connector
+    with _connector_lock:
+        if _connector is None:
+            _connector = MuesliSwapConnector()
+        return _connector
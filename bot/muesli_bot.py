@@ -1,16 +1,28 @@
+import asyncio
 import time
-from bot.health_check import perform_health_check
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from bot.async_collector import collect_token_data
+from bot.chain_context import get_chain_context
+from bot.health_check import HealthMonitor
 from bot.inventory_management import update_inventory
+from bot.key_registry import get_key_registry
+from bot.msw_connector import get_connector
+from bot.order_history import OrderHistoryService
 from bot.order_book_tracking import track_order_book, init_order_book
 from bot.order_management import (
     update_open_positions,
     update_orders,
     init_order_tracking,
     sync_order_tracking,
+    flush_order_tracking,
 )
 from bot.strategy import apply_strategy, init_strategy
+from bot.token_state import TokenState
+from bot.utxo_cache import get_utxo_cache
 from bot.utils.logger import get_logger
-from configs.config import KEYS_DIR, KEY_PREFIX
+from configs.config import CHAIN_BACKEND, KEYS_DIR, KEY_PREFIX
+from configs.msw_connector_config import HTTP_POOL_SIZE
 
 from bot.utils.utils import get_address
 from bot.price import init_price_data
@@ -18,6 +30,16 @@ from bot.price import init_price_data
 logger = get_logger(__name__)
 
 
+def init_token_state(token_name: str, token_info: dict, strategy_config: dict):
+    """
+    Create the state container of a token, resolving its wallet once.
+    """
+    key_path = KEYS_DIR.joinpath(f"{KEY_PREFIX}{token_name}")
+    address = get_address(key_path, token_name)
+    strategy = init_strategy(strategy_config)
+    return TokenState(token_name, token_info, key_path, address, strategy)
+
+
 class MuesliMarketMaker:
     """
     Main Trading Bot class.
@@ -25,43 +47,154 @@ class MuesliMarketMaker:
 
     def __init__(self, strategy_config: dict):
         self.inventory = {}
-        self.open_positions = {}
-        self.open_orders = {}
-        self.matched_orders = {}
-        self.canceled_orders = {}
         self.strategy_config = strategy_config
-        self.strategy = init_strategy(strategy_config)
         self.tokens = strategy_config["tokens"]
+        self.max_parallel_tokens = max(
+            1, int(strategy_config.get("max_parallel_tokens", 1))
+        )
+        self.token_states = {
+            token_name: init_token_state(token_name, token_info, strategy_config)
+            for token_name, token_info in self.tokens.items()
+        }
+        get_key_registry().load(state.key_path for state in self.token_states.values())
+        if CHAIN_BACKEND == "simulated":
+            from bot.simulated_ledger import fund_simulated_wallets
+
+            fund_simulated_wallets(self, get_chain_context())
+        self.order_history = OrderHistoryService()
+        self.health_monitor = HealthMonitor()
+        self.health_monitor.start()
         init_order_book(self)
         init_price_data(self)
         init_order_tracking(self)
 
+    def log_health(self):
+        """
+        Warn if a service is unhealthy, new orders are held back until it recovers.
+        """
+        if not self.health_monitor.is_healthy():
+            logger.warning(
+                f"Services degraded, only canceling orders: {self.health_monitor.status()}"
+            )
+
+    def process_token(self, token_name: str, token_info: dict):
+        """
+        Run one cycle of the bot for a single token.
+        """
+        state = self.token_states[token_name]
+        key_path, address = state.key_path, state.address
+        try:
+            logger.info(f"Processing token: {token_name}")
+
+            self.log_health()
+            update_inventory(self, token_name, token_info, address)
+            track_order_book(self, token_name, token_info)
+            update_open_positions(self, address, token_name)
+            update_orders(self, address, token_name)
+            sync_order_tracking(self, token_name)
+            apply_strategy(
+                self,
+                token_name,
+                token_info,
+                address,
+                key_path,
+            )
+        except Exception as e:
+            logger.exception(f"Error in main loop for {token_name}: {repr(e)}")
+        finally:
+            self.flush_token(token_name)
+
+    def flush_token(self, token_name: str):
+        """
+        Write the order tracking changed during the token step to disk.
+        """
+        try:
+            flush_order_tracking(self, token_name)
+        except Exception as e:
+            logger.exception(f"Failed to save order tracking for {token_name}: {e}")
+
     def run_main_loop(self):
         """
         Run the main loop of the bot.
+
+        Tokens are processed concurrently by up to `max_parallel_tokens` workers,
+        so a cycle takes as long as the slowest token instead of the sum of all.
         """
-        logger.info("Starting the main loop of the trading bot.")
+        logger.info(
+            f"Starting the main loop of the trading bot "
+            f"with {self.max_parallel_tokens} parallel worker(s)."
+        )
+        with ThreadPoolExecutor(
+            max_workers=self.max_parallel_tokens, thread_name_prefix="token"
+        ) as executor:
+            while True:
+                self.order_history.new_cycle()
+                get_utxo_cache().new_cycle()
+                futures = [
+                    executor.submit(self.process_token, token_name, token_info)
+                    for token_name, token_info in self.tokens.items()
+                ]
+                wait(futures)
+                get_connector().log_latency_stats()
+                time.sleep(self.strategy_config["loop_interval"])
+
+    async def process_token_async(self, token_name: str, token_info: dict):
+        """
+        Run one cycle of the bot for a single token, fetching all API data
+        of the token concurrently.
+        """
+        state = self.token_states[token_name]
+        key_path, address = state.key_path, state.address
+        try:
+            logger.info(f"Processing token: {token_name}")
+
+            self.log_health()
+            await collect_token_data(self, token_name, token_info, address)
+            await asyncio.to_thread(
+                update_inventory, self, token_name, token_info, address
+            )
+            await asyncio.to_thread(sync_order_tracking, self, token_name)
+            await asyncio.to_thread(
+                apply_strategy,
+                self,
+                token_name,
+                token_info,
+                address,
+                key_path,
+            )
+        except Exception as e:
+            logger.exception(f"Error in main loop for {token_name}: {repr(e)}")
+        finally:
+            await asyncio.to_thread(self.flush_token, token_name)
+
+    async def run_main_loop_async(self):
+        """
+        Run the main loop of the bot on asyncio.
+
+        Up to `max_parallel_tokens` tokens are processed at once and the API
+        requests of each token are fanned out concurrently.
+        """
+        logger.info(
+            f"Starting the async main loop of the trading bot "
+            f"with {self.max_parallel_tokens} parallel token(s)."
+        )
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=HTTP_POOL_SIZE, thread_name_prefix="io")
+        )
+        semaphore = asyncio.Semaphore(self.max_parallel_tokens)
+
+        async def process(token_name: str, token_info: dict):
+            async with semaphore:
+                await self.process_token_async(token_name, token_info)
+
         while True:
-            for token_name, token_info in self.tokens.items():
-                try:
-                    key_path = KEYS_DIR.joinpath(f"{KEY_PREFIX}{token_name}")
-                    address = get_address(key_path, token_name)
-                    logger.info(f"Processing token: {token_name}")
-
-                    perform_health_check(self.strategy_config["loop_interval"])
-                    update_inventory(self, token_name, token_info, address)
-                    track_order_book(self, token_name, token_info)
-                    update_open_positions(self, address)
-                    update_orders(self, address, token_name)
-                    sync_order_tracking(self, token_name)
-                    apply_strategy(
-                        self,
-                        token_name,
-                        token_info,
-                        address,
-                        key_path,
-                    )
-                except Exception as e:
-                    logger.exception(f"Error in main loop for {token_name}: {repr(e)}")
-                    continue
-            time.sleep(self.strategy_config["loop_interval"])
+            self.order_history.new_cycle()
+            get_utxo_cache().new_cycle()
+            await asyncio.gather(
+                *(
+                    process(token_name, token_info)
+                    for token_name, token_info in self.tokens.items()
+                )
+            )
+            get_connector().log_latency_stats()
+            await asyncio.sleep(self.strategy_config["loop_interval"])
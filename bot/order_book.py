@@ -0,0 +1,320 @@
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from configs.msw_connector_config import BASE_TOKEN_DECIMALS
+from bot.utils.order_utils import get_order_type
+
+# Fields of the entries of the /orderbook response
+ORDER_BOOK_PRICE_KEY = "price"  # ADA per token
+ORDER_BOOK_AMOUNT_KEY = "amount"  # Token amount including decimals
+ORDER_BOOK_EVENTS_MAXLEN = 10000  # Undrained events kept per token
+ORDER_BOOK_PRICE_TOLERANCE = 1  # Lovelace an own order's price may be off its level
+
+
+def order_book_price(order: Dict, decimals: int) -> int:
+    """
+    Price of an order in lovelace per whole token, rounded like the levels of
+    the order book.
+    """
+    if get_order_type(order) == "buy":
+        lovelace, tokens = int(order["fromAmount"]), int(order["toAmount"])
+    else:
+        lovelace, tokens = int(order["toAmount"]), int(order["fromAmount"])
+    return int(np.rint(lovelace * 10**decimals / tokens))
+
+
+class OrderBookSide:
+    """
+    One side of the order book as sorted NumPy arrays, best level first.
+
+    Prices are in lovelace per token like the strategy prices, amounts are
+    token amounts including decimals. Entries with the same price are merged
+    into one level.
+    """
+
+    __slots__ = ("side", "prices", "amounts", "cumulative")
+
+    def __init__(self, side: str, prices: np.ndarray, amounts: np.ndarray):
+        self.side = side
+        # Bids are sorted by descending, asks by ascending price
+        order = np.argsort(-prices if side == "Buy" else prices, kind="stable")
+        self.prices = prices[order]
+        self.amounts = amounts[order]
+        self.cumulative = np.cumsum(self.amounts)
+
+    @classmethod
+    def from_orders(cls, side: str, orders: List[Dict]) -> "OrderBookSide":
+        """
+        Build a side from the raw entries of the /orderbook response.
+        """
+        if not orders:
+            return cls(side, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+        raw_prices = np.fromiter(
+            (float(order[ORDER_BOOK_PRICE_KEY]) for order in orders),
+            dtype=np.float64,
+            count=len(orders),
+        )
+        raw_amounts = np.fromiter(
+            (float(order[ORDER_BOOK_AMOUNT_KEY]) for order in orders),
+            dtype=np.float64,
+            count=len(orders),
+        )
+        prices = np.rint(raw_prices * 10**BASE_TOKEN_DECIMALS).astype(np.int64)
+        # Merge entries of the same price level
+        levels, inverse = np.unique(prices, return_inverse=True)
+        amounts = np.bincount(inverse, weights=raw_amounts).astype(np.int64)
+        return cls(side, levels, amounts)
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def best(self) -> Optional[int]:
+        """
+        Best price of the side, None if the side is empty.
+        """
+        return int(self.prices[0]) if len(self.prices) else None
+
+    def depth(self, pct: float, reference: Optional[float] = None) -> int:
+        """
+        Total amount within pct (e.g. 0.02 for 2%) of the reference price,
+        which defaults to the best price of the side.
+        """
+        if reference is None:
+            reference = self.best()
+        if reference is None:
+            return 0
+        if self.side == "Buy":
+            mask = self.prices >= reference * (1 - pct)
+        else:
+            mask = self.prices <= reference * (1 + pct)
+        return int(self.amounts[mask].sum())
+
+    def volume_curve(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Prices and the cumulative amount available up to each price.
+        """
+        return self.prices, self.cumulative
+
+    def vwap(self, size: int) -> Optional[float]:
+        """
+        Volume weighted average price to fill size, None if the side is not
+        deep enough.
+        """
+        if size <= 0 or not len(self.prices) or self.cumulative[-1] < size:
+            return None
+        # Index of the level that completes the fill
+        last = int(np.searchsorted(self.cumulative, size))
+        filled = self.amounts[: last + 1].copy()
+        filled[last] -= self.cumulative[last] - size
+        return float(np.dot(self.prices[: last + 1], filled) / size)
+
+    def level_index(self, price: int) -> Optional[int]:
+        """
+        Index of the level within ORDER_BOOK_PRICE_TOLERANCE of price, None
+        if there is none.
+        """
+        if not len(self.prices):
+            return None
+        # Levels are looked up on ascending prices
+        ascending = self.prices[::-1] if self.side == "Buy" else self.prices
+        idx = int(np.searchsorted(ascending, price))
+        candidates = [i for i in (idx - 1, idx) if 0 <= i < len(ascending)]
+        nearest = min(candidates, key=lambda i: abs(int(ascending[i]) - price))
+        if abs(int(ascending[nearest]) - price) > ORDER_BOOK_PRICE_TOLERANCE:
+            return None
+        return len(ascending) - 1 - nearest if self.side == "Buy" else nearest
+
+    def own_amounts(self, own_orders: List[Dict], decimals: int) -> np.ndarray:
+        """
+        Amount of the bot's own orders of this side at each level, decimals
+        being the token's.
+        """
+        own = np.zeros(len(self.prices), dtype=np.int64)
+        side = "buy" if self.side == "Buy" else "sell"
+        for order in own_orders:
+            if get_order_type(order) != side:
+                continue
+            idx = self.level_index(order_book_price(order, decimals))
+            if idx is not None:
+                amount = order["toAmount"] if side == "buy" else order["fromAmount"]
+                own[idx] += int(amount)
+        return own
+
+    def own_share(self, own_orders: List[Dict], decimals: int) -> np.ndarray:
+        """
+        Share of the bot's own orders in the amount of each level.
+        """
+        own = self.own_amounts(own_orders, decimals)
+        return np.divide(
+            own,
+            self.amounts,
+            out=np.zeros(len(self.amounts), dtype=np.float64),
+            where=self.amounts > 0,
+        )
+
+
+class OrderBookEvent:
+    """
+    Change of a single price level between two order book snapshots.
+
+    kind is "added", "removed" or "changed", delta the change of the amount.
+    """
+
+    __slots__ = ("side", "kind", "price", "amount", "delta")
+
+    def __init__(self, side: str, kind: str, price: int, amount: int, delta: int):
+        self.side = side
+        self.kind = kind
+        self.price = price
+        self.amount = amount
+        self.delta = delta
+
+    def __repr__(self) -> str:
+        return (
+            f"OrderBookEvent({self.side} {self.kind} {self.price}: "
+            f"{self.amount} ({self.delta:+d}))"
+        )
+
+
+def diff_sides(old: OrderBookSide, new: OrderBookSide) -> List[OrderBookEvent]:
+    """
+    Per level differences between two snapshots of the same side.
+    """
+    old_prices, old_idx = np.unique(old.prices, return_index=True)
+    new_prices, new_idx = np.unique(new.prices, return_index=True)
+    old_amounts, new_amounts = old.amounts[old_idx], new.amounts[new_idx]
+
+    common, in_old, in_new = np.intersect1d(
+        old_prices, new_prices, assume_unique=True, return_indices=True
+    )
+    changed = old_amounts[in_old] != new_amounts[in_new]
+    added = ~np.isin(new_prices, common, assume_unique=True)
+    removed = ~np.isin(old_prices, common, assume_unique=True)
+
+    events = [
+        OrderBookEvent(new.side, "added", int(price), int(amount), int(amount))
+        for price, amount in zip(new_prices[added], new_amounts[added])
+    ]
+    events += [
+        OrderBookEvent(new.side, "removed", int(price), 0, -int(amount))
+        for price, amount in zip(old_prices[removed], old_amounts[removed])
+    ]
+    events += [
+        OrderBookEvent(new.side, "changed", int(price), int(amount), int(amount - before))
+        for price, amount, before in zip(
+            common[changed], new_amounts[in_new][changed], old_amounts[in_old][changed]
+        )
+    ]
+    return events
+
+
+def own_level_events(
+    events: List[OrderBookEvent], own_orders: List[Dict], decimals: int
+) -> List[OrderBookEvent]:
+    """
+    Events that shrank a level holding one of the bot's own orders, i.e.
+    candidate (partial) fills of own orders.
+    """
+    own_levels: Dict[str, List[int]] = {"Buy": [], "Sell": []}
+    for order in own_orders:
+        side = "Buy" if get_order_type(order) == "buy" else "Sell"
+        own_levels[side].append(order_book_price(order, decimals))
+    return [
+        event
+        for event in events
+        if event.delta < 0
+        and any(
+            abs(event.price - price) <= ORDER_BOOK_PRICE_TOLERANCE
+            for price in own_levels[event.side]
+        )
+    ]
+
+
+class OrderBookEventStream:
+    """
+    Stream of order book events of a token.
+
+    Events are handed to the subscribers as they are published and kept in a
+    bounded buffer until a consumer drains them, e.g. once per strategy run.
+    """
+
+    def __init__(self, maxlen: int = ORDER_BOOK_EVENTS_MAXLEN):
+        self._events: Deque[OrderBookEvent] = deque(maxlen=maxlen)
+        self._subscribers: List[Callable[[List[OrderBookEvent]], None]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback: Callable[[List[OrderBookEvent]], None]):
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def publish(self, events: List[OrderBookEvent]):
+        if not events:
+            return
+        with self._lock:
+            self._events.extend(events)
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            callback(events)
+
+    def drain(self) -> List[OrderBookEvent]:
+        """
+        Return and forget all buffered events.
+        """
+        with self._lock:
+            events = list(self._events)
+            self._events.clear()
+        return events
+
+
+class OrderBook:
+    """
+    Bids ("Buy") and asks ("Sell") of a token, built once per fetch.
+
+    Every update is diffed against the previous snapshot of the side and the
+    changed levels are published to the events stream.
+    """
+
+    __slots__ = ("sides", "events")
+
+    def __init__(self):
+        self.sides: Dict[str, OrderBookSide] = {
+            side: OrderBookSide.from_orders(side, []) for side in ("Buy", "Sell")
+        }
+        self.events = OrderBookEventStream()
+
+    def update_side(self, side: str, orders: List[Dict]) -> List[OrderBookEvent]:
+        """
+        Replace one side with the raw entries of a fresh /orderbook response
+        and publish the changed levels.
+        """
+        new_side = OrderBookSide.from_orders(side, orders)
+        events = diff_sides(self.sides[side], new_side)
+        self.sides[side] = new_side
+        self.events.publish(events)
+        return events
+
+    @property
+    def bids(self) -> OrderBookSide:
+        return self.sides["Buy"]
+
+    @property
+    def asks(self) -> OrderBookSide:
+        return self.sides["Sell"]
+
+    def best_bid(self) -> Optional[int]:
+        return self.bids.best()
+
+    def best_ask(self) -> Optional[int]:
+        return self.asks.best()
+
+    def mid_price(self) -> Optional[float]:
+        """
+        Mid of the best bid and ask, None if a side is empty.
+        """
+        best_bid, best_ask = self.best_bid(), self.best_ask()
+        if best_bid is None or best_ask is None:
+            return None
+        return (best_bid + best_ask) / 2
@@ -1,11 +1,12 @@
 import requests
 
 from configs.msw_connector_config import (
-    MUESLISWAP_API_URL,
     ORDER_BOOK_ENDPOINT,
     BASE_POLICY,
     BASE_TOKEN_NAME_HEX,
 )
+from bot.msw_connector import get_connector
+from bot.order_book import OrderBook
 from bot.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -16,7 +17,7 @@ def query_order_book(endpoint: str, query: str):
     Send a request to the Muesliswap API and return the response.
     """
     try:
-        response = requests.get(f"{MUESLISWAP_API_URL}{endpoint}{query}")
+        response = get_connector().get(endpoint, query)
         response.raise_for_status()
         return response.json().get("orders", {})
     except requests.exceptions.HTTPError as e:
@@ -34,41 +35,51 @@ def init_order_book(bot):
     """
     Initialize the order book dictionary for all selected tokens.
     """
-    order_book = {}
-    for token_name in bot.tokens:
-        order_book[token_name] = {"Buy": [], "Sell": []}
-    setattr(bot, "order_book", order_book)
+    for state in bot.token_states.values():
+        state.order_book = {"Buy": [], "Sell": []}
+        state.book = OrderBook()
 
 
-def track_order_book(bot, token_name: str, token_info: dict):
+def order_book_query(side: str, policy_id: str, hexname: str) -> str:
     """
-    Track the order book for the selected tokens.
+    Build the order book query of one side of the pair.
     """
-    policy_id, hexname = token_info["policy_id"], token_info["hexname"]
-    buy_orders_query = (
-        f"?from-policy-id={BASE_POLICY}"
-        f"&from-tokenname={BASE_TOKEN_NAME_HEX}"
-        f"&to-policy-id={policy_id}"
-        f"&to-tokenname={hexname}"
+    if side == "Buy":
+        from_policy, from_name = BASE_POLICY, BASE_TOKEN_NAME_HEX
+        to_policy, to_name = policy_id, hexname
+    else:
+        from_policy, from_name = policy_id, hexname
+        to_policy, to_name = BASE_POLICY, BASE_TOKEN_NAME_HEX
+    return (
+        f"?from-policy-id={from_policy}"
+        f"&from-tokenname={from_name}"
+        f"&to-policy-id={to_policy}"
+        f"&to-tokenname={to_name}"
     )
-    sell_orders_query = (
-        f"?from-policy-id={policy_id}"
-        f"&from-tokenname={hexname}"
-        f"&to-policy-id={BASE_POLICY}"
-        f"&to-tokenname={BASE_TOKEN_NAME_HEX}"
-    )
-    try:
-        logger.info(f"Tracking Buy Orders for {token_name}.")
-        bot.order_book[token_name]["Buy"] = query_order_book(
-            ORDER_BOOK_ENDPOINT, buy_orders_query
-        )
-        logger.info(f"Successfully tracked Buy Orders for {token_name}.")
 
-        logger.info(f"Tracking Sell Orders for {token_name}.")
-        bot.order_book[token_name]["Sell"] = query_order_book(
-            ORDER_BOOK_ENDPOINT, sell_orders_query
+
+def track_order_book_side(bot, token_name: str, token_info: dict, side: str):
+    """
+    Track one side ("Buy" or "Sell") of the order book of a token.
+    """
+    state = bot.token_states[token_name]
+    query = order_book_query(side, token_info["policy_id"], token_info["hexname"])
+    try:
+        logger.info(f"Tracking {side} Orders for {token_name}.")
+        state.order_book[side] = query_order_book(ORDER_BOOK_ENDPOINT, query)
+        events = state.book.update_side(side, state.order_book[side])
+        logger.info(
+            f"Successfully tracked {side} Orders for {token_name} "
+            f"({len(events)} levels changed)."
         )
-        logger.info(f"Successfully tracked Sell Orders for {token_name}.")
     except Exception as e:
         logger.exception(f"Order book tracking error for {token_name}: {e}")
         raise
+
+
+def track_order_book(bot, token_name: str, token_info: dict):
+    """
+    Track the order book for the selected tokens.
+    """
+    for side in ("Buy", "Sell"):
+        track_order_book_side(bot, token_name, token_info, side)
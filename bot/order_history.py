@@ -0,0 +1,328 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import requests
+from pycardano import Address
+
+from bot.msw_connector import get_connector
+from bot.utils.file_utils import atomic_write
+from bot.utils.logger import get_logger
+from bot.utils.order_utils import (
+    get_order_pair,
+    get_order_key,
+    get_order_type,
+    format_order,
+)
+from configs.config import FINALIZED_ORDERS_REFRESH_CYCLES
+from configs.msw_connector_config import ORDERS_ENDPOINT, HTTP_POOL_SIZE
+
+logger = get_logger(__name__)
+
+ORDER_STATUSES = ("open", "matched", "canceled")
+FINALIZED_STATUSES = ("matched", "canceled")
+
+
+class OrderSnapshot:
+    """
+    Orders of one stake key, indexed by status, pair and order key (txHash),
+    open orders also by (pair, side).
+
+    Matched and canceled orders are only present if they were fetched in the
+    snapshot's cycle, see `finalized_cycle`. If that fetch failed they are
+    carried over from the previous snapshot and `finalized_cycle` is None.
+    """
+
+    __slots__ = (
+        "cycle",
+        "finalized_cycle",
+        "by_status",
+        "by_pair",
+        "by_tx_hash",
+        "open_tx_hashes",
+        "open_by_pair_side",
+    )
+
+    def __init__(
+        self,
+        cycle: int,
+        finalized_cycle: Optional[int],
+        orders_by_status: Dict[str, List[Dict]],
+    ):
+        self.cycle = cycle
+        self.finalized_cycle = finalized_cycle
+        self.by_status = orders_by_status
+        self.by_pair: Dict[Tuple[str, str], Dict[str, List[Dict]]] = {}
+        self.by_tx_hash: Dict[str, Dict] = {}
+        self.open_tx_hashes = {
+            get_order_key(order) for order in orders_by_status["open"]
+        }
+        self.open_by_pair_side: Dict[Tuple[str, str], Dict[str, Dict[str, Dict]]] = {}
+        for status, orders in orders_by_status.items():
+            for order in orders:
+                self.by_tx_hash[get_order_key(order)] = order
+                try:
+                    pair = get_order_pair(order)
+                except ValueError:
+                    logger.info(f"Skipping order with unknown pair: {order['txHash']}")
+                    continue
+                pair_orders = self.by_pair.setdefault(
+                    pair, {key: [] for key in ORDER_STATUSES}
+                )
+                pair_orders[status].append(order)
+                if status == "open":
+                    sides = self.open_by_pair_side.setdefault(
+                        pair, {"buy": {}, "sell": {}}
+                    )
+                    sides[get_order_type(order)][get_order_key(order)] = order
+
+    def orders(self, status: str, pair: Tuple[str, str]) -> List[Dict]:
+        """
+        Return the orders with the given status for the given pair.
+        """
+        return self.by_pair.get(pair, {}).get(status, [])
+
+    def open_orders_by_side(self, pair: Tuple[str, str]) -> Dict[str, Dict[str, Dict]]:
+        """
+        Return the open orders of the pair by side and order key.
+        """
+        return self.open_by_pair_side.get(pair, {"buy": {}, "sell": {}})
+
+
+class OrderHistoryService:
+    """
+    Fetches the orders of each stake key at most once per cycle.
+
+    All tokens, and all steps of a token cycle (inventory, order tracking and
+    strategy), read from the same snapshot instead of re-downloading the full
+    order history of the stake key. Matched and canceled orders are only
+    refetched when an open order was closed since the previous cycle, or every
+    `FINALIZED_ORDERS_REFRESH_CYCLES` cycles. Orders of a failed fetch are
+    carried over from the previous snapshot, a failed matched/canceled fetch
+    is retried in the next cycle.
+    """
+
+    def __init__(self):
+        self.cycle = 0
+        self._snapshots: Dict[str, OrderSnapshot] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=HTTP_POOL_SIZE, thread_name_prefix="orders"
+        )
+
+    def new_cycle(self):
+        """
+        Mark all cached snapshots as stale.
+        """
+        self.cycle += 1
+
+    def get_snapshot(self, address: Address) -> OrderSnapshot:
+        """
+        Return the snapshot of the current cycle for the address' stake key.
+        """
+        stake_key_hash = address.staking_part.to_primitive().hex()
+        with self._locks_lock:
+            lock = self._locks.setdefault(stake_key_hash, threading.Lock())
+        with lock:
+            snapshot = self._snapshots.get(stake_key_hash)
+            if snapshot is None or snapshot.cycle != self.cycle:
+                snapshot = self._fetch(stake_key_hash, snapshot)
+                self._snapshots[stake_key_hash] = snapshot
+        return snapshot
+
+    def get_orders(self, address: Address, status: str, pair: Tuple[str, str]):
+        """
+        Return the orders with the given status for the pair traded by address.
+        """
+        return self.get_snapshot(address).orders(status, pair)
+
+    def _fetch(
+        self, stake_key_hash: str, previous: Optional[OrderSnapshot]
+    ) -> OrderSnapshot:
+        open_orders = get_orders(stake_key_hash, "open", open_orders=True)
+        if open_orders is None:
+            logger.warning("Keeping the open orders of the previous cycle.")
+            open_orders = previous.by_status["open"] if previous else []
+        orders_by_status = {"open": open_orders, "matched": [], "canceled": []}
+        open_tx_hashes = {get_order_key(order) for order in open_orders}
+        if (
+            previous is None
+            or previous.finalized_cycle is None
+            or not previous.open_tx_hashes <= open_tx_hashes
+            or self.cycle - previous.finalized_cycle >= FINALIZED_ORDERS_REFRESH_CYCLES
+        ):
+            # Matched and canceled orders are fetched concurrently
+            finalized_orders = dict(
+                zip(
+                    FINALIZED_STATUSES,
+                    self._executor.map(
+                        lambda status: get_orders(
+                            stake_key_hash, status, **{f"{status}_orders": True}
+                        ),
+                        FINALIZED_STATUSES,
+                    ),
+                )
+            )
+            if None in finalized_orders.values():
+                logger.warning("Matched/canceled fetch failed, retrying next cycle.")
+                for status in FINALIZED_STATUSES:
+                    orders_by_status[status] = (
+                        previous.by_status[status] if previous else []
+                    )
+                finalized_cycle = None
+            else:
+                orders_by_status.update(finalized_orders)
+                finalized_cycle = self.cycle
+        else:
+            logger.info("No open orders closed, skipping matched/canceled fetch.")
+            finalized_cycle = previous.finalized_cycle
+        return OrderSnapshot(self.cycle, finalized_cycle, orders_by_status)
+
+
+class FinalizedOrderStore:
+    """
+    Append-only JSONL log of the matched and canceled orders of a token.
+
+    A small sidecar file keeps the high-water mark on `finalizedAt` together
+    with the txHashes finalized at exactly that mark, so new orders can be
+    detected without reading the log back. The sidecar is written atomically
+    after the log; if it is missing or invalid the mark is rebuilt from the
+    log, and records appended again after a crash between the two writes are
+    skipped by read().
+    """
+
+    def __init__(self, path: Path, watermark_path: Path):
+        self.path = path
+        self.watermark_path = watermark_path
+        self.watermark = None
+        self.watermark_tx_hashes = set()
+        self._load_watermark()
+
+    def _load_watermark(self):
+        try:
+            with open(self.watermark_path, "r") as file:
+                data = json.load(file)
+            self.watermark = data["finalizedAt"]
+            self.watermark_tx_hashes = set(data["txHashes"])
+        except FileNotFoundError:
+            self._rebuild_watermark()
+        except (ValueError, KeyError) as e:
+            logger.error(f"Invalid order history watermark {self.watermark_path}: {e}")
+            self._rebuild_watermark()
+
+    def _rebuild_watermark(self):
+        for record in self.read():
+            finalized_at = record.get("finalizedAt")
+            if finalized_at is None:
+                continue
+            if self.watermark is None or finalized_at > self.watermark:
+                self.watermark = finalized_at
+                self.watermark_tx_hashes = set()
+            if finalized_at == self.watermark:
+                self.watermark_tx_hashes.add(record["txHash"])
+
+    def _is_new(self, order: Dict) -> bool:
+        finalized_at = order.get("finalizedAt")
+        if finalized_at is None:
+            return False
+        if self.watermark is None or finalized_at > self.watermark:
+            return True
+        return (
+            finalized_at == self.watermark
+            and get_order_key(order) not in self.watermark_tx_hashes
+        )
+
+    def append(self, orders_by_status: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+        """
+        Append the orders finalized after the watermark and return them by status.
+        """
+        new_orders = {
+            status: [order for order in orders if self._is_new(order)]
+            for status, orders in orders_by_status.items()
+        }
+        records = []
+        for status, orders in new_orders.items():
+            for order in orders:
+                ((tx_hash, details),) = format_order(order).items()
+                records.append({"txHash": tx_hash, "status": status, **details})
+        if not records:
+            return new_orders
+
+        records.sort(key=lambda record: record["finalizedAt"])
+        with open(self.path, "a") as file:
+            for record in records:
+                file.write(json.dumps(record) + "\n")
+
+        latest = records[-1]["finalizedAt"]
+        if latest != self.watermark:
+            self.watermark = latest
+            self.watermark_tx_hashes = set()
+        self.watermark_tx_hashes.update(
+            record["txHash"] for record in records if record["finalizedAt"] == latest
+        )
+        watermark = {
+            "finalizedAt": self.watermark,
+            "txHashes": sorted(self.watermark_tx_hashes),
+        }
+        atomic_write(self.watermark_path, lambda file: json.dump(watermark, file))
+        logger.info(f"Appended {len(records)} finalized orders to {self.path.name}.")
+        return new_orders
+
+    def read(self) -> Iterator[Dict]:
+        """
+        Stream the logged orders, oldest first, each (txHash, status) once.
+        """
+        seen = set()
+        try:
+            with open(self.path, "r") as file:
+                for line in file:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    key = (record["txHash"], record["status"])
+                    if key not in seen:
+                        seen.add(key)
+                        yield record
+        except FileNotFoundError:
+            return
+
+
+def get_orders(
+    stake_key_hash: str,
+    order_type: str,
+    canceled_orders: bool = False,
+    open_orders: bool = False,
+    matched_orders: bool = False,
+    only_v2: bool = False,
+) -> Optional[List]:
+    """
+    Fetches orders from MuesliSwap API orders endpoint based on order type.
+
+    Returns None if the request or the JSON parsing failed.
+    """
+    params = {
+        "stake-key-hash": stake_key_hash,
+        "canceled": "y" if canceled_orders else "n",
+        "open": "y" if open_orders else "n",
+        "matched": "y" if matched_orders else "n",
+        "v2_only": "y" if only_v2 else "n",
+    }
+    query = "&".join(f"{key}={value}" for key, value in params.items())
+    try:
+        response = get_connector().get(ORDERS_ENDPOINT, f"?{query}")
+        if response.status_code == 200:
+            response_json = response.json()
+            logger.info(f"Fetched {order_type}_orders successfully")
+            return response_json
+        else:
+            logger.error(
+                f"Failed to fetch {order_type} orders. Status code: {response.status_code}"
+            )
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Network exception occurred: {e}")
+    except ValueError as e:
+        logger.error(f"JSON parsing error: {e}")
+    return None
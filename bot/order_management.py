@@ -1,50 +1,112 @@
 import requests
 import json
-from typing import List, Dict
+from functools import partial
+from pathlib import Path
+from typing import Dict
 
 from pycardano import Address
 
 from configs.config import (
-    KEY_PREFIX,
-    KEYS_DIR,
     ORDER_TRACKING_DIR,
     LOCAL_ORDER_TRACKING_FILE,
     ONCHAIN_ORDER_TRACKING_FILE,
+    ORDER_HISTORY_FILE,
+    ORDER_HISTORY_WATERMARK_FILE,
     ORDER_TIMEOUT,
+    STORAGE_BACKEND,
 )
-from configs.msw_connector_config import (
-    MUESLISWAP_API_URL,
-    OPEN_POSITIONS_ENDPOINT,
-    ORDERS_ENDPOINT,
-)
+from configs.msw_connector_config import OPEN_POSITIONS_ENDPOINT
+from bot.msw_connector import get_connector
+from bot.order_history import FinalizedOrderStore
+from bot.reconciliation import reconcile_orders
+from bot.utils.file_utils import atomic_write
 from bot.utils.logger import get_logger
-from bot.utils.utils import get_address, get_current_block_height, get_tx_block_height
-from bot.utils.order_utils import get_order_type, format_order
+from bot.utils.utils import get_current_block_height, get_tx_block_heights
+from bot.utils.order_utils import (
+    format_order,
+    get_order_key,
+    order_key_tx_hash,
+)
 
 logger = get_logger(__name__)
 
 
+class OrderTrackingStore:
+    """
+    Write-behind store of the local order tracking of a token.
+
+    Changes to the tracking only mark the store dirty, the file is rewritten
+    once when the token step is flushed. Writes go to a temporary file that is
+    fsynced and renamed over the tracking file, so a crash leaves either the
+    previous or the new tracking on disk, never a partial one.
+    """
+
+    def __init__(self, path: Path, token_name: str):
+        self.path = path
+        self.token_name = token_name
+        self.dirty = False
+
+    def load(self) -> Dict:
+        return load_order_tracking_file(self.path, self.token_name)
+
+    def mark_dirty(self):
+        self.dirty = True
+
+    def flush(self, order_tracking: Dict):
+        """
+        Write the tracking to disk if it changed since the last flush.
+        """
+        if not self.dirty:
+            return
+        atomic_write(
+            self.path, lambda file: json.dump(order_tracking, file, indent=4)
+        )
+        self.dirty = False
+        logger.info(f"Saved updated order tracking for {self.token_name}.")
+
+
 def init_order_tracking(bot) -> Dict:
     """
     Initialize the order tracking information.
     """
-    order_tracking = {}
-    for token_name in bot.tokens:
-        order_tracking_file = ORDER_TRACKING_DIR.joinpath(
+    for token_name, state in bot.token_states.items():
+        tracking_file = ORDER_TRACKING_DIR.joinpath(
             f"{token_name}_{LOCAL_ORDER_TRACKING_FILE}"
         )
-        order_tracking.update(
-            {token_name: load_order_tracking_file(order_tracking_file, token_name)}
+        json_tracking_store = partial(OrderTrackingStore, tracking_file, token_name)
+        json_finalized_orders = partial(
+            FinalizedOrderStore,
+            ORDER_TRACKING_DIR.joinpath(f"{token_name}_{ORDER_HISTORY_FILE}"),
+            ORDER_TRACKING_DIR.joinpath(f"{token_name}_{ORDER_HISTORY_WATERMARK_FILE}"),
         )
-        key_path = KEYS_DIR.joinpath(f"{KEY_PREFIX}{token_name}")
-    setattr(bot, "order_tracking", order_tracking)
-    for token_name in bot.tokens:
+        if STORAGE_BACKEND == "sqlite":
+            from bot.sqlite_store import (
+                SqliteFinalizedOrderStore,
+                SqliteOrderTrackingStore,
+                get_sqlite_store,
+            )
+
+            # The JSON files are only opened to import them, once per token
+            store = get_sqlite_store()
+            state.order_tracking_store = SqliteOrderTrackingStore(
+                store, token_name, legacy_store=json_tracking_store
+            )
+            state.finalized_orders = SqliteFinalizedOrderStore(
+                store, token_name, legacy_store=json_finalized_orders
+            )
+        else:
+            state.order_tracking_store = json_tracking_store()
+            state.finalized_orders = json_finalized_orders()
+        state.order_tracking = state.order_tracking_store.load()
+    for token_name, state in bot.token_states.items():
+        # Create the tracking file of new tokens
         save_order_tracking(bot, token_name)
-        address = get_address(key_path, token_name)
+        address = state.address
         # Update the bot's onchain order tracking information
         update_orders(bot, address, token_name)
         # Sync the local order tracking information with the onchain data
         sync_order_tracking(bot, token_name)
+        flush_order_tracking(bot, token_name)
 
 
 def load_order_tracking_file(file_name: str, token_name: str) -> Dict:
@@ -75,79 +137,67 @@ def load_order_tracking_file(file_name: str, token_name: str) -> Dict:
 
 def sync_order_tracking(bot, token_name: str):
     """Synchronize local order tracking with onchain data."""
-    # Retrieve onchain and local order tracking data
-    local_tracking = bot.order_tracking[token_name]
-    onchain_orders = bot.open_orders
-    onchain_orders_hashes = [order["txHash"] for order in onchain_orders]
+    state = bot.token_states[token_name]
+    local_tracking = state.order_tracking
+    # Resolve all missing tx heights at once, the tip is queried at most once
+    missing_heights = [
+        order_key_tx_hash(txHash)
+        for order_type in ["buy", "sell"]
+        for txHash, order_details in local_tracking[f"{order_type}_orders"].items()
+        if not order_details.get("tx_height")
+    ]
+    tx_heights = get_tx_block_heights(missing_heights) if missing_heights else {}
+    diff = reconcile_orders(
+        local_tracking,
+        state.open_orders_by_side,
+        {get_order_key(order) for order in state.canceled_orders},
+        tx_heights,
+        get_current_block_height,
+        ORDER_TIMEOUT,
+    )
     for order_type in ["buy", "sell"]:
-        local_orders = local_tracking[f"{order_type}_orders"]
-        synced_orders = {}
-        # Remove expired local orders
-        for txHash, order_details in local_orders.items():
-            # Query tx_height if not present
-            tx_height = order_details.get("tx_height", None)
-            if not tx_height:
-                tx_height = get_tx_block_height(txHash)
-                local_orders[txHash]["tx_height"] = tx_height
-            # Check if the order is not in the onchain data and has expired
-            if txHash not in onchain_orders_hashes:
-                current_height = get_current_block_height()
-                if (
-                    tx_height
-                    and current_height
-                    and current_height - tx_height > ORDER_TIMEOUT
-                ):
-                    logger.info(f"Removing expired {order_type} order: {txHash}")
-                else:
-                    # Either not expired or error querying tx_height or current_height
-                    synced_orders[txHash] = order_details
-            else:
-                order_details["tx_height"] = tx_height
-                synced_orders[txHash] = order_details
-
-        # Add missing onchain orders to local tracking
-        for onchain_order in onchain_orders:
-            onchain_order_type = get_order_type(onchain_order)
-            if onchain_order_type == order_type:
-                txHash = onchain_order["txHash"]
-                if (
-                    onchain_order["txHash"] not in synced_orders
-                    and txHash not in local_tracking["canceled_orders"]
-                ):
-                    synced_orders.update(format_order(onchain_order))
-                    logger.info(
-                        f"Adding missing {order_type} order from onchain: {txHash}"
-                    )
-        # Update local tracking
-        local_tracking[f"{order_type}_orders"] = synced_orders
-    # Update order tracking and save to file
-    bot.order_tracking[token_name] = local_tracking
-    save_order_tracking(bot, token_name)
+        for txHash in diff.expired[order_type]:
+            logger.info(f"Removing expired {order_type} order: {txHash}")
+        for txHash in diff.cancelled[order_type]:
+            logger.info(f"Removing canceled {order_type} order: {txHash}")
+        for txHash in diff.added[order_type]:
+            logger.info(f"Adding missing {order_type} order from onchain: {txHash}")
+    logger.info(f"Synced order tracking for {token_name}: {diff}")
+    # Mark the order tracking for saving if anything changed
+    if diff.changed() or any(tx_heights.values()):
+        save_order_tracking(bot, token_name)
+    return diff
 
 
 def save_order_tracking(bot, token_name):
-    """Save the updated order tracking to a file."""
-    with open(
-        ORDER_TRACKING_DIR / f"{token_name}_{LOCAL_ORDER_TRACKING_FILE}", "w"
-    ) as file:
-        json.dump(bot.order_tracking[token_name], file, indent=4)
-        logger.info(f"Saved updated order tracking for {token_name}.")
+    """
+    Mark the order tracking as changed, it is written to the file by the next
+    flush_order_tracking.
+    """
+    bot.token_states[token_name].order_tracking_store.mark_dirty()
+
+
+def flush_order_tracking(bot, token_name):
+    """Save the order tracking to a file if it changed."""
+    state = bot.token_states[token_name]
+    state.order_tracking_store.flush(state.order_tracking)
 
 
-def update_open_positions(bot, address: Address):
+def update_open_positions(bot, address: Address, token_name: str):
     """
     Display open positions via open-positions endpoint.
     """
     skh = address.staking_part.to_primitive().hex()
     content = f"?skh={skh}&wallet={address.to_primitive().hex()}"
-    track_order_query = f"{MUESLISWAP_API_URL}{OPEN_POSITIONS_ENDPOINT}{content}"
     try:
-        response = requests.get(track_order_query)
+        response = get_connector().get(OPEN_POSITIONS_ENDPOINT, content)
         if response.status_code == 200:
             response_json = response.json()
             open_positions = response_json.get("orders", {})
-            setattr(bot, "open_positions", open_positions)
-            logger.info(f"Own orders tracked successfully: {bot.open_positions}")
+            bot.token_states[token_name].open_positions = open_positions
+            logger.info(
+                f"Own orders tracked successfully for {token_name}: {open_positions}"
+            )
         else:
             logger.error(f"Failed to track orders. Status code: {response.status_code}")
 
@@ -160,69 +210,33 @@ def update_open_positions(bot, address: Address):
 
 def update_orders(bot, address: Address, token_name: str):
     """
-    Updates the bot's orders based on type: 'open', 'matched', or 'canceled'.
+    Updates the token's orders based on type: 'open', 'matched', or 'canceled'.
     """
-    update_order_type(bot, address, "open")
-    update_order_type(bot, address, "matched")
-    update_order_type(bot, address, "canceled")
+    state = bot.token_states[token_name]
+    snapshot = bot.order_history.get_snapshot(address)
+    pair = (state.token_info["policy_id"], state.token_info["hexname"])
+    state.open_orders = snapshot.orders("open", pair)
+    state.open_orders_by_side = snapshot.open_orders_by_side(pair)
+    # Only orders finalized since the last watermark are kept and logged
+    new_finalized_orders = state.finalized_orders.append(
+        {
+            "matched": snapshot.orders("matched", pair),
+            "canceled": snapshot.orders("canceled", pair),
+        }
+    )
+    state.matched_orders = new_finalized_orders["matched"]
+    state.canceled_orders = new_finalized_orders["canceled"]
+    if STORAGE_BACKEND == "sqlite":
+        from bot.sqlite_store import get_sqlite_store
+
+        get_sqlite_store().save_open_orders(token_name, state.open_orders)
+        return
     onchain_order_tracking_file = ORDER_TRACKING_DIR.joinpath(
         f"{token_name}_{ONCHAIN_ORDER_TRACKING_FILE}"
     )
     with open(onchain_order_tracking_file, "w") as file:
         json.dump(
-            {
-                "open_orders": [format_order(order) for order in bot.open_orders],
-                "matched_orders": [format_order(order) for order in bot.matched_orders],
-                "canceled_orders": [
-                    format_order(order) for order in bot.canceled_orders
-                ],
-            },
+            {"open_orders": [format_order(order) for order in state.open_orders]},
             file,
             indent=4,
         )
-
-
-def update_order_type(bot, address: Address, order_type: str):
-    """
-    Updates the bot's orders based on type: 'open', 'matched', or 'canceled'.
-    """
-    stake_key_hash = address.staking_part.to_primitive().hex()
-    orders = get_orders(stake_key_hash, order_type, **{f"{order_type}_orders": True})
-    setattr(bot, f"{order_type}_orders", orders)
-
-
-def get_orders(
-    stake_key_hash: str,
-    order_type: str,
-    canceled_orders: bool = False,
-    open_orders: bool = False,
-    matched_orders: bool = False,
-    only_v2: bool = False,
-) -> List:
-    """
-    Fetches orders from MuesliSwap API orders endpoint based on order type.
-    """
-    params = {
-        "stake-key-hash": stake_key_hash,
-        "canceled": "y" if canceled_orders else "n",
-        "open": "y" if open_orders else "n",
-        "matched": "y" if matched_orders else "n",
-        "v2_only": "y" if only_v2 else "n",
-    }
-    query = "&".join(f"{key}={value}" for key, value in params.items())
-    order_query = f"{MUESLISWAP_API_URL}{ORDERS_ENDPOINT}?{query}"
-    try:
-        response = requests.get(order_query)
-        if response.status_code == 200:
-            response_json = response.json()
-            logger.info(f"Fetched {order_type}_orders successfully")
-            return response_json
-        else:
-            logger.error(
-                f"Failed to fetch {order_type} orders. Status code: {response.status_code}"
-            )
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Network exception occurred: {e}")
-    except ValueError as e:
-        logger.error(f"JSON parsing error: {e}")
-    return []
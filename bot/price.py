@@ -1,11 +1,11 @@
 import requests
 
 from configs.msw_connector_config import (
-    MUESLISWAP_API_URL,
     PRICE_ENDPOINT,
     BASE_POLICY,
     BASE_TOKEN_NAME_HEX,
 )
+from bot.msw_connector import get_connector
 from bot.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -19,19 +19,33 @@ def fetch_price(bot, token_name: str, policy_id: str, hexname: str):
     try:
         logger.info(f"Fetching price data for {token_name}.")
         price_data = query_price_endpoint(PRICE_ENDPOINT, query)
-        bot.price_data[token_name] = process_price_data(price_data)
+        state = bot.token_states[token_name]
+        state.price_data = process_price_data(price_data)
+        state.price_cycle = bot.order_history.cycle
         logger.info(f"Successfully fetched price data for {token_name}.")
     except Exception as e:
         logger.exception(f"Price fetching error for {token_name}: {e}")
         raise
 
 
+def fetch_price_if_stale(bot, token_name: str, policy_id: str, hexname: str):
+    """
+    Fetch the mid-price of the token pair unless it was already fetched in
+    the current cycle, e.g. by the async data collection.
+    """
+    state = bot.token_states[token_name]
+    if state.price_data and state.price_cycle == bot.order_history.cycle:
+        logger.info(f"Using prefetched price data for {token_name}.")
+        return
+    fetch_price(bot, token_name, policy_id, hexname)
+
+
 def query_price_endpoint(endpoint: str, query: str):
     """
     Send a request to the Muesliswap API and return the response.
     """
     try:
-        response = requests.get(f"{MUESLISWAP_API_URL}{endpoint}{query}")
+        response = get_connector().get(endpoint, query)
         response.raise_for_status()
 
         return response.json()
@@ -81,6 +95,5 @@ def init_price_data(bot):
     """
     Initialize the price data dictionary for all selected tokens.
     """
-    setattr(bot, "price_data", {})
     for token_name, token_info in bot.tokens.items():
         fetch_price(bot, token_name, token_info["policy_id"], token_info["hexname"])
@@ -0,0 +1,103 @@
+from typing import Callable, Dict, List, Optional, Set
+
+from bot.utils.logger import get_logger
+from bot.utils.order_utils import format_order, order_key_tx_hash
+
+logger = get_logger(__name__)
+
+ORDER_SIDES = ("buy", "sell")
+
+
+class ReconciliationDiff:
+    """
+    Changes of the local order tracking of a token after a reconciliation,
+    as order keys per side.
+
+    added: open onchain orders that were not tracked locally
+    confirmed: tracked orders that are open onchain
+    expired: tracked orders that did not show up onchain within the timeout
+    cancelled: tracked orders reported as canceled since the last fetch
+    """
+
+    __slots__ = ("added", "confirmed", "expired", "cancelled")
+
+    def __init__(self):
+        self.added: Dict[str, List[str]] = {side: [] for side in ORDER_SIDES}
+        self.confirmed: Dict[str, List[str]] = {side: [] for side in ORDER_SIDES}
+        self.expired: Dict[str, List[str]] = {side: [] for side in ORDER_SIDES}
+        self.cancelled: Dict[str, List[str]] = {side: [] for side in ORDER_SIDES}
+
+    def changed(self) -> bool:
+        """
+        Whether the local tracking was modified.
+        """
+        return any(
+            orders[side]
+            for orders in (self.added, self.expired, self.cancelled)
+            for side in ORDER_SIDES
+        )
+
+    def __repr__(self) -> str:
+        counts = ", ".join(
+            f"{name}={sum(len(keys) for keys in getattr(self, name).values())}"
+            for name in self.__slots__
+        )
+        return f"ReconciliationDiff({counts})"
+
+
+def reconcile_orders(
+    order_tracking: Dict,
+    open_orders: Dict[str, Dict[str, Dict]],
+    canceled_keys: Set[str],
+    tx_heights: Dict[str, Optional[int]],
+    current_height: Callable[[], Optional[int]],
+    timeout: int,
+) -> ReconciliationDiff:
+    """
+    Reconcile the local order tracking of a token with its open onchain
+    orders in linear time, updating the tracking in place.
+
+    open_orders maps each side to the open onchain orders by order key,
+    canceled_keys holds the keys of the orders canceled since the last fetch
+    and tx_heights the block heights of the tracked orders' transactions
+    without a known tx_height. current_height is only called, once, if a
+    tracked order is missing onchain.
+    """
+    diff = ReconciliationDiff()
+    height_cache = []
+
+    def tip() -> Optional[int]:
+        if not height_cache:
+            height_cache.append(current_height())
+        return height_cache[0]
+
+    for side in ORDER_SIDES:
+        local_orders = order_tracking[f"{side}_orders"]
+        onchain = open_orders.get(side, {})
+        synced_orders = {}
+        for key, order_details in local_orders.items():
+            tx_height = order_details.get("tx_height")
+            if not tx_height:
+                tx_height = tx_heights.get(order_key_tx_hash(key))
+                order_details["tx_height"] = tx_height
+            if key in onchain:
+                diff.confirmed[side].append(key)
+                synced_orders[key] = order_details
+            elif key in canceled_keys:
+                diff.cancelled[side].append(key)
+            elif tx_height and tip() and tip() - tx_height > timeout:
+                diff.expired[side].append(key)
+            else:
+                # Either not expired or error querying tx_height or current_height
+                synced_orders[key] = order_details
+
+        for key, order in onchain.items():
+            if (
+                key not in synced_orders
+                and key not in order_tracking["canceled_orders"]
+            ):
+                synced_orders.update(format_order(order))
+                diff.added[side].append(key)
+        order_tracking[f"{side}_orders"] = synced_orders
+    return diff
+
@@ -0,0 +1,214 @@
+import threading
+import time
+from typing import Dict, List, Optional, Union
+
+from pycardano import (
+    Address,
+    ChainContext,
+    ExecutionUnits,
+    GenesisParameters,
+    Network,
+    ProtocolParameters,
+    Transaction,
+    TransactionFailedException,
+    TransactionId,
+    TransactionInput,
+    TransactionOutput,
+    UTxO,
+    Value,
+)
+
+from bot.utils.logger import get_logger
+from configs.config import (
+    SIMULATED_FUNDS_LOVELACE,
+    SIMULATED_FUNDS_TRADES,
+    SIMULATED_EX_UNITS,
+)
+
+logger = get_logger(__name__)
+
+# Mainnet parameters of the Babbage era, plutus cost models fall back to pycardano's
+SIMULATED_PROTOCOL_PARAMETERS = ProtocolParameters(
+    min_fee_constant=155381,
+    min_fee_coefficient=44,
+    max_block_size=90112,
+    max_tx_size=16384,
+    max_block_header_size=1100,
+    key_deposit=2000000,
+    pool_deposit=500000000,
+    pool_influence=0.3,
+    monetary_expansion=0.003,
+    treasury_expansion=0.2,
+    decentralization_param=0,
+    extra_entropy="",
+    protocol_major_version=8,
+    protocol_minor_version=0,
+    min_utxo=4310,
+    min_pool_cost=170000000,
+    price_mem=0.0577,
+    price_step=0.0000721,
+    max_tx_ex_mem=14000000,
+    max_tx_ex_steps=10000000000,
+    max_block_ex_mem=62000000,
+    max_block_ex_steps=20000000000,
+    max_val_size=5000,
+    collateral_percent=150,
+    max_collateral_inputs=3,
+    coins_per_utxo_word=4310,
+    coins_per_utxo_byte=4310,
+    cost_models={},
+)
+
+SIMULATED_GENESIS_PARAMETERS = GenesisParameters(
+    active_slots_coefficient=0.05,
+    update_quorum=5,
+    max_lovelace_supply=45000000000000000,
+    network_magic=764824073,
+    epoch_length=432000,
+    system_start=1506203091,
+    slots_per_kes_period=129600,
+    slot_length=1,
+    max_kes_evolutions=62,
+    security_param=2160,
+)
+
+
+class SimulatedChainContext(ChainContext):
+    """
+    In-memory ledger that stands in for the chain, e.g. to benchmark the
+    transaction pipeline offline.
+
+    Submitted transactions are applied immediately: their inputs must be
+    unspent UTxOs of the ledger, which are consumed, and their outputs become
+    spendable right away. Signatures, scripts and the balance are not
+    validated, script execution always costs SIMULATED_EX_UNITS. Slots advance
+    with wall-clock time and a block is made every 1 / active slots
+    coefficient slots.
+    """
+
+    def __init__(self, network: Network):
+        self._network = network
+        self._start_time = time.time()
+        self._start_slot = int(
+            self._start_time - SIMULATED_GENESIS_PARAMETERS.system_start
+        )
+        self._utxos_by_address: Dict[str, Dict[TransactionInput, UTxO]] = {}
+        self._address_of: Dict[TransactionInput, str] = {}
+        self._tx_heights: Dict[str, int] = {}
+        self._n_txs = 0
+        self._lock = threading.Lock()
+
+    @property
+    def protocol_param(self) -> ProtocolParameters:
+        return SIMULATED_PROTOCOL_PARAMETERS
+
+    @property
+    def genesis_param(self) -> GenesisParameters:
+        return SIMULATED_GENESIS_PARAMETERS
+
+    @property
+    def network(self) -> Network:
+        return self._network
+
+    @property
+    def last_block_slot(self) -> int:
+        return self._start_slot + int(time.time() - self._start_time)
+
+    @property
+    def epoch(self) -> int:
+        return self.last_block_slot // SIMULATED_GENESIS_PARAMETERS.epoch_length
+
+    def block_height(self) -> int:
+        """Height of the last block."""
+        return int(
+            self.last_block_slot * SIMULATED_GENESIS_PARAMETERS.active_slots_coefficient
+        )
+
+    def tx_block_height(self, tx_hash: str) -> Optional[int]:
+        """Height of the block of a submitted transaction."""
+        with self._lock:
+            return self._tx_heights.get(tx_hash)
+
+    def _add_utxo(self, utxo: UTxO):
+        address = str(utxo.output.address)
+        self._utxos_by_address.setdefault(address, {})[utxo.input] = utxo
+        self._address_of[utxo.input] = address
+
+    def fund(self, address: Address, amount: Value) -> UTxO:
+        """
+        Create a UTxO out of thin air, e.g. to seed the bot's wallets.
+        """
+        with self._lock:
+            self._n_txs += 1
+            tx_id = TransactionId(self._n_txs.to_bytes(32, "big"))
+            utxo = UTxO(TransactionInput(tx_id, 0), TransactionOutput(address, amount))
+            self._add_utxo(utxo)
+        logger.info(f"Funded {address} with {amount} on the simulated ledger.")
+        return utxo
+
+    def _utxos(self, address: str) -> List[UTxO]:
+        with self._lock:
+            return list(self._utxos_by_address.get(address, {}).values())
+
+    def submit_tx(self, tx: Union[Transaction, bytes, str]) -> str:
+        # Transactions built by the bot are applied as they are, decoding them
+        # again fails for witness sets with PlutusV2 scripts in pycardano 0.10
+        if not isinstance(tx, Transaction):
+            return self.submit_tx_cbor(tx)
+        body = tx.transaction_body
+        with self._lock:
+            missing = [
+                tx_in for tx_in in body.inputs if tx_in not in self._address_of
+            ]
+            if missing:
+                raise TransactionFailedException(
+                    f"Inputs {missing} of tx {tx.id} are not unspent UTxOs."
+                )
+            for tx_in in body.inputs:
+                address = self._address_of.pop(tx_in)
+                del self._utxos_by_address[address][tx_in]
+            for index, output in enumerate(body.outputs):
+                self._add_utxo(UTxO(TransactionInput(tx.id, index), output))
+            self._tx_heights[str(tx.id)] = self.block_height()
+        return str(tx.id)
+
+    def submit_tx_cbor(self, cbor: Union[bytes, str]) -> str:
+        if isinstance(cbor, str):
+            cbor = bytes.fromhex(cbor)
+        return self.submit_tx(Transaction.from_cbor(cbor))
+
+    def evaluate_tx(self, tx: Transaction) -> Dict[str, ExecutionUnits]:
+        mem, steps = SIMULATED_EX_UNITS
+        return {
+            f"{redeemer.tag.name.lower()}:{redeemer.index}": ExecutionUnits(mem, steps)
+            for redeemer in tx.transaction_witness_set.redeemer or []
+        }
+
+    def evaluate_tx_cbor(self, cbor: Union[bytes, str]) -> Dict[str, ExecutionUnits]:
+        if isinstance(cbor, str):
+            cbor = bytes.fromhex(cbor)
+        return self.evaluate_tx(Transaction.from_cbor(cbor))
+
+
+def fund_simulated_wallets(bot, context: ChainContext):
+    """
+    Seed the wallet of every token with ADA and enough tokens for
+    SIMULATED_FUNDS_TRADES sell orders. The context must be (or wrap) a
+    SimulatedChainContext.
+    """
+    for state in bot.token_states.values():
+        token_info = state.token_info
+        context.fund(
+            state.address,
+            Value.from_primitive(
+                [
+                    SIMULATED_FUNDS_LOVELACE,
+                    {
+                        bytes.fromhex(token_info["policy_id"]): {
+                            bytes.fromhex(token_info["hexname"]): token_info["amount"]
+                            * SIMULATED_FUNDS_TRADES
+                        }
+                    },
+                ]
+            ),
+        )
@@ -0,0 +1,485 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from bot.utils.logger import get_logger
+from bot.utils.order_utils import format_order, get_order_key, order_key_tx_hash
+from configs.config import SQLITE_DB_FILE, SQLITE_SYNCHRONOUS
+
+logger = get_logger(__name__)
+
+TRACKING_STATUSES = ("buy", "sell", "canceled")  # Sections "<status>_orders"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracked_orders (
+    token TEXT NOT NULL,
+    status TEXT NOT NULL,
+    order_key TEXT NOT NULL,
+    tx_hash TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    details TEXT NOT NULL,
+    PRIMARY KEY (token, status, order_key)
+);
+CREATE INDEX IF NOT EXISTS tracked_orders_tx_hash ON tracked_orders (tx_hash);
+CREATE INDEX IF NOT EXISTS tracked_orders_status
+    ON tracked_orders (token, status, updated_at);
+CREATE INDEX IF NOT EXISTS tracked_orders_updated_at ON tracked_orders (updated_at);
+
+CREATE TABLE IF NOT EXISTS open_orders (
+    token TEXT NOT NULL,
+    order_key TEXT NOT NULL,
+    tx_hash TEXT NOT NULL,
+    details TEXT NOT NULL,
+    PRIMARY KEY (token, order_key)
+);
+CREATE INDEX IF NOT EXISTS open_orders_tx_hash ON open_orders (tx_hash);
+
+CREATE TABLE IF NOT EXISTS finalized_orders (
+    token TEXT NOT NULL,
+    order_key TEXT NOT NULL,
+    tx_hash TEXT NOT NULL,
+    status TEXT NOT NULL,
+    finalized_at,
+    details TEXT NOT NULL,
+    PRIMARY KEY (token, order_key, status)
+);
+CREATE INDEX IF NOT EXISTS finalized_orders_tx_hash ON finalized_orders (tx_hash);
+CREATE INDEX IF NOT EXISTS finalized_orders_status
+    ON finalized_orders (token, status, finalized_at);
+CREATE INDEX IF NOT EXISTS finalized_orders_finalized_at
+    ON finalized_orders (finalized_at);
+
+CREATE TABLE IF NOT EXISTS inventory (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    token TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    address TEXT NOT NULL,
+    inventory TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS inventory_timestamp ON inventory (token, timestamp);
+
+CREATE TABLE IF NOT EXISTS migrations (
+    token TEXT NOT NULL,
+    name TEXT NOT NULL,
+    migrated_at REAL NOT NULL,
+    PRIMARY KEY (token, name)
+);
+"""
+
+# One-time imports of the JSON backend files, recorded in the migrations table
+TRACKING_MIGRATION = "json_order_tracking"
+HISTORY_MIGRATION = "json_order_history"
+INVENTORY_MIGRATION = "json_inventory"
+
+
+class SqliteStore:
+    """
+    Embedded SQLite database (WAL mode) holding the local order tracking, the
+    open, matched and canceled orders and the inventory of all tokens.
+
+    One connection is shared by all token workers and serialized by a lock,
+    WAL keeps readers, e.g. an analysis notebook, from blocking the bot.
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        logger.info(f"Opened SQLite store {path}.")
+
+    def execute(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def transaction(self, statements: List[Tuple[str, List[Tuple]]]):
+        """
+        Run (sql, rows) pairs with executemany in a single transaction.
+        """
+        with self._lock, self._conn:
+            for sql, rows in statements:
+                if rows:
+                    self._conn.executemany(sql, rows)
+
+    def is_migrated(self, token_name: str, name: str) -> bool:
+        """
+        Whether the one-time migration name already ran for the token.
+        """
+        return bool(
+            self.execute(
+                "SELECT 1 FROM migrations WHERE token = ? AND name = ?",
+                (token_name, name),
+            )
+        )
+
+    @staticmethod
+    def migration_statement(token_name: str, name: str) -> Tuple[str, List[Tuple]]:
+        """
+        Statement recording a migration, to run in the same transaction as
+        the imported rows.
+        """
+        return (
+            "INSERT OR IGNORE INTO migrations (token, name, migrated_at) "
+            "VALUES (?, ?, ?)",
+            [(token_name, name, time.time())],
+        )
+
+    def save_open_orders(self, token_name: str, open_orders: List[Dict]):
+        """
+        Replace the stored open orders of a token.
+        """
+        rows = []
+        for order in open_orders:
+            ((key, details),) = format_order(order).items()
+            rows.append((token_name, key, order_key_tx_hash(key), json.dumps(details)))
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM open_orders WHERE token = ?", (token_name,))
+            self._conn.executemany(
+                "INSERT INTO open_orders (token, order_key, tx_hash, details) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    def query_finalized_orders(
+        self,
+        token_name: Optional[str] = None,
+        status: Optional[str] = None,
+        since=None,
+    ) -> List[Dict]:
+        """
+        Matched and canceled orders, optionally of one token and status,
+        finalized at or after since, oldest first.
+        """
+        sql = "SELECT details FROM finalized_orders WHERE 1=1"
+        params = []
+        if token_name is not None:
+            sql += " AND token = ?"
+            params.append(token_name)
+        if status is not None:
+            sql += " AND status = ?"
+            params.append(status)
+        if since is not None:
+            sql += " AND finalized_at >= ?"
+            params.append(since)
+        sql += " ORDER BY finalized_at"
+        return [json.loads(details) for (details,) in self.execute(sql, tuple(params))]
+
+    def find_order(self, tx_hash: str) -> List[Tuple[str, str, Dict]]:
+        """
+        (token, status, details) of the tracked orders of a transaction.
+        """
+        return [
+            (token, status, json.loads(details))
+            for token, status, details in self.execute(
+                "SELECT token, status, details FROM tracked_orders WHERE tx_hash = ?",
+                (tx_hash,),
+            )
+        ]
+
+
+class SqliteOrderTrackingStore:
+    """
+    Write-behind store of the local order tracking of a token in SQLite.
+
+    Same interface as OrderTrackingStore. A flush only upserts the entries
+    that changed since the last flush and deletes the removed ones, in one
+    transaction. The tracking of the JSON backend is imported once, with the
+    first flush: legacy_store only builds its OrderTrackingStore if that import
+    has not run for the token yet.
+    """
+
+    def __init__(
+        self,
+        store: SqliteStore,
+        token_name: str,
+        legacy_store: Optional[Callable] = None,
+    ):
+        self.store = store
+        self.token_name = token_name
+        self.legacy_store = legacy_store
+        self.dirty = False
+        self._migrating = False
+        self._flushed: Dict[Tuple[str, str], str] = {}
+
+    def load(self) -> Dict:
+        order_tracking = {f"{status}_orders": {} for status in TRACKING_STATUSES}
+        rows = self.store.execute(
+            "SELECT status, order_key, details FROM tracked_orders WHERE token = ?",
+            (self.token_name,),
+        )
+        for status, key, details in rows:
+            order_tracking[f"{status}_orders"][key] = json.loads(details)
+            self._flushed[(status, key)] = details
+        if self.legacy_store is not None and not self.store.is_migrated(
+            self.token_name, TRACKING_MIGRATION
+        ):
+            legacy_store = self.legacy_store()
+            if legacy_store.path.exists():
+                order_tracking = legacy_store.load()
+                logger.info(f"Importing {legacy_store.path.name} into the SQLite store.")
+            self._migrating = True
+            self.dirty = True
+        return order_tracking
+
+    def mark_dirty(self):
+        self.dirty = True
+
+    def flush(self, order_tracking: Dict):
+        if not self.dirty:
+            return
+        current = {
+            (status, key): json.dumps(details)
+            for status in TRACKING_STATUSES
+            for key, details in order_tracking[f"{status}_orders"].items()
+        }
+        now = time.time()
+        upserts = [
+            (self.token_name, status, key, order_key_tx_hash(key), now, details)
+            for (status, key), details in current.items()
+            if self._flushed.get((status, key)) != details
+        ]
+        deletes = [
+            (self.token_name, status, key)
+            for status, key in self._flushed.keys() - current.keys()
+        ]
+        self.store.transaction(
+            [
+                (
+                    "INSERT OR REPLACE INTO tracked_orders "
+                    "(token, status, order_key, tx_hash, updated_at, details) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    upserts,
+                ),
+                (
+                    "DELETE FROM tracked_orders "
+                    "WHERE token = ? AND status = ? AND order_key = ?",
+                    deletes,
+                ),
+            ]
+            + (
+                [self.store.migration_statement(self.token_name, TRACKING_MIGRATION)]
+                if self._migrating
+                else []
+            )
+        )
+        self._flushed = current
+        self._migrating = False
+        self.dirty = False
+        logger.info(
+            f"Saved order tracking for {self.token_name}: "
+            f"{len(upserts)} updated, {len(deletes)} removed."
+        )
+
+
+class SqliteFinalizedOrderStore:
+    """
+    Matched and canceled orders of a token in SQLite, same interface as
+    FinalizedOrderStore.
+
+    The watermark on `finalizedAt` is read from the table, so only orders
+    finalized after it are inserted. The log of the JSON backend is imported
+    once: legacy_store only builds its FinalizedOrderStore if that import has
+    not run for the token yet.
+    """
+
+    def __init__(
+        self,
+        store: SqliteStore,
+        token_name: str,
+        legacy_store: Optional[Callable] = None,
+    ):
+        self.store = store
+        self.token_name = token_name
+        if legacy_store is not None and not store.is_migrated(
+            token_name, HISTORY_MIGRATION
+        ):
+            self._import(legacy_store().read())
+        ((self.watermark,),) = store.execute(
+            "SELECT MAX(finalized_at) FROM finalized_orders WHERE token = ?",
+            (token_name,),
+        )
+        self.watermark_tx_hashes = {
+            key
+            for (key,) in store.execute(
+                "SELECT order_key FROM finalized_orders "
+                "WHERE token = ? AND finalized_at = ?",
+                (token_name, self.watermark),
+            )
+        }
+
+    def _row(self, record: Dict) -> Tuple:
+        key = record["txHash"]
+        return (
+            self.token_name,
+            key,
+            order_key_tx_hash(key),
+            record["status"],
+            record.get("finalizedAt"),
+            json.dumps(record),
+        )
+
+    @staticmethod
+    def _insert_statement(rows: List[Tuple]) -> Tuple[str, List[Tuple]]:
+        return (
+            "INSERT OR IGNORE INTO finalized_orders "
+            "(token, order_key, tx_hash, status, finalized_at, details) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    def _import(self, records: Iterator[Dict]):
+        rows = [self._row(record) for record in records]
+        self.store.transaction(
+            [
+                self._insert_statement(rows),
+                self.store.migration_statement(self.token_name, HISTORY_MIGRATION),
+            ]
+        )
+        logger.info(
+            f"Imported {len(rows)} finalized orders of {self.token_name} "
+            "into the SQLite store."
+        )
+
+    def _is_new(self, order: Dict) -> bool:
+        finalized_at = order.get("finalizedAt")
+        if finalized_at is None:
+            return False
+        if self.watermark is None or finalized_at > self.watermark:
+            return True
+        return (
+            finalized_at == self.watermark
+            and get_order_key(order) not in self.watermark_tx_hashes
+        )
+
+    def append(self, orders_by_status: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+        """
+        Insert the orders finalized after the watermark and return them by status.
+        """
+        new_orders = {
+            status: [order for order in orders if self._is_new(order)]
+            for status, orders in orders_by_status.items()
+        }
+        rows = []
+        for status, orders in new_orders.items():
+            for order in orders:
+                ((key, details),) = format_order(order).items()
+                rows.append(self._row({"txHash": key, "status": status, **details}))
+        if not rows:
+            return new_orders
+
+        self.store.transaction([self._insert_statement(rows)])
+        latest = max(row[4] for row in rows)
+        if latest != self.watermark:
+            self.watermark = latest
+            self.watermark_tx_hashes = set()
+        self.watermark_tx_hashes.update(row[1] for row in rows if row[4] == latest)
+        logger.info(f"Stored {len(rows)} finalized orders of {self.token_name}.")
+        return new_orders
+
+    def read(self) -> Iterator[Dict]:
+        """
+        Stream the stored orders, oldest first.
+        """
+        yield from self.store.query_finalized_orders(self.token_name)
+
+
+class SqliteInventoryLog:
+    """
+    Inventory records of a token in SQLite, same interface as InventoryLog.
+
+    The records of the JSONL backend are imported once: legacy_log only
+    builds its InventoryLog if that import has not run for the token yet.
+    """
+
+    def __init__(
+        self,
+        store: SqliteStore,
+        token_name: str,
+        legacy_log: Optional[Callable] = None,
+    ):
+        self.store = store
+        self.token_name = token_name
+        if legacy_log is not None and not store.is_migrated(
+            token_name, INVENTORY_MIGRATION
+        ):
+            self._import(legacy_log().read())
+        rows = store.execute(
+            "SELECT timestamp, address, inventory FROM inventory "
+            "WHERE token = ? ORDER BY id DESC LIMIT 1",
+            (token_name,),
+        )
+        self.latest: Optional[Dict] = self._record(*rows[0]) if rows else None
+
+    @staticmethod
+    def _record(timestamp: str, address: str, inventory: str) -> Dict:
+        return {
+            "timestamp": timestamp,
+            "address": address,
+            "inventory": json.loads(inventory),
+        }
+
+    def _insert_statement(self, records: List[Dict]) -> Tuple[str, List[Tuple]]:
+        return (
+            "INSERT INTO inventory (token, timestamp, address, inventory) "
+            "VALUES (?, ?, ?, ?)",
+            [
+                (
+                    self.token_name,
+                    record["timestamp"],
+                    record["address"],
+                    json.dumps(record["inventory"]),
+                )
+                for record in records
+            ],
+        )
+
+    def _import(self, records: Iterator[Dict]):
+        records = list(records)
+        self.store.transaction(
+            [
+                self._insert_statement(records),
+                self.store.migration_statement(self.token_name, INVENTORY_MIGRATION),
+            ]
+        )
+        logger.info(
+            f"Imported {len(records)} inventory records of {self.token_name} "
+            "into the SQLite store."
+        )
+
+    def append(self, record: Dict):
+        self.store.transaction([self._insert_statement([record])])
+        self.latest = record
+
+    def read(self, since: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Stream the stored records, oldest first, optionally only those logged
+        at or after the ISO timestamp since.
+        """
+        rows = self.store.execute(
+            "SELECT timestamp, address, inventory FROM inventory "
+            "WHERE token = ? AND timestamp >= ? ORDER BY id",
+            (self.token_name, since or ""),
+        )
+        for row in rows:
+            yield self._record(*row)
+
+
+_sqlite_store: Optional[SqliteStore] = None
+_sqlite_store_lock = threading.Lock()
+
+
+def get_sqlite_store() -> SqliteStore:
+    """
+    Return the shared SQLite store, opening the database on first use.
+    """
+    global _sqlite_store
+    with _sqlite_store_lock:
+        if _sqlite_store is None:
+            _sqlite_store = SqliteStore(SQLITE_DB_FILE)
+        return _sqlite_store
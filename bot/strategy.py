@@ -3,15 +3,28 @@ from abc import ABC, abstractmethod
 from collections import deque
 import statistics
 
-from pycardano import Address, InsufficientUTxOBalanceException
+from pycardano import (
+    Address,
+    InsufficientUTxOBalanceException,
+    InvalidTransactionException,
+)
 import math
 
-from bot.price import fetch_price
+from bot.price import fetch_price_if_stale
 from bot.utils.logger import get_logger, log_exception
-from bot.transactions import place_buy_order, place_sell_order, cancel_order
+from bot.transactions import (
+    place_buy_order,
+    place_sell_order,
+    place_orders,
+    cancel_order,
+    cancel_orders,
+    requote_orders,
+    is_tx_too_large,
+)
 from bot.order_management import save_order_tracking
-from bot.utils.order_utils import order_to_price
-from configs.config import CONTEXT
+from bot.utils.order_utils import order_to_price, get_order_key, get_order_type
+from configs.msw_connector_config import MAX_ORDERS_PER_TX, MAX_CANCELS_PER_TX
+from bot.utxo_cache import get_utxo_cache
 
 logger = get_logger(__name__)
 
@@ -46,7 +59,9 @@ def apply_strategy(
     Apply the trading strategy.
     """
     try:
-        bot.strategy.execute(bot, token_name, token_info, address, key_path)
+        bot.token_states[token_name].strategy.execute(
+            bot, token_name, token_info, address, key_path
+        )
     except Exception as e:
         logger.exception(f"Strategy application error: {e}")
         raise
@@ -102,7 +117,8 @@ class BaseStrategy(ABC):
             logger.exception(f"Error parsing order to price: {e}")
             return False
         
-        if order["txHash"] in bot.order_tracking[token_name]["canceled_orders"]:
+        order_tracking = bot.token_states[token_name].order_tracking
+        if get_order_key(order) in order_tracking["canceled_orders"]:
             logger.info(f"Order {order['txHash']} already canceled.")
             return False
         elif not self.check_over_refresh_threshold(price):
@@ -112,9 +128,16 @@ class BaseStrategy(ABC):
             logger.info(f"Order {order['txHash']} is outside the threshold, cancelling order.")
             return True
     
-    def check_if_buy(self, bot, token_name, price):
-        """Determine if buy order should be placed."""
-        if len(bot.order_tracking[token_name]["buy_orders"].keys()) >= self.config["n_orders"]:
+    def check_if_buy(self, bot, token_name, price, pending: int = 0):
+        """Determine if buy order should be placed.
+
+        pending counts the buy orders already planned but not yet tracked.
+        """
+        order_tracking = bot.token_states[token_name].order_tracking
+        if not bot.health_monitor.is_healthy():
+            logger.info(f"Services unhealthy, not placing buy order.")
+            return False
+        elif len(order_tracking["buy_orders"].keys()) + pending >= self.config["n_orders"]:
             logger.info(f"Max number of buy orders reached.")
             return False
         elif self.check_over_refresh_threshold(price):
@@ -124,9 +147,16 @@ class BaseStrategy(ABC):
             logger.info(f"Price {price} is within the threshold.")
             return True
     
-    def check_if_sell(self, bot, token_name, price):
-        """Determine if a sell order should be placed."""
-        if len(bot.order_tracking[token_name]["sell_orders"].keys()) >= self.config["n_orders"]:
+    def check_if_sell(self, bot, token_name, price, pending: int = 0):
+        """Determine if a sell order should be placed.
+
+        pending counts the sell orders already planned but not yet tracked.
+        """
+        order_tracking = bot.token_states[token_name].order_tracking
+        if not bot.health_monitor.is_healthy():
+            logger.info(f"Services unhealthy, not placing sell order.")
+            return False
+        elif len(order_tracking["sell_orders"].keys()) + pending >= self.config["n_orders"]:
             logger.info(f"Max number of sell orders reached.")
             return False
         elif self.check_over_refresh_threshold(price):
@@ -136,6 +166,336 @@ class BaseStrategy(ABC):
             logger.info(f"Price {price} is within the threshold.")
             return True
     
+    def plan_orders(
+        self,
+        bot,
+        token_name: str,
+        token_info: dict,
+        buy_prices: List[int],
+        sell_prices: List[int],
+        released: Optional[Dict[str, int]] = None,
+    ) -> List[Dict]:
+        """
+        Plan the new orders of a token in the same alternating order as the
+        sequential loop, see place_orders for the order format.
+
+        released counts the tracked orders per side that are canceled in the
+        same transactions and thus free a slot.
+        """
+        planned = []
+        pending = {"buy": 0, "sell": 0}
+        if released:
+            pending = {side: -released.get(side, 0) for side in pending}
+        for i in range(max(len(buy_prices), len(sell_prices))):
+            for side, prices, check in (
+                ("buy", buy_prices, self.check_if_buy),
+                ("sell", sell_prices, self.check_if_sell),
+            ):
+                if i >= len(prices) or prices[i] <= 0:
+                    continue
+                if check(bot, token_name, prices[i], pending[side]):
+                    planned.append(
+                        {
+                            "side": side,
+                            "token_name": token_name,
+                            "policy_id": token_info["policy_id"],
+                            "hexname": token_info["hexname"],
+                            "amount": token_info["amount"],
+                            "decimals": token_info["decimals"],
+                            "price": prices[i],
+                        }
+                    )
+                    pending[side] += 1
+        return planned
+
+    def place_orders_batched(
+        self,
+        bot,
+        token_name: str,
+        token_info: dict,
+        address: Address,
+        key_path: str,
+        buy_prices: List[int],
+        sell_prices: List[int],
+        utxos: Optional[List],
+    ) -> Optional[List]:
+        """
+        Place the new buy and sell orders of a token in as few transactions as
+        possible, at most MAX_ORDERS_PER_TX orders each.
+
+        If a transaction exceeds the max tx size the batch is halved and retried.
+        Returns the UTxOs left for the next transaction of the cycle.
+        """
+        state = bot.token_states[token_name]
+        planned = self.plan_orders(bot, token_name, token_info, buy_prices, sell_prices)
+
+        def submit(batch, utxos):
+            # Create and submit one transaction for the whole batch
+            placed_orders, utxos = place_orders(batch, address, key_path, utxos)
+            # Add orders to local order tracking
+            state.order_tracking["buy_orders"].update(placed_orders["buy"])
+            state.order_tracking["sell_orders"].update(placed_orders["sell"])
+            # Save order tracking files locally
+            save_order_tracking(bot, token_name)
+            logger.info(f"Batch of {len(batch)} orders placed: {placed_orders}")
+            return utxos
+
+        return self.submit_batches(planned, MAX_ORDERS_PER_TX, submit, utxos)
+
+    def requote_batched(
+        self,
+        bot,
+        token_name: str,
+        token_info: dict,
+        address: Address,
+        key_path: str,
+        buy_prices: List[int],
+        sell_prices: List[int],
+        utxos: Optional[List],
+    ) -> Optional[List]:
+        """
+        Replace the orders of a token that moved out of the price range with
+        new ones in the same transactions.
+
+        Each stale order is paired with a new order of the same side, so the
+        released funds fund the new order and the quote never leaves the book.
+        Unpaired stale orders are only canceled and unpaired new orders only
+        placed. A transaction holds at most MAX_CANCELS_PER_TX pairs.
+        Returns the UTxOs left for the next transaction of the cycle.
+        """
+        state = bot.token_states[token_name]
+        stale_orders = {"buy": [], "sell": []}
+        for order in state.open_orders:
+            if self.check_if_cancel_order(bot, order, token_name):
+                stale_orders[get_order_type(order)].append(order)
+        # Only stale orders that are tracked locally occupy a slot
+        released = {
+            side: sum(
+                get_order_key(order) in state.order_tracking[f"{side}_orders"]
+                for order in orders
+            )
+            for side, orders in stale_orders.items()
+        }
+        planned = self.plan_orders(
+            bot, token_name, token_info, buy_prices, sell_prices, released
+        )
+        new_orders = {
+            side: [order for order in planned if order["side"] == side]
+            for side in ("buy", "sell")
+        }
+        pairs = []
+        for side in ("buy", "sell"):
+            n_pairs = max(len(stale_orders[side]), len(new_orders[side]))
+            for i in range(n_pairs):
+                pairs.append(
+                    (
+                        stale_orders[side][i] if i < len(stale_orders[side]) else None,
+                        new_orders[side][i] if i < len(new_orders[side]) else None,
+                    )
+                )
+
+        def submit(batch, utxos):
+            # Create and submit one transaction for the whole batch
+            stale = [order for order, _ in batch if order is not None]
+            requoted_orders, utxos = requote_orders(
+                stale,
+                [order for _, order in batch if order is not None],
+                address,
+                key_path,
+                utxos,
+                state.order_tracking,
+            )
+            # Update local order tracking
+            state.order_tracking["canceled_orders"].update(requoted_orders["canceled"])
+            for order in stale:
+                state.order_tracking["buy_orders"].pop(get_order_key(order), None)
+                state.order_tracking["sell_orders"].pop(get_order_key(order), None)
+            state.order_tracking["buy_orders"].update(requoted_orders["buy"])
+            state.order_tracking["sell_orders"].update(requoted_orders["sell"])
+            # Save order tracking files locally
+            save_order_tracking(bot, token_name)
+            logger.info(f"Orders requoted: {requoted_orders}")
+            return utxos
+
+        return self.submit_batches(pairs, MAX_CANCELS_PER_TX, submit, utxos)
+
+    def cancel_orders_batched(
+        self,
+        bot,
+        token_name: str,
+        address: Address,
+        key_path: str,
+        utxos: Optional[List],
+    ) -> Optional[List]:
+        """
+        Cancel the open orders of a token that moved out of the price range in
+        as few transactions as possible, at most MAX_CANCELS_PER_TX orders each.
+
+        Returns the UTxOs left for the next transaction of the cycle.
+        """
+        state = bot.token_states[token_name]
+        stale_orders = [
+            order
+            for order in state.open_orders
+            if self.check_if_cancel_order(bot, order, token_name)
+        ]
+
+        def submit(batch, utxos):
+            # Create and submit one transaction for the whole batch
+            canceled_orders, utxos = cancel_orders(
+                batch, address, key_path, utxos, state.order_tracking
+            )
+            # Add canceled orders to local order tracking to avoid cancelling them again
+            state.order_tracking["canceled_orders"].update(canceled_orders)
+            for order in batch:
+                state.order_tracking["buy_orders"].pop(get_order_key(order), None)
+                state.order_tracking["sell_orders"].pop(get_order_key(order), None)
+            # Save order tracking files locally
+            save_order_tracking(bot, token_name)
+            logger.info(f"Orders {list(canceled_orders)} canceled.")
+            return utxos
+
+        return self.submit_batches(stale_orders, MAX_CANCELS_PER_TX, submit, utxos)
+
+    def execute_batched(
+        self,
+        bot,
+        token_name: str,
+        token_info: dict,
+        address: Address,
+        key_path: str,
+        buy_prices: List[int],
+        sell_prices: List[int],
+        utxos: Optional[List],
+    ) -> bool:
+        """
+        Requote, or cancel and place the orders of the cycle in batches, if
+        atomic_requote or batch_orders is configured.
+
+        Returns False if neither is set, the strategy then cancels and places
+        its orders one transaction at a time with execute_sequential.
+        """
+        if self.config.get("atomic_requote", False):
+            self.requote_batched(
+                bot, token_name, token_info, address, key_path,
+                buy_prices, sell_prices, utxos,
+            )
+            return True
+        if self.config.get("batch_orders", False):
+            utxos = self.cancel_orders_batched(
+                bot, token_name, address, key_path, utxos
+            )
+            self.place_orders_batched(
+                bot, token_name, token_info, address, key_path,
+                buy_prices, sell_prices, utxos,
+            )
+            return True
+        return False
+
+    def execute_sequential(
+        self,
+        bot,
+        token_name: str,
+        token_info: dict,
+        address: Address,
+        key_path: str,
+        buy_prices: List[int],
+        sell_prices: List[int],
+        utxos: Optional[List],
+    ):
+        """
+        Cancel the orders that moved out of the price range and place the new
+        ones, alternating between buy and sell, one transaction per order.
+        """
+        state = bot.token_states[token_name]
+        for order in state.open_orders:
+            if not self.check_if_cancel_order(bot, order, token_name):
+                continue
+            try:
+                # Create and submit tx
+                canceled_order, utxos = cancel_order(
+                    order, address, key_path, utxos, state.order_tracking
+                )
+                # Add canceled order to local order tracking to avoid cancelling it again
+                state.order_tracking["canceled_orders"].update(canceled_order)
+                state.order_tracking["buy_orders"].pop(get_order_key(order), None)
+                state.order_tracking["sell_orders"].pop(get_order_key(order), None)
+                # Save order tracking files locally
+                save_order_tracking(bot, token_name)
+                logger.info(f"Order {get_order_key(order)} canceled.")
+            except InsufficientUTxOBalanceException:
+                logger.info(f"Insufficient UTxOs. Await previous txs or add more funds")
+            except Exception as e:
+                log_exception(logger, "Error canceling order", e)
+
+        for i in range(max(len(buy_prices), len(sell_prices))):
+            for side, prices, check, place in (
+                ("buy", buy_prices, self.check_if_buy, place_buy_order),
+                ("sell", sell_prices, self.check_if_sell, place_sell_order),
+            ):
+                if i >= len(prices):
+                    continue
+                price = prices[i]
+                if price <= 0:
+                    logger.info("Skipping, price cannot be zero or negative")
+                    continue
+                if not check(bot, token_name, price):
+                    continue
+                try:
+                    # Create and submit the order transaction
+                    placed_order, utxos = place(
+                        token_name,
+                        token_info["policy_id"],
+                        token_info["hexname"],
+                        address,
+                        token_info["amount"],
+                        token_info["decimals"],
+                        price,
+                        key_path,
+                        utxos,
+                    )
+                    # Add the order to local order tracking
+                    state.order_tracking[f"{side}_orders"].update(placed_order)
+                    save_order_tracking(bot, token_name)
+                    logger.info(f"{side.capitalize()} order placed: {placed_order}")
+                except InsufficientUTxOBalanceException:
+                    logger.info(f"Insufficient UTxOs. Await previous txs or add more funds")
+                except Exception as e:
+                    log_exception(logger, f"Error placing {side} order", e)
+
+    def submit_batches(
+        self, items: List, batch_size: int, submit, utxos: Optional[List]
+    ) -> Optional[List]:
+        """
+        Submit items in batches of at most batch_size with submit(batch, utxos),
+        which returns the UTxOs left for the next transaction.
+
+        If a transaction exceeds the max tx size or execution units the batch
+        size is halved and the batch retried. A single item that is still too
+        large is skipped. Any other error stops the submission.
+        """
+        while items:
+            batch = items[:batch_size]
+            try:
+                utxos = submit(batch, utxos)
+            except InvalidTransactionException as e:
+                if not is_tx_too_large(e):
+                    log_exception(logger, "Invalid transaction", e)
+                    break
+                if batch_size > 1:
+                    batch_size = max(1, batch_size // 2)
+                    logger.info(f"Batch too large, retrying with {batch_size} items")
+                    continue
+                log_exception(logger, "Transaction too large", e)
+            except InsufficientUTxOBalanceException:
+                logger.info(f"Insufficient UTxOs. Await previous txs or add more funds")
+                break
+            except Exception as e:
+                log_exception(logger, "Error submitting batch", e)
+                break
+            items = items[len(batch):]
+        return utxos
+
     @abstractmethod
     def calculate_order_prices(self):
         """Calculate buy and sell prices based on strategy logic."""
@@ -168,14 +528,10 @@ class StandardMarketMakingStrategy(BaseStrategy):
         address: Address,
         key_path: str,
     ):
-        policy_id, hexname, amount, decimals = (
-            token_info["policy_id"],
-            token_info["hexname"],
-            token_info["amount"],
-            token_info["decimals"],
-        )
-        fetch_price(bot, token_name, policy_id, hexname)
-        self.update_mid_price(bot.price_data[token_name]["price"])
+        policy_id, hexname = token_info["policy_id"], token_info["hexname"]
+        state = bot.token_states[token_name]
+        fetch_price_if_stale(bot, token_name, policy_id, hexname)
+        self.update_mid_price(state.price_data["price"])
         if self.mid_price is None:
             return
 
@@ -183,98 +539,15 @@ class StandardMarketMakingStrategy(BaseStrategy):
         buy_prices, sell_prices = self.calculate_order_prices()
 
         # Preselect UTxOs for the transactions
-        utxos = CONTEXT.utxos(address)
-        # We cancel orders that are outside the price range
-        for order in bot.open_orders:
-            if self.check_if_cancel_order(bot, order, token_name):
-                try:
-                    # Create and submit tx
-                    canceled_order, utxos = cancel_order(
-                        order, address, key_path, utxos
-                    )
-                    # Add canceled order to local order tracking to avoid cancelling it again
-                    bot.order_tracking[token_name]["canceled_orders"].update(
-                        canceled_order
-                    )
-                    # Remove order from locla open open orders
-                    del bot.order_tracking[token_name]["buy_orders"][order["txHash"]]
-                    del bot.order_tracking[token_name]["sell_orders"][order["txHash"]]
-                    # Save order tracking files locally
-                    save_order_tracking(bot, token_name)
-                    logger.info(f"Order {order['txHash']} canceled.")
-                except InsufficientUTxOBalanceException:
-                    logger.info(
-                        f"Insufficient UTxOs. Await previous txs or add more funds"
-                    )
-                except Exception as e:
-                    log_exception(logger, "Error canceling order", e)
-
-        # Alternate between placing buy and sell orders
-        max_length = max(len(buy_prices), len(sell_prices))
-        for i in range(max_length):
-            # Place buy order if within range of buy_prices
-            if i < len(buy_prices):
-                price = buy_prices[i]
-                if price <= 0:
-                    logger.info("Skipping, price cannot be zero or negative")
-                    continue
-                if self.check_if_buy(bot, token_name, price):
-                    try:
-                        # Create and submit buy order transaction
-                        buy_order, utxos = place_buy_order(
-                            token_name,
-                            policy_id,
-                            hexname,
-                            address,
-                            amount,
-                            decimals,
-                            price,
-                            key_path,
-                            utxos,
-                        )
-                        # Add buy order to local order tracking
-                        bot.order_tracking[token_name]["buy_orders"].update(buy_order)
-                        # Save order tracking files locally
-                        save_order_tracking(bot, token_name)
-                        logger.info(f"Buy order placed: {buy_order}")
-                    except InsufficientUTxOBalanceException:
-                        logger.info(
-                            f"Insufficient UTxOs. Await previous txs or add more funds"
-                        )
-                    except Exception as e:
-                        log_exception(logger, "Error placing buy order", e)
-
-            # Place sell order if within range of sell_prices
-            if i < len(sell_prices):
-                price = sell_prices[i]
-                if price <= 0:
-                    logger.info("Skipping, price cannot be zero or negative")
-                    continue
-                if self.check_if_sell(bot, token_name, price):
-                    try:
-                        # Create and submit sell order transaction
-                        sell_order, utxos = place_sell_order(
-                            token_name,
-                            policy_id,
-                            hexname,
-                            address,
-                            amount,
-                            decimals,
-                            price,
-                            key_path,
-                            utxos,
-                        )
-                        # Add sell order to local order tracking
-                        bot.order_tracking[token_name]["sell_orders"].update(sell_order)
-                        # Save order tracking files locally
-                        save_order_tracking(bot, token_name)
-                        logger.info(f"Sell order placed: {sell_order}")
-                    except InsufficientUTxOBalanceException:
-                        logger.info(
-                            f"Insufficient UTxOs. Await previous txs or add more funds"
-                        )
-                    except Exception as e:
-                        log_exception(logger, "Error placing sell order", e)
+        utxos = get_utxo_cache().utxos(address)
+        if not self.execute_batched(
+            bot, token_name, token_info, address, key_path,
+            buy_prices, sell_prices, utxos,
+        ):
+            self.execute_sequential(
+                bot, token_name, token_info, address, key_path,
+                buy_prices, sell_prices, utxos,
+            )
 
 
 class AggressiveMarketMakingStrategy(BaseStrategy):
@@ -311,15 +584,11 @@ class AggressiveMarketMakingStrategy(BaseStrategy):
     
     def execute(self, bot, token_name: str, token_info: dict, address: Address, key_path: str):
         """Execute aggressive market making strategy."""
-        policy_id, hexname, amount, decimals = (
-            token_info["policy_id"],
-            token_info["hexname"],
-            token_info["amount"],
-            token_info["decimals"],
-        )
+        policy_id, hexname = token_info["policy_id"], token_info["hexname"]
         
-        fetch_price(bot, token_name, policy_id, hexname)
-        self.update_mid_price(bot.price_data[token_name]["price"])
+        state = bot.token_states[token_name]
+        fetch_price_if_stale(bot, token_name, policy_id, hexname)
+        self.update_mid_price(state.price_data["price"])
         
         if self.mid_price is None:
             return
@@ -328,61 +597,16 @@ class AggressiveMarketMakingStrategy(BaseStrategy):
         buy_prices, sell_prices = self.calculate_order_prices()
         
         # Preselect UTxOs for the transactions
-        utxos = CONTEXT.utxos(address)
-        
-        # Cancel orders that are outside the price range
-        for order in bot.open_orders:
-            if self.check_if_cancel_order(bot, order, token_name):
-                try:
-                    canceled_order, utxos = cancel_order(order, address, key_path, utxos)
-                    bot.order_tracking[token_name]["canceled_orders"].update(canceled_order)
-                    del bot.order_tracking[token_name]["buy_orders"][order["txHash"]]
-                    del bot.order_tracking[token_name]["sell_orders"][order["txHash"]]
-                    save_order_tracking(bot, token_name)
-                    logger.info(f"Order {order['txHash']} canceled.")
-                except InsufficientUTxOBalanceException:
-                    logger.info(f"Insufficient UTxOs. Await previous txs or add more funds")
-                except Exception as e:
-                    log_exception(logger, "Error canceling order", e)
-        
-        # Place orders with aggressive pricing
-        max_length = max(len(buy_prices), len(sell_prices))
-        for i in range(max_length):
-            if i < len(buy_prices):
-                price = buy_prices[i]
-                if price <= 0:
-                    continue
-                if self.check_if_buy(bot, token_name, price):
-                    try:
-                        buy_order, utxos = place_buy_order(
-                            token_name, policy_id, hexname, address, amount, decimals,
-                            price, key_path, utxos
-                        )
-                        bot.order_tracking[token_name]["buy_orders"].update(buy_order)
-                        save_order_tracking(bot, token_name)
-                        logger.info(f"Aggressive buy order placed: {buy_order}")
-                    except InsufficientUTxOBalanceException:
-                        logger.info(f"Insufficient UTxOs. Await previous txs or add more funds")
-                    except Exception as e:
-                        log_exception(logger, "Error placing buy order", e)
-            
-            if i < len(sell_prices):
-                price = sell_prices[i]
-                if price <= 0:
-                    continue
-                if self.check_if_sell(bot, token_name, price):
-                    try:
-                        sell_order, utxos = place_sell_order(
-                            token_name, policy_id, hexname, address, amount, decimals,
-                            price, key_path, utxos
-                        )
-                        bot.order_tracking[token_name]["sell_orders"].update(sell_order)
-                        save_order_tracking(bot, token_name)
-                        logger.info(f"Aggressive sell order placed: {sell_order}")
-                    except InsufficientUTxOBalanceException:
-                        logger.info(f"Insufficient UTxOs. Await previous txs or add more funds")
-                    except Exception as e:
-                        log_exception(logger, "Error placing sell order", e)
+        utxos = get_utxo_cache().utxos(address)
+        
+        if not self.execute_batched(
+            bot, token_name, token_info, address, key_path,
+            buy_prices, sell_prices, utxos,
+        ):
+            self.execute_sequential(
+                bot, token_name, token_info, address, key_path,
+                buy_prices, sell_prices, utxos,
+            )
 
 
 class VolumeBasedAdaptiveStrategy(BaseStrategy):
@@ -429,15 +653,11 @@ class VolumeBasedAdaptiveStrategy(BaseStrategy):
     
     def execute(self, bot, token_name: str, token_info: dict, address: Address, key_path: str):
         """Execute volume-based adaptive strategy."""
-        policy_id, hexname, amount, decimals = (
-            token_info["policy_id"],
-            token_info["hexname"],
-            token_info["amount"],
-            token_info["decimals"],
-        )
+        policy_id, hexname = token_info["policy_id"], token_info["hexname"]
         
-        fetch_price(bot, token_name, policy_id, hexname)
-        self.update_mid_price(bot.price_data[token_name]["price"])
+        state = bot.token_states[token_name]
+        fetch_price_if_stale(bot, token_name, policy_id, hexname)
+        self.update_mid_price(state.price_data["price"])
         
         # Update volume (this would need to be implemented in the price fetching)
         # For now, we'll use a placeholder
@@ -451,61 +671,16 @@ class VolumeBasedAdaptiveStrategy(BaseStrategy):
         buy_prices, sell_prices = self.calculate_order_prices()
         
         # Preselect UTxOs for the transactions
-        utxos = CONTEXT.utxos(address)
-        
-        # Cancel orders that are outside the price range
-        for order in bot.open_orders:
-            if self.check_if_cancel_order(bot, order, token_name):
-                try:
-                    canceled_order, utxos = cancel_order(order, address, key_path, utxos)
-                    bot.order_tracking[token_name]["canceled_orders"].update(canceled_order)
-                    del bot.order_tracking[token_name]["buy_orders"][order["txHash"]]
-                    del bot.order_tracking[token_name]["sell_orders"][order["txHash"]]
-                    save_order_tracking(bot, token_name)
-                    logger.info(f"Order {order['txHash']} canceled.")
-                except InsufficientUTxOBalanceException:
-                    logger.info(f"Insufficient UTxOs. Await previous txs or add more funds")
-                except Exception as e:
-                    log_exception(logger, "Error canceling order", e)
-        
-        # Place orders with volume-adaptive pricing
-        max_length = max(len(buy_prices), len(sell_prices))
-        for i in range(max_length):
-            if i < len(buy_prices):
-                price = buy_prices[i]
-                if price <= 0:
-                    continue
-                if self.check_if_buy(bot, token_name, price):
-                    try:
-                        buy_order, utxos = place_buy_order(
-                            token_name, policy_id, hexname, address, amount, decimals,
-                            price, key_path, utxos
-                        )
-                        bot.order_tracking[token_name]["buy_orders"].update(buy_order)
-                        save_order_tracking(bot, token_name)
-                        logger.info(f"Volume-adaptive buy order placed: {buy_order}")
-                    except InsufficientUTxOBalanceException:
-                        logger.info(f"Insufficient UTxOs. Await previous txs or add more funds")
-                    except Exception as e:
-                        log_exception(logger, "Error placing buy order", e)
-            
-            if i < len(sell_prices):
-                price = sell_prices[i]
-                if price <= 0:
-                    continue
-                if self.check_if_sell(bot, token_name, price):
-                    try:
-                        sell_order, utxos = place_sell_order(
-                            token_name, policy_id, hexname, address, amount, decimals,
-                            price, key_path, utxos
-                        )
-                        bot.order_tracking[token_name]["sell_orders"].update(sell_order)
-                        save_order_tracking(bot, token_name)
-                        logger.info(f"Volume-adaptive sell order placed: {sell_order}")
-                    except InsufficientUTxOBalanceException:
-                        logger.info(f"Insufficient UTxOs. Await previous txs or add more funds")
-                    except Exception as e:
-                        log_exception(logger, "Error placing sell order", e)
+        utxos = get_utxo_cache().utxos(address)
+        
+        if not self.execute_batched(
+            bot, token_name, token_info, address, key_path,
+            buy_prices, sell_prices, utxos,
+        ):
+            self.execute_sequential(
+                bot, token_name, token_info, address, key_path,
+                buy_prices, sell_prices, utxos,
+            )
 
 
 class TrendFollowingStrategy(BaseStrategy):
@@ -572,15 +747,11 @@ class TrendFollowingStrategy(BaseStrategy):
     
     def execute(self, bot, token_name: str, token_info: dict, address: Address, key_path: str):
         """Execute trend-following strategy."""
-        policy_id, hexname, amount, decimals = (
-            token_info["policy_id"],
-            token_info["hexname"],
-            token_info["amount"],
-            token_info["decimals"],
-        )
+        policy_id, hexname = token_info["policy_id"], token_info["hexname"]
         
-        fetch_price(bot, token_name, policy_id, hexname)
-        self.update_mid_price(bot.price_data[token_name]["price"])
+        state = bot.token_states[token_name]
+        fetch_price_if_stale(bot, token_name, policy_id, hexname)
+        self.update_mid_price(state.price_data["price"])
         
         if self.mid_price is None:
             return
@@ -589,59 +760,13 @@ class TrendFollowingStrategy(BaseStrategy):
         buy_prices, sell_prices = self.calculate_order_prices()
         
         # Preselect UTxOs for the transactions
-        utxos = CONTEXT.utxos(address)
-        
-        # Cancel orders that are outside the price range
-        for order in bot.open_orders:
-            if self.check_if_cancel_order(bot, order, token_name):
-                try:
-                    canceled_order, utxos = cancel_order(order, address, key_path, utxos)
-                    bot.order_tracking[token_name]["canceled_orders"].update(canceled_order)
-                    del bot.order_tracking[token_name]["buy_orders"][order["txHash"]]
-                    del bot.order_tracking[token_name]["sell_orders"][order["txHash"]]
-                    save_order_tracking(bot, token_name)
-                    logger.info(f"Order {order['txHash']} canceled.")
-                except InsufficientUTxOBalanceException:
-                    logger.info(f"Insufficient UTxOs. Await previous txs or add more funds")
-                except Exception as e:
-                    log_exception(logger, "Error canceling order", e)
-        
-        # Place orders with trend bias
-        max_length = max(len(buy_prices), len(sell_prices))
-        for i in range(max_length):
-            if i < len(buy_prices):
-                price = buy_prices[i]
-                if price <= 0:
-                    continue
-                if self.check_if_buy(bot, token_name, price):
-                    try:
-                        buy_order, utxos = place_buy_order(
-                            token_name, policy_id, hexname, address, amount, decimals,
-                            price, key_path, utxos
-                        )
-                        bot.order_tracking[token_name]["buy_orders"].update(buy_order)
-                        save_order_tracking(bot, token_name)
-                        logger.info(f"Trend-following buy order placed: {buy_order}")
-                    except InsufficientUTxOBalanceException:
-                        logger.info(f"Insufficient UTxOs. Await previous txs or add more funds")
-                    except Exception as e:
-                        log_exception(logger, "Error placing buy order", e)
-            
-            if i < len(sell_prices):
-                price = sell_prices[i]
-                if price <= 0:
-                    continue
-                if self.check_if_sell(bot, token_name, price):
-                    try:
-                        sell_order, utxos = place_sell_order(
-                            token_name, policy_id, hexname, address, amount, decimals,
-                            price, key_path, utxos
-                        )
-                        bot.order_tracking[token_name]["sell_orders"].update(sell_order)
-                        save_order_tracking(bot, token_name)
-                        logger.info(f"Trend-following sell order placed: {sell_order}")
-                    except InsufficientUTxOBalanceException:
-                        logger.info(f"Insufficient UTxOs. Await previous txs or add more funds")
-                    except Exception as e:
-                        log_exception(logger, "Error placing sell order", e)
-
+        utxos = get_utxo_cache().utxos(address)
+        
+        if not self.execute_batched(
+            bot, token_name, token_info, address, key_path,
+            buy_prices, sell_prices, utxos,
+        ):
+            self.execute_sequential(
+                bot, token_name, token_info, address, key_path,
+                buy_prices, sell_prices, utxos,
+            )
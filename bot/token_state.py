@@ -0,0 +1,70 @@
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    # Only needed for annotations, importing them pulls in pycardano and numpy
+    from pycardano import Address
+
+    from bot.order_book import OrderBook
+
+
+class TokenState:
+    """
+    In-memory state of a single token handled by the bot.
+
+    Every token owns its own instance, so concurrently processed tokens never
+    read or overwrite each other's orders, prices, order book or tracking.
+    order_book holds the raw /orderbook entries per side, book the same
+    entries as sorted price levels for analytics, created by init_order_book.
+    """
+
+    __slots__ = (
+        "token_name",
+        "token_info",
+        "key_path",
+        "address",
+        "strategy",
+        "price_data",
+        "price_cycle",
+        "order_book",
+        "book",
+        "open_positions",
+        "open_orders",
+        "open_orders_by_side",
+        "matched_orders",
+        "canceled_orders",
+        "order_tracking",
+        "order_tracking_store",
+        "finalized_orders",
+        "inventory_log",
+    )
+
+    def __init__(
+        self,
+        token_name: str,
+        token_info: Dict,
+        key_path: Path,
+        address: "Address",
+        strategy,
+    ):
+        self.token_name = token_name
+        self.token_info = token_info
+        self.key_path = key_path
+        self.address = address
+        self.strategy = strategy
+        self.price_data: Dict = {}
+        self.price_cycle: Optional[int] = None
+        self.order_book: Dict[str, List] = {"Buy": [], "Sell": []}
+        self.book: Optional["OrderBook"] = None
+        self.open_positions: Dict = {}
+        self.open_orders: List[Dict] = []
+        self.open_orders_by_side: Dict[str, Dict[str, Dict]] = {"buy": {}, "sell": {}}
+        self.matched_orders: List[Dict] = []
+        self.canceled_orders: List[Dict] = []
+        self.order_tracking: Optional[Dict] = None
+        self.order_tracking_store = None
+        self.finalized_orders = None
+        self.inventory_log = None
+
+    def __repr__(self) -> str:
+        return f"TokenState({self.token_name}, address={self.address})"
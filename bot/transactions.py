@@ -1,4 +1,4 @@
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 
 from pycardano import (
     TransactionOutput,
@@ -9,9 +9,15 @@ from pycardano import (
     AuxiliaryData,
     Metadata,
     UTxO,
+    Datum,
+    DatumHash,
+    RawPlutusData,
+    Transaction,
+    PlutusV2Script,
+    InvalidTransactionException,
 )
 
-from configs.config import CONTEXT, DISABLE_TX
+from bot.chain_context import get_chain_context
 from configs.msw_connector_config import (
     CONTRACT_ADDRESS,
     MATCHMAKING_FEE,
@@ -19,23 +25,162 @@ from configs.msw_connector_config import (
     BASE_POLICY,
     BASE_TOKEN_NAME_HEX,
 )
-from bot.utils.utils import get_signing_info
+from bot.key_registry import get_key_registry
 from bot.utils.transaction_utils import (
     create_metadata_place_order,
+    create_metadata_place_orders,
     select_utxos_ada,
     select_utxos_multi_asset,
+    select_utxos_value,
     create_metadata_cancel_order,
     create_reedemer,
-    get_script,
-    remove_used_utxos,
+    remaining_utxos,
+    add_wallet_inputs,
+    submit_tx,
 )
-from bot.utils.datum_utils import create_order_datum
+from bot.utils.datum_utils import get_datum_template, OrderDatum
+from bot.utils.order_utils import order_key, get_order_key, get_tracked_order
 
 from bot.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+def create_buy_order_output(
+    policy_id: str,
+    hexname: str,
+    address: Address,
+    amount: int,
+    decimals: int,
+    price: int,
+) -> Tuple[TransactionOutput, OrderDatum, Dict, Dict]:
+    """Create the contract output of a buy order.
+
+    Returns:
+        Tuple[TransactionOutput, OrderDatum, Dict, Dict]: Output, datum,
+            metadata and local tracking data of the order
+    """
+    # Calculate total amount
+    total_amount_to_pay = int(amount / 10**decimals) * price
+
+    fees_and_deposit = MATCHMAKING_FEE + DEPOSIT
+    total_amount_to_send = total_amount_to_pay + fees_and_deposit
+
+    # Create metadata
+    metadata = create_metadata_place_order(
+        policy_id,
+        hexname,
+        BASE_POLICY,
+        BASE_TOKEN_NAME_HEX,
+        amount,
+        fees_and_deposit,
+        address,
+    )
+
+    # Create datum from the template of the wallet, pair and side
+    datum_template = get_datum_template(
+        address.payment_part.to_primitive().hex(),
+        address.staking_part.to_primitive().hex(),
+        policy_id,
+        hexname,
+        BASE_POLICY,
+        BASE_TOKEN_NAME_HEX,
+    )
+    datum = datum_template.datum(amount, fees_and_deposit)
+    datum_hash = datum_template.datum_hash(amount, fees_and_deposit)
+    output = TransactionOutput(
+        address=Address.decode(CONTRACT_ADDRESS),
+        amount=Value(total_amount_to_send),
+        datum_hash=datum_hash,
+    )
+    order_details = {
+        "fromTokenPolicy": BASE_POLICY,
+        "fromTokenHexname": BASE_TOKEN_NAME_HEX,
+        "fromAmount": total_amount_to_pay,
+        "toTokenPolicy": policy_id,
+        "toTokenHexname": hexname,
+        "toAmount": amount,
+        "attachedLvl": fees_and_deposit,
+        # Exact datum of the order, reused byte-for-byte when canceling
+        "datumHash": datum_hash.payload.hex(),
+        "datumCbor": datum.to_cbor_hex(),
+    }
+    return output, datum, metadata, order_details
+
+
+def create_sell_order_output(
+    policy_id: str,
+    hexname: str,
+    address: Address,
+    amount: int,
+    decimals: int,
+    price: int,
+) -> Tuple[TransactionOutput, OrderDatum, Dict, Dict]:
+    """Create the contract output of a sell order.
+
+    Returns:
+        Tuple[TransactionOutput, OrderDatum, Dict, Dict]: Output, datum,
+            metadata and local tracking data of the order
+    """
+    # Amount of ADA to ask for
+    total_amount_to_ask = int((amount / 10**decimals)) * price - MATCHMAKING_FEE
+
+    fees_and_deposit = MATCHMAKING_FEE + DEPOSIT
+
+    # Create metadata
+    metadata = create_metadata_place_order(
+        BASE_POLICY,
+        BASE_TOKEN_NAME_HEX,
+        policy_id,
+        hexname,
+        total_amount_to_ask,
+        fees_and_deposit,
+        address,
+    )
+
+    # Create datum from the template of the wallet, pair and side
+    datum_template = get_datum_template(
+        address.payment_part.to_primitive().hex(),
+        address.staking_part.to_primitive().hex(),
+        BASE_POLICY,
+        BASE_TOKEN_NAME_HEX,
+        policy_id,
+        hexname,
+    )
+    datum = datum_template.datum(total_amount_to_ask, fees_and_deposit)
+    datum_hash = datum_template.datum_hash(total_amount_to_ask, fees_and_deposit)
+    output = TransactionOutput(
+        address=Address.decode(CONTRACT_ADDRESS),
+        amount=Value.from_primitive(
+            [
+                fees_and_deposit,
+                {bytes.fromhex(policy_id): {bytes.fromhex(hexname): amount}},
+            ]
+        ),
+        datum_hash=datum_hash,
+    )
+    order_details = {
+        "fromTokenPolicy": policy_id,
+        "fromTokenHexname": hexname,
+        "fromAmount": amount,
+        "toTokenPolicy": BASE_POLICY,
+        "toTokenHexname": BASE_TOKEN_NAME_HEX,
+        "toAmount": total_amount_to_ask + MATCHMAKING_FEE,
+        "attachedLvl": fees_and_deposit,
+        # Exact datum of the order, reused byte-for-byte when canceling
+        "datumHash": datum_hash.payload.hex(),
+        "datumCbor": datum.to_cbor_hex(),
+    }
+    return output, datum, metadata, order_details
+
+
+def add_order_output(
+    builder: TransactionBuilder, output: TransactionOutput, datum: OrderDatum
+):
+    """Add an order output with its datum in the witness set."""
+    builder.add_output(output, datum=datum, add_datum_to_witness=True)
+
+
 def place_buy_order(
     token_name: str,
     policy_id: str,
@@ -61,78 +206,33 @@ def place_buy_order(
     Returns:
         Dict[str, Dict[str, str]]: Transaction data
     """
-    _, payment_skey, _ = get_signing_info(key_path)
+    _, payment_skey, _ = get_key_registry().signing_info(key_path)
 
-    # Create builder and add input address
-    builder = TransactionBuilder(CONTEXT)
-    builder.add_input_address(address)
+    # Create builder
+    builder = TransactionBuilder(get_chain_context())
 
-    # Calculate total amount
-    total_amount_to_pay = int(amount / 10**decimals) * price
-
-    fees_and_deposit = MATCHMAKING_FEE + DEPOSIT
-    total_amount_to_send = total_amount_to_pay + fees_and_deposit
+    output, datum, metadata, order_details = create_buy_order_output(
+        policy_id, hexname, address, amount, decimals, price
+    )
     logger.info(f"Creating buy order for {token_name} with price {price}")
     # Select and add UTXOs to the transaction
     selected_utxos, _ = select_utxos_ada(
-        address, total_amount_to_send, preselected_utxos
+        address, output.amount.coin, preselected_utxos
     )
-    for utxo in selected_utxos:
-        builder.add_input(utxo)
+    add_wallet_inputs(builder, address, selected_utxos)
 
-    # Create metadata
-    metadata = create_metadata_place_order(
-        policy_id,
-        hexname,
-        BASE_POLICY,
-        BASE_TOKEN_NAME_HEX,
-        amount,
-        fees_and_deposit,
-        address,
-    )
     # Add metadata to the transaction
     auxiliary_data = AuxiliaryData(data=Metadata(metadata))
     builder.auxiliary_data = auxiliary_data
 
-    # Create Datum
-    datum = create_order_datum(
-        address.payment_part.to_primitive().hex(),
-        address.staking_part.to_primitive().hex(),
-        policy_id,
-        hexname,
-        BASE_POLICY,
-        BASE_TOKEN_NAME_HEX,
-        amount,
-        fees_and_deposit,
-    )
     # Add outputs
-    builder.add_output(
-        TransactionOutput(
-            address=Address.decode(CONTRACT_ADDRESS),
-            amount=Value(total_amount_to_send),
-            datum_hash=datum.hash(),
-        ),
-        datum=datum,
-        add_datum_to_witness=True,
-    )
+    add_order_output(builder, output, datum)
 
     # Create final signed transaction
     signed_tx = builder.build_and_sign([payment_skey], change_address=address)
-    txHash = CONTEXT.submit_tx(signed_tx) if not DISABLE_TX else "Buy_test"
-    return {
-        txHash: {
-            "fromTokenPolicy": BASE_POLICY,
-            "fromTokenHexname": BASE_TOKEN_NAME_HEX,
-            "fromAmount": total_amount_to_pay,
-            "toTokenPolicy": policy_id,
-            "toTokenHexname": hexname,
-            "toAmount": amount,
-            "attachedLvl": fees_and_deposit,
-        }
-    }, (
-        remove_used_utxos(preselected_utxos, selected_utxos)
-        if preselected_utxos
-        else None
+    txHash = submit_tx(signed_tx, address, "Buy_test")
+    return {txHash: order_details}, remaining_utxos(
+        address, preselected_utxos, selected_utxos
     )
 
 
@@ -161,152 +261,165 @@ def place_sell_order(
     Returns:
         Dict[str, Dict[str, str]]: Transaction data
     """
-    _, payment_skey, _ = get_signing_info(key_path)
+    _, payment_skey, _ = get_key_registry().signing_info(key_path)
 
-    # Create builder and add input address
-    builder = TransactionBuilder(CONTEXT)
-    builder.add_input_address(address)
+    # Create builder
+    builder = TransactionBuilder(get_chain_context())
 
-    # Amount of ADA to ask for
-    total_amount_to_ask = int((amount / 10**decimals)) * price - MATCHMAKING_FEE
-
-    fees_and_deposit = MATCHMAKING_FEE + DEPOSIT
+    output, datum, metadata, order_details = create_sell_order_output(
+        policy_id, hexname, address, amount, decimals, price
+    )
     logger.info(f"Creating Sell order for {amount} of {token_name} with price {price}")
 
     # Select and add UTXOs to the transaction
     selected_utxos, _ = select_utxos_multi_asset(
-        address, fees_and_deposit, policy_id, token_name, amount, preselected_utxos
-    )
-    for utxo in selected_utxos:
-        builder.add_input(utxo)
-
-    # Create metadata
-    metadata = create_metadata_place_order(
-        BASE_POLICY,
-        BASE_TOKEN_NAME_HEX,
+        address,
+        output.amount.coin,
         policy_id,
         hexname,
-        total_amount_to_ask,
-        fees_and_deposit,
-        address,
+        amount,
+        preselected_utxos,
     )
+    add_wallet_inputs(builder, address, selected_utxos)
 
     # Add metadata to the transaction
     auxiliary_data = AuxiliaryData(data=Metadata(metadata))
     builder.auxiliary_data = auxiliary_data
 
-    # Create Datum
-    datum = create_order_datum(
-        address.payment_part.to_primitive().hex(),
-        address.staking_part.to_primitive().hex(),
-        BASE_POLICY,
-        BASE_TOKEN_NAME_HEX,
-        policy_id,
-        hexname,
-        total_amount_to_ask,
-        fees_and_deposit,
-    )
-
     # Add outputs
-    builder.add_output(
-        TransactionOutput(
-            address=Address.decode(CONTRACT_ADDRESS),
-            amount=Value.from_primitive(
-                [
-                    fees_and_deposit,
-                    {
-                        bytes.fromhex(f"{policy_id}"): {
-                            bytes(token_name, "utf-8"): amount
-                        }
-                    },
-                ]
-            ),
-            datum_hash=datum.hash(),
-        ),
-        datum=datum,
-        add_datum_to_witness=True,
-    )
+    add_order_output(builder, output, datum)
 
     # Create final signed transaction
     signed_tx = builder.build_and_sign([payment_skey], change_address=address)
-    txHash = CONTEXT.submit_tx(signed_tx) if not DISABLE_TX else "Sell_test"
-    return {
-        txHash: {
-            "fromTokenPolicy": policy_id,
-            "fromTokenHexname": hexname,
-            "fromAmount": amount,
-            "toTokenPolicy": BASE_POLICY,
-            "toTokenHexname": BASE_TOKEN_NAME_HEX,
-            "toAmount": total_amount_to_ask + MATCHMAKING_FEE,
-            "attachedLvl": fees_and_deposit,
-        }
-    }, (
-        remove_used_utxos(preselected_utxos, selected_utxos)
-        if preselected_utxos
-        else None
+    txHash = submit_tx(signed_tx, address, "Sell_test")
+    return {txHash: order_details}, remaining_utxos(
+        address, preselected_utxos, selected_utxos
     )
 
 
-def cancel_order(
-    order: Dict,
+def place_orders(
+    orders: List[Dict],
     address: Address,
     key_path: str,
     preselected_utxos: Optional[List] = None,
-) -> Dict[str, Dict[str, str]]:
-    """Cancel order.
+) -> Tuple[Dict[str, Dict[str, Dict]], Optional[List]]:
+    """Create and place several orders on exchange in a single transaction.
 
     Args:
-        order (Dict): Order to cancel fetched by MuesliSwap orders API
+        orders (List[Dict]): Orders to place, each with the keys side ("buy" or
+            "sell"), token_name, policy_id, hexname, amount, decimals and price
         address (Address): Bot address
         key_path (str): Path to the signing key
 
     Returns:
-        Dict[str, Dict[str, str]]: Transaction data
+        Tuple[Dict[str, Dict[str, Dict]], Optional[List]]: Placed orders per
+            side keyed by order key, and the UTxOs left for the next transaction
+
+    Raises:
+        InvalidTransactionException: If the transaction exceeds the max tx size
     """
-    _, payment_skey, _ = get_signing_info(key_path)
+    _, payment_skey, _ = get_key_registry().signing_info(key_path)
 
-    # Create builder and add input address
-    builder = TransactionBuilder(CONTEXT)
-    builder.add_input_address(address)
+    # Create builder
+    builder = TransactionBuilder(get_chain_context())
 
-    # We only need the deposit for canceling
-    total_amount = DEPOSIT
+    order_outputs, total_value = create_order_outputs(orders, address)
 
     # Select and add UTXOs to the transaction
-    selected_utxos, _ = select_utxos_ada(address, total_amount, preselected_utxos)
-    for utxo in selected_utxos:
-        builder.add_input(utxo)
+    selected_utxos, _ = select_utxos_value(address, total_value, preselected_utxos)
+    add_wallet_inputs(builder, address, selected_utxos)
 
-    # Create metadata
-    metadata = create_metadata_cancel_order()
+    builder.auxiliary_data = AuxiliaryData(
+        data=Metadata(create_orders_metadata(order_outputs, address))
+    )
 
-    # Add metadata to the transaction
-    auxiliary_data = AuxiliaryData(data=Metadata(metadata))
-    builder.auxiliary_data = auxiliary_data
+    # Add outputs, the order outputs come first so their index is known
+    for _, output, datum, _, _ in order_outputs:
+        add_order_output(builder, output, datum)
+
+    # Create final signed transaction
+    signed_tx = builder.build_and_sign([payment_skey], change_address=address)
+    txHash = submit_tx(signed_tx, address, "Batch_test")
+    return placed_order_details(order_outputs, txHash), remaining_utxos(
+        address, preselected_utxos, selected_utxos
+    )
 
+
+def create_order_outputs(
+    orders: List[Dict], address: Address
+) -> Tuple[List[Tuple], Value]:
+    """Create the contract outputs of several orders.
+
+    Returns:
+        Tuple[List[Tuple], Value]: (side, output, datum, metadata, tracking
+            data) of each order, and the total value locked in the outputs
+    """
+    total_value = Value()
+    order_outputs = []
+    for order in orders:
+        create_output = (
+            create_buy_order_output
+            if order["side"] == "buy"
+            else create_sell_order_output
+        )
+        output, datum, metadata, order_details = create_output(
+            order["policy_id"],
+            order["hexname"],
+            address,
+            order["amount"],
+            order["decimals"],
+            order["price"],
+        )
+        logger.info(
+            f"Creating {order['side']} order for {order['amount']} of "
+            f"{order['token_name']} with price {order['price']}"
+        )
+        total_value += output.amount
+        order_outputs.append((order["side"], output, datum, metadata, order_details))
+    return order_outputs, total_value
+
+
+def create_orders_metadata(order_outputs: List[Tuple], address: Address) -> Dict:
+    """A single order keeps its full metadata, a batch only the common fields."""
+    if len(order_outputs) == 1:
+        return order_outputs[0][3]
+    return create_metadata_place_orders(address)
+
+
+def placed_order_details(
+    order_outputs: List[Tuple], tx_hash: str
+) -> Dict[str, Dict[str, Dict]]:
+    """Local tracking data per side of the orders placed in a transaction."""
+    placed_orders = {"buy": {}, "sell": {}}
+    for output_idx, (side, _, _, _, order_details) in enumerate(order_outputs):
+        placed_orders[side][order_key(tx_hash, output_idx)] = order_details
+    return placed_orders
+
+
+def create_cancel_input(
+    order: Dict, address: Address, order_tracking: Optional[Dict] = None
+) -> Tuple[UTxO, Datum]:
+    """Recreate the script UTxO and datum of an order to cancel.
+
+    The datum stored in the local order tracking when the order was placed is
+    reused as is, otherwise it is rebuilt from the order.
+
+    Args:
+        order (Dict): Order to cancel fetched by MuesliSwap orders API
+        address (Address): Bot address
+        order_tracking (Dict): Local order tracking of the token
+
+    Returns:
+        Tuple[UTxO, Datum]: Script UTxO of the order and its datum
+    """
     attachedLvl = int(order["attachedLvl"])
-    if (
-        order["fromToken"]["address"]["policyId"] == BASE_POLICY
-        and order["fromToken"]["address"]["name"] == BASE_TOKEN_NAME_HEX
-    ):
-        toAmount = int(order["toAmount"])
+    tracked_order = get_tracked_order(order_tracking, order) if order_tracking else None
+    if tracked_order and "datumCbor" in tracked_order:
+        datum = RawPlutusData.from_cbor(bytes.fromhex(tracked_order["datumCbor"]))
+        datum_hash = DatumHash(bytes.fromhex(tracked_order["datumHash"]))
     else:
-        toAmount = int(order["toAmount"]) - MATCHMAKING_FEE
+        datum, datum_hash = rebuild_order_datum(order, address)
 
-    # Recreate datum
-    datum = create_order_datum(
-        address.payment_part.to_primitive().hex(),
-        address.staking_part.to_primitive().hex(),
-        order["toToken"]["address"]["policyId"],
-        order["toToken"]["address"]["name"],
-        order["fromToken"]["address"]["policyId"],
-        order["fromToken"]["address"]["name"],
-        toAmount,
-        int(order["attachedLvl"]),
-    )
-
-    redeemer = create_reedemer()
-    script = get_script("script.cbor")
     if (
         order["fromToken"]["address"]["policyId"] == BASE_POLICY
         and order["fromToken"]["address"]["name"] == BASE_TOKEN_NAME_HEX
@@ -317,48 +430,88 @@ def cancel_order(
             [
                 attachedLvl,
                 {
-                    bytes.fromhex(f"{ order['fromToken']['address']['policyId']}"): {
-                        order["fromToken"]["address"]["name"]: int(order["fromAmount"])
+                    bytes.fromhex(order["fromToken"]["address"]["policyId"]): {
+                        bytes.fromhex(order["fromToken"]["address"]["name"]): int(
+                            order["fromAmount"]
+                        )
                     }
                 },
             ]
         )
 
     # Create script utxo to spend
-    tx_in = TransactionInput.from_primitive([order["txHash"], order["outputIdx"]])
+    tx_in = TransactionInput.from_primitive([order["txHash"], int(order["outputIdx"])])
     utxo_to_spend = UTxO(
         tx_in,
         TransactionOutput(
             CONTRACT_ADDRESS,
             amount=tx_out_amount,
-            datum_hash=datum.hash(),
+            datum_hash=datum_hash,
         ),
     )
+    return utxo_to_spend, datum
 
-    # Add outputs
+
+def rebuild_order_datum(order: Dict, address: Address) -> Tuple[OrderDatum, DatumHash]:
+    """Recreate the datum of an order fetched by MuesliSwap orders API."""
+    attachedLvl = int(order["attachedLvl"])
+    if (
+        order["fromToken"]["address"]["policyId"] == BASE_POLICY
+        and order["fromToken"]["address"]["name"] == BASE_TOKEN_NAME_HEX
+    ):
+        toAmount = int(order["toAmount"])
+    else:
+        toAmount = int(order["toAmount"]) - MATCHMAKING_FEE
+
+    # Recreate datum from the template of the wallet, pair and side
+    datum_template = get_datum_template(
+        address.payment_part.to_primitive().hex(),
+        address.staking_part.to_primitive().hex(),
+        order["toToken"]["address"]["policyId"],
+        order["toToken"]["address"]["name"],
+        order["fromToken"]["address"]["policyId"],
+        order["fromToken"]["address"]["name"],
+    )
+    return (
+        datum_template.datum(toAmount, attachedLvl),
+        datum_template.datum_hash(toAmount, attachedLvl),
+    )
+
+
+def add_cancel_input(
+    builder: TransactionBuilder,
+    order: Dict,
+    address: Address,
+    script: PlutusV2Script,
+    return_funds: bool = True,
+    order_tracking: Optional[Dict] = None,
+):
+    """Spend the script UTxO of an order and return its funds to the bot.
+
+    Without return_funds the released funds are left to the other outputs and
+    the change of the transaction.
+    """
+    utxo_to_spend, datum = create_cancel_input(order, address, order_tracking)
     builder.add_script_input(
         utxo_to_spend,
         script=script,
         datum=datum,
-        redeemer=redeemer,
+        redeemer=create_reedemer(),
     )
-
-    # Return this to the bot
-    builder.add_output(
-        TransactionOutput(
-            address=address,
-            amount=tx_out_amount,
+    if return_funds:
+        builder.add_output(
+            TransactionOutput(
+                address=address,
+                amount=utxo_to_spend.output.amount,
+            )
         )
-    )
 
-    # Create final signed transaction
-    builder.required_signers = [address.payment_part]
-    signed_tx = builder.build_and_sign([payment_skey], change_address=address)
-    txHash = CONTEXT.submit_tx(signed_tx) if not DISABLE_TX else "Cancel_test"
 
+def canceled_order_details(order: Dict, cancel_tx_hash: str) -> Dict[str, Dict]:
+    """Local tracking data of a canceled order."""
     return {
-        order["txHash"]: {
-            "cancel_txHash": txHash,
+        get_order_key(order): {
+            "cancel_txHash": cancel_tx_hash,
             "toTokenPolicy": order["toToken"]["address"]["policyId"],
             "toTokenHexname": order["toToken"]["address"]["name"],
             "toAmount": int(order["toAmount"]),
@@ -367,8 +520,199 @@ def cancel_order(
             "fromAmount": int(order["toAmount"]),
             "attachedLvl:": order["attachedLvl"],
         }
-    }, (
-        remove_used_utxos(preselected_utxos, selected_utxos)
-        if preselected_utxos
-        else None
+    }
+
+
+class TransactionTooLargeException(InvalidTransactionException):
+    """The transaction exceeds the max tx size or execution units."""
+
+
+def is_tx_too_large(e: Exception) -> bool:
+    """Whether a failed build exceeded the max tx size or execution units."""
+    # pycardano raises a plain InvalidTransactionException for the tx size
+    return isinstance(e, TransactionTooLargeException) or (
+        isinstance(e, InvalidTransactionException) and "exceeds the max limit" in str(e)
     )
+
+
+def check_execution_units(signed_tx: Transaction):
+    """Raise if the scripts of the transaction exceed the execution unit limits.
+
+    Raises:
+        TransactionTooLargeException: If the max tx execution units are exceeded
+    """
+    redeemers = signed_tx.transaction_witness_set.redeemer or []
+    mem = sum(redeemer.ex_units.mem for redeemer in redeemers)
+    steps = sum(redeemer.ex_units.steps for redeemer in redeemers)
+    protocol_param = get_chain_context().protocol_param
+    if mem > protocol_param.max_tx_ex_mem or steps > protocol_param.max_tx_ex_steps:
+        raise TransactionTooLargeException(
+            f"Transaction exceeds the max execution units: mem {mem}, steps {steps}"
+        )
+
+
+def cancel_order(
+    order: Dict,
+    address: Address,
+    key_path: str,
+    preselected_utxos: Optional[List] = None,
+    order_tracking: Optional[Dict] = None,
+) -> Dict[str, Dict[str, str]]:
+    """Cancel order.
+
+    Args:
+        order (Dict): Order to cancel fetched by MuesliSwap orders API
+        address (Address): Bot address
+        key_path (str): Path to the signing key
+        order_tracking (Dict): Local order tracking holding the order's datum
+
+    Returns:
+        Dict[str, Dict[str, str]]: Transaction data
+    """
+    return cancel_orders([order], address, key_path, preselected_utxos, order_tracking)
+
+
+def cancel_orders(
+    orders: List[Dict],
+    address: Address,
+    key_path: str,
+    preselected_utxos: Optional[List] = None,
+    order_tracking: Optional[Dict] = None,
+) -> Tuple[Dict[str, Dict[str, str]], Optional[List]]:
+    """Cancel several orders in a single transaction.
+
+    Args:
+        orders (List[Dict]): Orders to cancel fetched by MuesliSwap orders API
+        address (Address): Bot address
+        key_path (str): Path to the signing key
+        order_tracking (Dict): Local order tracking holding the orders' datums
+
+    Returns:
+        Tuple[Dict[str, Dict[str, str]], Optional[List]]: Canceled orders keyed
+            by order key, and the UTxOs left for the next transaction
+
+    Raises:
+        InvalidTransactionException: If the transaction exceeds the max tx size
+            or the max execution units
+    """
+    _, payment_skey, _ = get_key_registry().signing_info(key_path)
+
+    # Create builder
+    builder = TransactionBuilder(get_chain_context())
+
+    # We only need the deposit for canceling
+    total_amount = DEPOSIT
+
+    # Select and add UTXOs to the transaction
+    selected_utxos, _ = select_utxos_ada(address, total_amount, preselected_utxos)
+    add_wallet_inputs(builder, address, selected_utxos)
+
+    # Create metadata
+    metadata = create_metadata_cancel_order()
+
+    # Add metadata to the transaction
+    auxiliary_data = AuxiliaryData(data=Metadata(metadata))
+    builder.auxiliary_data = auxiliary_data
+
+    # Spend all order UTxOs with the same script
+    script = get_key_registry().script()
+    for order in orders:
+        add_cancel_input(
+            builder, order, address, script, order_tracking=order_tracking
+        )
+
+    # Create final signed transaction
+    builder.required_signers = [address.payment_part]
+    signed_tx = builder.build_and_sign([payment_skey], change_address=address)
+    check_execution_units(signed_tx)
+    txHash = submit_tx(signed_tx, address, "Cancel_test")
+
+    canceled_orders = {}
+    for order in orders:
+        canceled_orders.update(canceled_order_details(order, txHash))
+    return canceled_orders, remaining_utxos(address, preselected_utxos, selected_utxos)
+
+
+def requote_orders(
+    stale_orders: List[Dict],
+    orders: List[Dict],
+    address: Address,
+    key_path: str,
+    preselected_utxos: Optional[List] = None,
+    order_tracking: Optional[Dict] = None,
+) -> Tuple[Dict[str, Dict[str, Dict]], Optional[List]]:
+    """Cancel orders and place new ones in a single transaction.
+
+    The funds released by the canceled orders directly fund the new orders, so
+    a quote moves within one block instead of waiting for the cancel first.
+
+    Args:
+        stale_orders (List[Dict]): Orders to cancel fetched by MuesliSwap orders API
+        orders (List[Dict]): Orders to place, see place_orders
+        address (Address): Bot address
+        key_path (str): Path to the signing key
+        order_tracking (Dict): Local order tracking holding the orders' datums
+
+    Returns:
+        Tuple[Dict[str, Dict[str, Dict]], Optional[List]]: Placed orders per
+            side and canceled orders ("canceled") keyed by order key, and the
+            UTxOs left for the next transaction
+
+    Raises:
+        InvalidTransactionException: If the transaction exceeds the max tx size
+            or the max execution units
+    """
+    if not stale_orders:
+        placed_orders, utxos = place_orders(
+            orders, address, key_path, preselected_utxos
+        )
+        return {**placed_orders, "canceled": {}}, utxos
+    if not orders:
+        canceled_orders, utxos = cancel_orders(
+            stale_orders, address, key_path, preselected_utxos, order_tracking
+        )
+        return {"buy": {}, "sell": {}, "canceled": canceled_orders}, utxos
+
+    _, payment_skey, _ = get_key_registry().signing_info(key_path)
+
+    # Create builder
+    builder = TransactionBuilder(get_chain_context())
+
+    order_outputs, _ = create_order_outputs(orders, address)
+
+    # The canceled orders fund the new ones, the wallet covers the collateral
+    # and any difference from the potential inputs
+    selected_utxos, _ = select_utxos_ada(address, DEPOSIT, preselected_utxos)
+    add_wallet_inputs(builder, address, selected_utxos)
+
+    builder.auxiliary_data = AuxiliaryData(
+        data=Metadata(create_orders_metadata(order_outputs, address))
+    )
+
+    # Add outputs, the order outputs come first so their index is known
+    for _, output, datum, _, _ in order_outputs:
+        add_order_output(builder, output, datum)
+
+    # Spend all stale order UTxOs with the same script
+    script = get_key_registry().script()
+    for order in stale_orders:
+        add_cancel_input(
+            builder,
+            order,
+            address,
+            script,
+            return_funds=False,
+            order_tracking=order_tracking,
+        )
+
+    # Create final signed transaction
+    builder.required_signers = [address.payment_part]
+    signed_tx = builder.build_and_sign([payment_skey], change_address=address)
+    check_execution_units(signed_tx)
+    txHash = submit_tx(signed_tx, address, "Requote_test")
+
+    requoted_orders = placed_order_details(order_outputs, txHash)
+    requoted_orders["canceled"] = {}
+    for order in stale_orders:
+        requoted_orders["canceled"].update(canceled_order_details(order, txHash))
+    return requoted_orders, remaining_utxos(address, preselected_utxos, selected_utxos)
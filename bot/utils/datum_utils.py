@@ -1,9 +1,14 @@
-from typing import ClassVar, Union
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import ClassVar, Tuple, Union
 from dataclasses import dataclass
 
-from pycardano import PlutusData
+from pycardano import DatumHash, PlutusData
 from configs.msw_connector_config import ALLOW_PARTIAL_MATCH
 
+DATUM_CACHE_SIZE = 256  # Memoized datums per wallet, pair and side
+
 
 def from_hex(hex_string: str) -> bytes:
     return bytes.fromhex(hex_string)
@@ -64,6 +69,95 @@ class OrderDatum(PlutusData):
     CONSTR_ID: ClassVar[int] = 0
 
 
+class OrderDatumTemplate:
+    """
+    Order datum parts that are fixed for a wallet, pair and side.
+
+    Only the buy amount and the attached lovelace vary between orders, so the
+    address object and the currency bytes are built once. Datums and their
+    hashes are memoized for the most recent amounts, so canceling an order we
+    placed reuses its datum hash.
+    """
+
+    def __init__(
+        self,
+        oCreatorPubKeyHash,
+        oCreatorStakingKeyHash,
+        oBuyCurrency,
+        oBuyToken,
+        oSellCurrency,
+        oSellToken,
+    ):
+        pub_key_hash_obj = PubKeyHash(pub_key_hash=from_hex(oCreatorPubKeyHash))
+        staking_cred_hash_obj = StakingCredentialHash(
+            staking_cred_hash=from_hex(oCreatorStakingKeyHash)
+        )
+        staking_wrapper = StakingOuter(
+            staking_inner=StakingInner(staking_cred_hash=staking_cred_hash_obj)
+        )
+        self.address_object = AddressObject(
+            pub_key_hash=pub_key_hash_obj, staking_outer=staking_wrapper
+        )
+        self.buy_currency = from_hex(oBuyCurrency)
+        self.buy_token = from_hex(oBuyToken)
+        self.sell_currency = from_hex(oSellCurrency)
+        self.sell_token = from_hex(oSellToken)
+        self._datums: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _memoized(self, oBuyAmount, lovelaceAttached) -> Tuple[OrderDatum, DatumHash]:
+        key = (int(oBuyAmount), int(lovelaceAttached))
+        with self._lock:
+            if key in self._datums:
+                self._datums.move_to_end(key)
+                return self._datums[key]
+        order_fields = OrderFields(
+            address_object=self.address_object,
+            buy_currency=self.buy_currency,
+            buy_token=self.buy_token,
+            sell_currency=self.sell_currency,
+            sell_token=self.sell_token,
+            buy_amount=key[0],
+            allow_partial=BoolField(),
+            lovelace_attached=key[1],
+        )
+        order_datum = OrderDatum(fields=order_fields)
+        entry = (order_datum, order_datum.hash())
+        with self._lock:
+            self._datums[key] = entry
+            if len(self._datums) > DATUM_CACHE_SIZE:
+                self._datums.popitem(last=False)
+        return entry
+
+    def datum(self, oBuyAmount, lovelaceAttached) -> OrderDatum:
+        return self._memoized(oBuyAmount, lovelaceAttached)[0]
+
+    def datum_hash(self, oBuyAmount, lovelaceAttached) -> DatumHash:
+        return self._memoized(oBuyAmount, lovelaceAttached)[1]
+
+
+@lru_cache(maxsize=None)
+def get_datum_template(
+    oCreatorPubKeyHash,
+    oCreatorStakingKeyHash,
+    oBuyCurrency,
+    oBuyToken,
+    oSellCurrency,
+    oSellToken,
+) -> OrderDatumTemplate:
+    """
+    Return the datum template of a wallet, pair and side.
+    """
+    return OrderDatumTemplate(
+        oCreatorPubKeyHash,
+        oCreatorStakingKeyHash,
+        oBuyCurrency,
+        oBuyToken,
+        oSellCurrency,
+        oSellToken,
+    )
+
+
 def create_order_datum(
     oCreatorPubKeyHash,
     oCreatorStakingKeyHash,
@@ -74,28 +168,11 @@ def create_order_datum(
     oBuyAmount,
     lovelaceAttached,
 ) -> OrderDatum:
-
-    pub_key_hash_obj = PubKeyHash(pub_key_hash=from_hex(oCreatorPubKeyHash))
-    staking_cred_hash_obj = StakingCredentialHash(
-        staking_cred_hash=from_hex(oCreatorStakingKeyHash)
-    )
-    staking_wrapper = StakingOuter(
-        staking_inner=StakingInner(staking_cred_hash=staking_cred_hash_obj)
-    )
-    address_object = AddressObject(
-        pub_key_hash=pub_key_hash_obj, staking_outer=staking_wrapper
-    )
-
-    allow_partial_obj = BoolField()
-    order_fields = OrderFields(
-        address_object=address_object,
-        buy_currency=from_hex(oBuyCurrency),
-        buy_token=from_hex(oBuyToken),
-        sell_currency=from_hex(oSellCurrency),
-        sell_token=from_hex(oSellToken),
-        buy_amount=int(oBuyAmount),
-        allow_partial=allow_partial_obj,
-        lovelace_attached=int(lovelaceAttached),
-    )
-    order_datum = OrderDatum(fields=order_fields)
-    return order_datum
+    return get_datum_template(
+        oCreatorPubKeyHash,
+        oCreatorStakingKeyHash,
+        oBuyCurrency,
+        oBuyToken,
+        oSellCurrency,
+        oSellToken,
+    ).datum(oBuyAmount, lovelaceAttached)
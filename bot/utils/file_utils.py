@@ -0,0 +1,24 @@
+import os
+from pathlib import Path
+from typing import Callable, TextIO
+
+
+def atomic_write(path: Path, write: Callable[[TextIO], None]):
+    """
+    Write a file with write(file) so that a crash leaves either the previous
+    or the new content on disk, never a partial file.
+
+    The content goes to a temporary file that is fsynced and renamed over
+    path, then the directory is fsynced to persist the rename.
+    """
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w") as file:
+        write(file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+    dir_fd = os.open(path.parent, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
@@ -1,13 +1,26 @@
 import logging
+import threading
 from datetime import datetime
 
 from configs.config import LOGS_DIR, DEBUG
 
+_configured = False
+_configure_lock = threading.Lock()
+
 
 def configure_logger():
     """
-    Configure the logger.
+    Configure the logger, only the first call has an effect.
     """
+    global _configured
+    with _configure_lock:
+        if _configured:
+            return
+        _configure_logger()
+        _configured = True
+
+
+def _configure_logger():
     # Create logs directory if not exists
     LOGS_DIR.mkdir(exist_ok=True)
 
@@ -31,13 +44,12 @@ def configure_logger():
 def get_logger(name: str) -> logging.Logger:
     """
     Returns logger with the given name.
+
+    Getting a logger has no side effects, the handlers are set up once by
+    configure_logger() during bootstrap.
     """
     # Get logger
     logger = logging.getLogger(name)
-
-    # Configure logger
-    configure_logger()
-
     logger.propagate = True
     return logger
 
@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, Optional, Tuple
 
 from configs.msw_connector_config import (
     BASE_POLICY,
@@ -43,12 +43,46 @@ def get_order_type(order: Dict) -> str:
         raise ValueError(f"Invalid order format: {order}")
 
 
+def order_key(tx_hash: str, output_idx: int = 0) -> str:
+    """
+    Key of an order in the local tracking.
+
+    Orders are keyed by their txHash. Orders that are not the first output of
+    their transaction (i.e. batched orders) get the output index appended.
+    """
+    return tx_hash if output_idx == 0 else f"{tx_hash}#{output_idx}"
+
+
+def get_order_key(order: Dict) -> str:
+    """
+    Get the local tracking key of an order fetched from the API.
+    """
+    return order_key(order["txHash"], int(order.get("outputIdx", 0)))
+
+
+def order_key_tx_hash(key: str) -> str:
+    """
+    Get the txHash from a local tracking key.
+    """
+    return key.split("#")[0]
+
+
+def get_tracked_order(order_tracking: Dict, order: Dict) -> Optional[Dict]:
+    """
+    Get the local tracking data of an order fetched from the API.
+    """
+    key = get_order_key(order)
+    return order_tracking["buy_orders"].get(key) or order_tracking["sell_orders"].get(
+        key
+    )
+
+
 def format_order(order: Dict) -> Dict:
     """
     Format the order for local storage.
     """
     return {
-        order["txHash"]: {
+        get_order_key(order): {
             "fromTokenPolicy": order["fromToken"]["address"]["policyId"],
             "fromTokenHexname": order["fromToken"]["address"]["name"],
             "fromAmount": order["fromAmount"],
@@ -60,3 +94,14 @@ def format_order(order: Dict) -> Dict:
             "finalizedAt": order["finalizedAt"],
         }
     }
+
+
+def get_order_pair(order: Dict) -> Tuple[str, str]:
+    """
+    Get the (policy id, hexname) of the non-base token traded by the order.
+    """
+    if get_order_type(order) == "buy":
+        token = order["toToken"]["address"]
+    else:
+        token = order["fromToken"]["address"]
+    return token["policyId"], token["name"]
@@ -1,10 +1,21 @@
 from typing import Dict, Optional, List
-from pycardano import TransactionOutput, Address, PlutusData, Redeemer, PlutusV2Script
+from pycardano import (
+    TransactionOutput,
+    Address,
+    PlutusData,
+    Redeemer,
+    PlutusV2Script,
+    Transaction,
+    TransactionBuilder,
+    Value,
+)
 
 from pycardano.coinselection import LargestFirstSelector
 
-from configs.config import CONTEXT, CONTRACT_DIR
+from configs.config import CONTRACT_DIR, DISABLE_TX
 from configs.msw_connector_config import METADATA, ALLOW_PARTIAL_MATCH
+from bot.chain_context import get_chain_context
+from bot.utxo_cache import get_utxo_cache
 
 
 class CancelDatum(PlutusData):
@@ -37,6 +48,21 @@ def create_metadata_place_order(
     }
 
 
+def create_metadata_place_orders(address: Address) -> dict:
+    """
+    Create metadata for a transaction placing several orders.
+
+    The order fields only describe a single order, the orders themselves are
+    defined by the datums in the witness set.
+    """
+    return {
+        METADATA["TRANSACTION_MESSAGE"]: "{'msg': ['MuesliSwap Place Order']}",
+        METADATA["ORDER_CREATOR_ADDRESS"]: "0x"
+        + address.payment_part.to_primitive().hex(),
+        METADATA["PARTIAL_MATCH_ALLOWED"]: int(ALLOW_PARTIAL_MATCH),
+    }
+
+
 def create_metadata_cancel_order() -> Dict[str, str]:
     """
     Create metadata for the transaction.
@@ -68,10 +94,10 @@ def select_utxos_ada(
     if preselected_utxos:
         utxos = preselected_utxos
     else:
-        utxos = CONTEXT.utxos(address)
+        utxos = get_utxo_cache().utxos(address)
     request = [TransactionOutput.from_primitive([encoded_address, amount])]
     selector = LargestFirstSelector()
-    selected, change = selector.select(utxos, request, CONTEXT)
+    selected, change = selector.select(utxos, request, get_chain_context())
     return selected, change
 
 
@@ -79,18 +105,18 @@ def select_utxos_multi_asset(
     address: Address,
     ada_amount: int,
     policy_id: str,
-    token_name: str,
+    hexname: str,
     token_amount: int,
     preselected_utxos: Optional[List] = None,
 ):
     """
-    Select UTXOs for ADA and token.
+    Select UTXOs for ADA and token, the token given by its hex encoded asset name.
     """
     encoded_address = Address.encode(address)
     if preselected_utxos:
         utxos = preselected_utxos
     else:
-        utxos = CONTEXT.utxos(address)
+        utxos = get_utxo_cache().utxos(address)
     request = [
         TransactionOutput.from_primitive(
             [
@@ -99,7 +125,7 @@ def select_utxos_multi_asset(
                     ada_amount,
                     {
                         bytes.fromhex(f"{policy_id}"): {
-                            bytes(token_name, "utf-8"): token_amount
+                            bytes.fromhex(hexname): token_amount
                         }
                     },
                 ],
@@ -107,7 +133,23 @@ def select_utxos_multi_asset(
         )
     ]
     selector = LargestFirstSelector()
-    selected, change = selector.select(utxos, request, CONTEXT)
+    selected, change = selector.select(utxos, request, get_chain_context())
+    return selected, change
+
+
+def select_utxos_value(
+    address: Address, value: Value, preselected_utxos: Optional[List] = None
+):
+    """
+    Select UTXOs for an arbitrary value of ADA and tokens.
+    """
+    if preselected_utxos:
+        utxos = preselected_utxos
+    else:
+        utxos = get_utxo_cache().utxos(address)
+    request = [TransactionOutput(address, value)]
+    selector = LargestFirstSelector()
+    selected, change = selector.select(utxos, request, get_chain_context())
     return selected, change
 
 
@@ -118,6 +160,32 @@ def get_script(name) -> PlutusV2Script:
     return contract
 
 
+def add_wallet_inputs(builder: TransactionBuilder, address: Address, selected_utxos):
+    """
+    Add the selected UTxOs as inputs and the remaining cached UTxOs of the
+    wallet as potential inputs, so the builder never queries the chain for them.
+    """
+    for utxo in selected_utxos:
+        builder.add_input(utxo)
+    builder.potential_inputs.extend(
+        remove_used_utxos(get_utxo_cache().utxos(address), selected_utxos)
+    )
+
+
+def remaining_utxos(
+    address: Address, preselected_utxos: Optional[List], used_utxos: List
+) -> Optional[List]:
+    """
+    Return the UTxOs left for the next transaction of the cycle, including the
+    change of the transactions just submitted.
+    """
+    if not preselected_utxos:
+        return None
+    if DISABLE_TX:
+        return remove_used_utxos(preselected_utxos, used_utxos)
+    return get_utxo_cache().utxos(address)
+
+
 def remove_used_utxos(original_utxos, used_utxos):
     """Remove used UTXOs from the original list."""
     used_utxo_ids = {(utxo.input.transaction_id, utxo.input.index) for utxo in used_utxos}
@@ -126,3 +194,19 @@ def remove_used_utxos(original_utxos, used_utxos):
         if (utxo.input.transaction_id, utxo.input.index) not in used_utxo_ids
     ]
     return updated_utxos
+
+
+def submit_tx(signed_tx: Transaction, address: Address, test_tx_hash: str) -> str:
+    """
+    Submit the transaction and register it as pending in the UTxO cache.
+    """
+    if DISABLE_TX:
+        return test_tx_hash
+    try:
+        tx_hash = get_chain_context().submit_tx(signed_tx)
+    except Exception:
+        get_utxo_cache().invalidate(address)
+        raise
+    get_utxo_cache().record_tx(address, signed_tx)
+    # Not every backend returns the hash of the submitted transaction
+    return tx_hash or str(signed_tx.id)
@@ -1,5 +1,5 @@
 import yaml
-from typing import Tuple, Dict 
+from typing import Tuple, Dict, Iterable, Optional
 
 from pycardano import (
     PaymentVerificationKey,
@@ -13,9 +13,9 @@ from configs.config import (
     STRATEGY_FILE,
     KEY_PREFIX,
     ORDER_TRACKING_DIR,
-    CONTEXT,
 )
 
+from bot.chain_context import get_chain_context
 from bot.utils.gen_wallet import create_signing_key
 
 from bot.utils.logger import get_logger, log_exception
@@ -122,17 +122,15 @@ def check_wallets(tokens):
 
 def get_current_block_height():
     try:
-        latest_block = CONTEXT.api.block_latest()
-        return latest_block.height
+        return get_chain_context().block_height()
     except Exception as e:
         log_exception(logger, "Error getting block height", e)
         return None
 
 
-def get_tx_block_height(txHash: str):
+def get_tx_block_heights(txHashes: Iterable[str]) -> Dict[str, Optional[int]]:
     try:
-        tx_info = CONTEXT.api.transaction(txHash)
-        return tx_info.block_height
+        return get_chain_context().tx_block_heights(txHashes)
     except Exception as e:
         log_exception(logger, "Error getting transaction info", e)
-        return None
+        return {}
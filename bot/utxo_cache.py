@@ -0,0 +1,188 @@
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from pycardano import Address, Transaction, TransactionId, TransactionInput, UTxO
+
+from bot.utils.logger import get_logger
+from bot.chain_context import get_chain_context
+from configs.config import PENDING_TX_TIMEOUT
+
+logger = get_logger(__name__)
+
+UTxOKey = Tuple[TransactionId, int]
+
+
+def utxo_key(utxo: UTxO) -> UTxOKey:
+    """
+    Return the (transaction id, index) pair identifying the UTxO.
+    """
+    return utxo.input.transaction_id, utxo.input.index
+
+
+class PendingTx:
+    """
+    A transaction submitted by the bot that is not confirmed yet.
+
+    Its inputs and the outputs paid back to the wallet are taken from the
+    signed transaction body.
+    """
+
+    __slots__ = ("tx_id", "spent", "outputs", "submitted_at")
+
+    def __init__(self, tx: Transaction, address: Address):
+        self.tx_id = tx.id
+        self.spent: Set[UTxOKey] = {
+            (tx_in.transaction_id, tx_in.index) for tx_in in tx.transaction_body.inputs
+        }
+        # Outputs paid back to our own wallet, i.e. change and canceled funds
+        self.outputs: List[UTxO] = [
+            UTxO(TransactionInput(self.tx_id, index), output)
+            for index, output in enumerate(tx.transaction_body.outputs)
+            if output.address == address
+        ]
+        self.submitted_at = time.time()
+
+
+class AddressUTxOs:
+    """
+    Cached UTxO view of a single wallet.
+    """
+
+    __slots__ = ("cycle", "onchain", "pending", "lock")
+
+    def __init__(self):
+        self.cycle: Optional[int] = None
+        self.onchain: List[UTxO] = []
+        self.pending: Dict[TransactionId, PendingTx] = {}
+        self.lock = threading.Lock()
+
+    def spent(self) -> Set[UTxOKey]:
+        return set().union(*(tx.spent for tx in self.pending.values()))
+
+    def pending_outputs(self) -> List[UTxO]:
+        return [utxo for tx in self.pending.values() for utxo in tx.outputs]
+
+    def drop_pending(self, tx_id: TransactionId):
+        """
+        Drop a pending transaction and every pending transaction chained on it.
+        """
+        dropped = [self.pending.pop(tx_id)]
+        while dropped:
+            output_keys = {utxo_key(utxo) for utxo in dropped.pop().outputs}
+            for child_id, child in list(self.pending.items()):
+                if child.spent & output_keys:
+                    logger.warning(f"Dropping pending tx {child_id} chained on {tx_id}.")
+                    dropped.append(self.pending.pop(child_id))
+
+
+class UTxOCache:
+    """
+    Per-wallet, mempool-aware UTxO ledger that queries the chain at most once
+    per cycle.
+
+    UTxOs spent by the bot's own pending transactions are hidden until the
+    chain catches up, so inventory and transaction building in the same or a
+    later cycle never see (and double spend) inputs that are already used.
+    Outputs that pending transactions pay back to the wallet (change and
+    canceled funds) are spendable right away, so several transactions can be
+    chained within one cycle without waiting for confirmations. A failed
+    submission invalidates the cached chain view, so the next lookup fetches
+    fresh UTxOs.
+    """
+
+    def __init__(self):
+        self.cycle = 0
+        self._addresses: Dict[str, AddressUTxOs] = {}
+        self._addresses_lock = threading.Lock()
+
+    def new_cycle(self):
+        """
+        Mark all cached chain views as stale.
+        """
+        self.cycle += 1
+
+    def _entry(self, address: Address) -> AddressUTxOs:
+        with self._addresses_lock:
+            return self._addresses.setdefault(str(address), AddressUTxOs())
+
+    def _refresh(self, address: Address, entry: AddressUTxOs):
+        if entry.cycle == self.cycle:
+            return
+        logger.info(f"Querying UTxOs for {address}.")
+        entry.onchain = get_chain_context().utxos(address)
+        entry.cycle = self.cycle
+        onchain_keys = {utxo_key(utxo) for utxo in entry.onchain}
+        # A tx is confirmed if one of its outputs is onchain or was spent by a
+        # confirmed child, or if its inputs are gone. Confirming a child can
+        # confirm its parent, so repeat until nothing changes.
+        confirmed_spent: Set[UTxOKey] = set()
+        changed = True
+        while changed:
+            changed = False
+            pending_keys = {utxo_key(utxo) for utxo in entry.pending_outputs()}
+            for tx_id, tx in list(entry.pending.items()):
+                output_keys = {utxo_key(utxo) for utxo in tx.outputs}
+                confirmed = bool(output_keys & (onchain_keys | confirmed_spent))
+                # Inputs created by other pending txs are not onchain yet either
+                inputs_gone = not (tx.spent & (onchain_keys | pending_keys))
+                if confirmed or inputs_gone:
+                    logger.info(f"Pending tx {tx_id} confirmed.")
+                    del entry.pending[tx_id]
+                    confirmed_spent |= tx.spent
+                    pending_keys -= output_keys
+                    changed = True
+        now = time.time()
+        for tx_id, tx in list(entry.pending.items()):
+            if tx_id not in entry.pending:
+                continue
+            if now - tx.submitted_at > PENDING_TX_TIMEOUT:
+                logger.warning(f"Pending tx {tx_id} timed out, releasing its inputs.")
+                entry.drop_pending(tx_id)
+
+    def utxos(self, address: Address) -> List[UTxO]:
+        """
+        Return the spendable UTxOs of the wallet: confirmed UTxOs not used by a
+        pending transaction, plus unspent outputs of pending transactions.
+        """
+        entry = self._entry(address)
+        with entry.lock:
+            self._refresh(address, entry)
+            spent = entry.spent()
+            return [
+                utxo
+                for utxo in entry.onchain + entry.pending_outputs()
+                if utxo_key(utxo) not in spent
+            ]
+
+    def record_tx(self, address: Address, tx: Transaction):
+        """
+        Register a transaction submitted from the wallet.
+        """
+        entry = self._entry(address)
+        with entry.lock:
+            pending_tx = PendingTx(tx, address)
+            entry.pending[pending_tx.tx_id] = pending_tx
+
+    def invalidate(self, address: Address):
+        """
+        Drop the cached chain view of the wallet, e.g. after a failed submission.
+        """
+        entry = self._entry(address)
+        with entry.lock:
+            entry.cycle = None
+
+
+_utxo_cache: Optional[UTxOCache] = None
+_utxo_cache_lock = threading.Lock()
+
+
+def get_utxo_cache() -> UTxOCache:
+    """
+    Return the shared UTxO cache, creating it on first use.
+    """
+    global _utxo_cache
+    with _utxo_cache_lock:
+        if _utxo_cache is None:
+            _utxo_cache = UTxOCache()
+        return _utxo_cache
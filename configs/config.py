@@ -1,23 +1,29 @@
-from pycardano import Network, BlockFrostChainContext
-
 from pathlib import Path
 
-from configs.secret import blockfrost_project_id, blockfrost_base_url
-
 # STRATEGY
 # STRATEGY_FILE = 'standard_market_making_preprod.yaml'
 STRATEGY_FILE = "standard_market_making_mainnet.yaml"
 
 # NETWORK
 MAINNET = True  # Set to True for mainnet, False for preprod
-NETWORK = Network.MAINNET if MAINNET else Network.TESTNET
 
-# Define the chain context
-CONTEXT = BlockFrostChainContext(blockfrost_project_id, base_url=blockfrost_base_url)
+# CHAIN BACKEND: "blockfrost", "ogmios" (with Kupo) or "simulated" (in-memory ledger)
+CHAIN_BACKEND = "blockfrost"
+OGMIOS_URL = "ws://localhost:1337"
+KUPO_URL = "http://localhost:1442"
+# Simulated ledger: initial funds of each wallet and ex units of each script execution
+SIMULATED_FUNDS_LOVELACE = 100_000_000_000
+SIMULATED_FUNDS_TRADES = 1000  # Token funds as a multiple of the token's amount per trade
+SIMULATED_EX_UNITS = (500_000, 200_000_000)  # (mem, steps)
+CHAIN_TIP_TTL = 20  # Seconds the chain tip is served from memory before it is queried again
+PROTOCOL_PARAMS_TTL = 3600  # Refetch protocol parameters after this many seconds even within an epoch
 
 # ORDER TIMEOUT: Wait if order is not onchain in open order
 ORDER_TIMEOUT = 2  # heigth
 
+# PENDING TX TIMEOUT: Forget own submitted txs that did not reach the chain after this many seconds
+PENDING_TX_TIMEOUT = 600
+
 # LOGGING & DEBUGGING
 LOGS_DIR = Path(__file__).parent.parent.joinpath("logs")
 DEBUG = False  # Set to True for logger debug mode
@@ -25,12 +31,35 @@ DISABLE_TX = False  # Set to True to disable transactions for testing/debugging
 
 # Track newly placed and canceled orders locally to avoid double spending
 ORDER_TRACKING_DIR = Path(__file__).parent.parent.joinpath("orders")
+# STORAGE BACKEND: "json" (files in orders/ and inventory/) or "sqlite" (one database in WAL mode)
+STORAGE_BACKEND = "json"
+SQLITE_DB_FILE = ORDER_TRACKING_DIR.joinpath("bot_state.db")
+# "FULL" fsyncs every commit. "NORMAL" is faster in WAL mode, but the last commits can be lost on power loss
+SQLITE_SYNCHRONOUS = "FULL"
 INVENTORY_DIR = Path(__file__).parent.parent.joinpath("inventory")
+INVENTORY_LOG_FILE = "inventory.jsonl"  # Append-only log of inventory changes
+INVENTORY_LATEST_FILE = "inventory_latest.json"  # Last logged inventory record
 LOCAL_ORDER_TRACKING_FILE = "local_order_tracking.json"
 ONCHAIN_ORDER_TRACKING_FILE = "onchain_order_tracking.json"
+ORDER_HISTORY_FILE = "order_history.jsonl"  # Append-only log of matched/canceled orders
+ORDER_HISTORY_WATERMARK_FILE = "order_history_watermark.json"
+# Refetch matched/canceled orders at least every N loops, even if no open order was closed
+FINALIZED_ORDERS_REFRESH_CYCLES = 12
 
 # WALLET INFO
 KEYS_DIR = Path(__file__).parent.parent.joinpath("keys")
 CONTRACT_DIR = Path(__file__).parent.parent.joinpath("scripts")
 
 KEY_PREFIX = "MuesliMarketMaker-" if MAINNET else "MuesliMarketMaker-Testnet-"
+
+
+def __getattr__(name: str):
+    """
+    Resolve settings that need heavy imports only when they are used, so
+    importing the config stays cheap.
+    """
+    if name == "NETWORK":
+        from pycardano import Network
+
+        return Network.MAINNET if MAINNET else Network.TESTNET
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -32,6 +32,8 @@ METADATA = {
 # TRANSACTION PARAMETERS
 MATCHMAKING_FEE = 950000  # 0.95 ADA
 DEPOSIT = 1700000  # 1.7 ADA
+MAX_ORDERS_PER_TX = 10  # Upper bound of orders placed in one batched transaction
+MAX_CANCELS_PER_TX = 5  # Upper bound of orders canceled in one batched transaction
 
 # MUESLISWAP API ENDPOINTS
 MUESLISWAP_API_URL = (
@@ -47,3 +49,13 @@ ORDER_BOOK_ENDPOINT = "/orderbook"
 PRICE_ENDPOINT = "/price"
 OPEN_POSITIONS_ENDPOINT = "/open-positions"
 ORDERS_ENDPOINT = "/orders/v2"
+
+# HTTP CONNECTION SETTINGS
+HTTP_POOL_SIZE = 16  # Keep-alive connections per host, should cover max_parallel_tokens
+HTTP_TIMEOUT = (3.05, 15)  # (connect, read) timeout in seconds
+HTTP_MAX_RETRIES = 3  # Retries for connection errors and retryable status codes
+HTTP_BACKOFF_FACTOR = 0.5  # Sleep {backoff factor} * 2 ** (retry - 1) seconds between retries
+HTTP_RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# HEALTH MONITOR
+HEALTH_CHECK_INTERVAL = 10  # Seconds between background health checks of the API & onchain services
@@ -1,14 +1,19 @@
+import asyncio
+import signal
+
+from bot.bootstrap import bootstrap
+from bot.key_registry import get_key_registry
 from bot.muesli_bot import MuesliMarketMaker
 from bot.utils.logger import get_logger
-from bot.utils.utils import load_strategy_config, check_wallets, create_local_orders_dir
+from bot.utils.utils import check_wallets, create_local_orders_dir
 
 logger = get_logger(__name__)
 
 def main():
-    logger.info("Starting market-making bot.")
     try:
-        # Load the strategy configuration
-        strategy_config = load_strategy_config()
+        # Configure logging, load the strategy configuration and create the chain context
+        strategy_config = bootstrap()
+        logger.info("Starting market-making bot.")
         if strategy_config is None:
             logger.error("Failed to load strategy configuration.")
             return
@@ -22,8 +27,15 @@ def main():
         # Initialize the bot with the loaded strategy
         bot = MuesliMarketMaker(strategy_config)
 
+        # Reload signing keys and scripts on SIGHUP
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, lambda *_: get_key_registry().reload())
+
         # Start main loop
-        bot.run_main_loop()
+        if strategy_config.get("async_loop", False):
+            asyncio.run(bot.run_main_loop_async())
+        else:
+            bot.run_main_loop()
         
     except Exception as e:
         logger.exception(f"Error in main function: {e}")
@@ -0,0 +1,47 @@
+import json
+
+from bot.inventory_management import InventoryLog
+
+
+def record(timestamp, lovelace):
+    return {"timestamp": timestamp, "address": "addr", "inventory": {"Loveless": lovelace}}
+
+
+def open_log(tmp_path):
+    return InventoryLog(
+        tmp_path / "MILK_inventory.jsonl",
+        tmp_path / "MILK_inventory_latest.json",
+        tmp_path / "MILK_inventory.json",
+    )
+
+
+def test_append_and_read(tmp_path):
+    log = open_log(tmp_path)
+    assert log.latest is None
+    log.append(record("2024-01-01T00:00:00", 1))
+    log.append(record("2024-01-02T00:00:00", 2))
+
+    reopened = open_log(tmp_path)
+    assert reopened.latest == record("2024-01-02T00:00:00", 2)
+    assert [r["inventory"]["Loveless"] for r in reopened.read()] == [1, 2]
+    assert [r["inventory"]["Loveless"] for r in reopened.read("2024-01-02")] == [2]
+
+
+def test_legacy_file_is_migrated_oldest_first(tmp_path):
+    legacy = [record("2024-01-02T00:00:00", 2), record("2024-01-01T00:00:00", 1)]
+    (tmp_path / "MILK_inventory.json").write_text(json.dumps(legacy))
+
+    log = open_log(tmp_path)
+    assert log.latest == legacy[0]
+    assert list(log.read()) == legacy[::-1]
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_interrupted_migration_is_redone(tmp_path):
+    legacy = [record("2024-01-01T00:00:00", 1)]
+    (tmp_path / "MILK_inventory.json").write_text(json.dumps(legacy))
+    # A crash during the migration leaves only the temporary file behind
+    (tmp_path / "MILK_inventory.jsonl.tmp").write_text('{"timestamp": "2024-01-')
+
+    log = open_log(tmp_path)
+    assert list(log.read()) == legacy
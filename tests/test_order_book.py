@@ -0,0 +1,150 @@
+import numpy as np
+
+from bot.order_book import (
+    OrderBook,
+    OrderBookEventStream,
+    OrderBookSide,
+    diff_sides,
+    order_book_price,
+    own_level_events,
+)
+
+POLICY = "afbe91c0b44b3040e360057bf8354ead8c49c4979ae6ab7c4fbdc9eb"
+HEXNAME = "4d494c4b7632"
+
+
+def entries(*levels):
+    return [{"price": price, "amount": amount} for price, amount in levels]
+
+
+def token(amount):
+    return {"address": {"policyId": POLICY, "name": HEXNAME}, "amount": amount}
+
+
+def ada():
+    return {"address": {"policyId": "", "name": ""}}
+
+
+def buy_order(lovelace, tokens):
+    return {
+        "fromToken": ada(),
+        "toToken": token(tokens),
+        "fromAmount": str(lovelace),
+        "toAmount": str(tokens),
+    }
+
+
+def sell_order(tokens, lovelace):
+    return {
+        "fromToken": token(tokens),
+        "toToken": ada(),
+        "fromAmount": str(tokens),
+        "toAmount": str(lovelace),
+    }
+
+
+def test_levels_are_merged_and_sorted_best_first():
+    bids = OrderBookSide.from_orders(
+        "Buy", entries((0.2, 10), (0.3, 5), (0.2, 7), (0.25, 1))
+    )
+    asks = OrderBookSide.from_orders("Sell", entries((0.5, 3), (0.4, 2)))
+    assert bids.prices.tolist() == [300000, 250000, 200000]
+    assert bids.amounts.tolist() == [5, 1, 17]
+    assert bids.cumulative.tolist() == [5, 6, 23]
+    assert asks.prices.tolist() == [400000, 500000]
+    assert bids.best() == 300000 and asks.best() == 400000
+
+
+def test_empty_side():
+    side = OrderBookSide.from_orders("Sell", [])
+    assert len(side) == 0
+    assert side.best() is None
+    assert side.depth(0.1) == 0
+    assert side.vwap(1) is None
+    assert side.level_index(100) is None
+
+
+def test_depth_and_vwap():
+    asks = OrderBookSide.from_orders("Sell", entries((1.0, 10), (1.02, 10), (1.1, 10)))
+    assert asks.depth(0.05) == 20
+    assert asks.depth(0.2) == 30
+    # 10 at 1.00 ADA and 5 at 1.02 ADA
+    assert np.isclose(asks.vwap(15), (10 * 1_000_000 + 5 * 1_020_000) / 15)
+    assert asks.vwap(31) is None
+
+
+def test_order_book_price_of_a_non_6_decimal_token():
+    # 0 decimals: 10 tokens for 5 ADA are 0.5 ADA per token
+    assert order_book_price(sell_order(10, 5_000_000), 0) == 500_000
+    # 8 decimals: 1 ADA for 3.0003 tokens
+    assert order_book_price(buy_order(1_000_000, 300_030_003), 8) == 333_300
+
+
+def test_own_amounts_of_a_non_6_decimal_token():
+    asks = OrderBookSide.from_orders("Sell", entries((0.4, 20), (0.5, 30)))
+    own = [sell_order(10, 5_000_000), sell_order(4, 1_600_000)]
+    assert asks.own_amounts(own, 0).tolist() == [4, 10]
+    assert np.allclose(asks.own_share(own, 0), [0.2, 1 / 3])
+
+
+def test_own_amounts_tolerate_off_by_one_rounding():
+    bids = OrderBookSide.from_orders("Buy", entries((0.3333, 500_000_000), (0.3, 1)))
+    # One lovelace above the level the API lists it under
+    own = [buy_order(1_000_000, 300_029_103)]
+    assert order_book_price(own[0], 8) == 333_301
+    assert bids.own_amounts(own, 8).tolist() == [300_029_103, 0]
+    # More than one lovelace away from any level
+    far = [buy_order(1_000_000, 300_047_000)]
+    assert order_book_price(far[0], 8) == 333_281
+    assert bids.own_amounts(far, 8).tolist() == [0, 0]
+
+
+def test_own_amounts_ignore_the_other_side():
+    bids = OrderBookSide.from_orders("Buy", entries((0.5, 10)))
+    assert bids.own_amounts([sell_order(10, 5_000_000)], 0).tolist() == [0]
+
+
+def summary(events):
+    return sorted((e.kind, e.price, e.amount, e.delta) for e in events)
+
+
+def test_diff_sides_reports_added_removed_and_changed_levels():
+    old = OrderBookSide.from_orders("Buy", entries((0.3, 5), (0.2, 10), (0.1, 1)))
+    new = OrderBookSide.from_orders("Buy", entries((0.3, 5), (0.2, 4), (0.25, 2)))
+    assert summary(diff_sides(old, new)) == [
+        ("added", 250000, 2, 2),
+        ("changed", 200000, 4, -6),
+        ("removed", 100000, 0, -1),
+    ]
+    assert diff_sides(new, new) == []
+
+
+def test_own_level_events_only_keep_shrinking_own_levels():
+    old = OrderBookSide.from_orders("Sell", entries((0.4, 20), (0.5, 30), (0.6, 5)))
+    new = OrderBookSide.from_orders("Sell", entries((0.4, 14), (0.5, 40), (0.7, 1)))
+    events = diff_sides(old, new)
+    own = [sell_order(10, 4_000_000), sell_order(10, 5_000_000), sell_order(1, 700_000)]
+    # 0.5 grew and 0.7 was added, only the 0.4 level lost volume
+    assert summary(own_level_events(events, own, 0)) == [("changed", 400000, 14, -6)]
+
+
+def test_event_stream_publishes_to_subscribers_and_buffers():
+    stream = OrderBookEventStream(maxlen=2)
+    received = []
+    stream.subscribe(received.extend)
+    side = OrderBookSide.from_orders("Buy", entries((0.1, 1), (0.2, 1), (0.3, 1)))
+    events = diff_sides(OrderBookSide.from_orders("Buy", []), side)
+    stream.publish(events)
+    stream.publish([])
+    assert received == events
+    assert stream.drain() == events[-2:]
+    assert stream.drain() == []
+
+
+def test_order_book_update_side_publishes_the_diff():
+    book = OrderBook()
+    assert len(book.update_side("Sell", entries((0.5, 3)))) == 1
+    assert book.update_side("Sell", entries((0.5, 3))) == []
+    book.update_side("Buy", entries((0.3, 1)))
+    assert book.mid_price() == 400000
+    assert [e.side for e in book.events.drain()] == ["Sell", "Buy"]
@@ -0,0 +1,92 @@
+import bot.order_history as order_history
+from bot.order_history import FinalizedOrderStore, OrderHistoryService
+
+
+def order(tx_hash, finalized_at=None):
+    return {
+        "txHash": tx_hash,
+        "fromToken": {"address": {"policyId": "", "name": ""}},
+        "fromAmount": "1000000",
+        "toToken": {"address": {"policyId": "aa", "name": "bb"}},
+        "toAmount": "10",
+        "attachedLvl": "2500000",
+        "placedAt": 1,
+        "finalizedAt": finalized_at,
+    }
+
+
+def open_store(tmp_path):
+    return FinalizedOrderStore(tmp_path / "MILK_history.jsonl", tmp_path / "MILK_wm.json")
+
+
+def test_watermark_is_rebuilt_from_the_log(tmp_path):
+    open_store(tmp_path).append({"matched": [order("a", 10), order("b", 20)]})
+    (tmp_path / "MILK_wm.json").write_text('{"finalizedAt": 2')
+
+    store = open_store(tmp_path)
+    assert store.watermark == 20 and store.watermark_tx_hashes == {"b"}
+    assert store.append({"matched": [order("b", 20)]}) == {"matched": []}
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_records_appended_twice_are_read_once(tmp_path):
+    orders = {"matched": [order("a", 10)], "canceled": [order("b", 20)]}
+    open_store(tmp_path).append(orders)
+    # Crash after the log append, before the sidecar write
+    (tmp_path / "MILK_wm.json").unlink()
+    with open(tmp_path / "MILK_history.jsonl") as file:
+        lines = file.read()
+    with open(tmp_path / "MILK_history.jsonl", "a") as file:
+        file.write(lines)
+
+    records = list(open_store(tmp_path).read())
+    assert [(r["txHash"], r["status"]) for r in records] == [("a", "matched"), ("b", "canceled")]
+
+
+class StubOrders:
+    def __init__(self, monkeypatch):
+        self.results = {}
+        self.calls = []
+        monkeypatch.setattr(order_history, "get_orders", self.get_orders)
+
+    def get_orders(self, stake_key_hash, status, **kwargs):
+        self.calls.append(status)
+        return self.results[status]
+
+
+def test_failed_finalized_fetch_is_carried_over_and_retried(monkeypatch):
+    stub = StubOrders(monkeypatch)
+    service = OrderHistoryService()
+    stub.results = {"open": [order("a")], "matched": [order("m", 1)], "canceled": []}
+    first = service._fetch("skh", None)
+    assert first.finalized_cycle == 0
+
+    # "a" was closed, but the matched fetch fails
+    service.new_cycle()
+    stub.results = {"open": [], "matched": None, "canceled": []}
+    failed = service._fetch("skh", first)
+    assert failed.finalized_cycle is None
+    assert failed.by_status["matched"] == first.by_status["matched"]
+
+    # Nothing else closed, the fetch is still retried
+    service.new_cycle()
+    stub.calls.clear()
+    stub.results = {"open": [], "matched": [order("m", 1), order("a", 2)], "canceled": []}
+    retried = service._fetch("skh", failed)
+    assert sorted(stub.calls) == ["canceled", "matched", "open"]
+    assert retried.finalized_cycle == 2
+    assert len(retried.by_status["matched"]) == 2
+
+
+def test_failed_open_fetch_keeps_the_previous_open_orders(monkeypatch):
+    stub = StubOrders(monkeypatch)
+    service = OrderHistoryService()
+    stub.results = {"open": [order("a")], "matched": [], "canceled": []}
+    first = service._fetch("skh", None)
+
+    service.new_cycle()
+    stub.calls.clear()
+    stub.results = {"open": None, "matched": [], "canceled": []}
+    snapshot = service._fetch("skh", first)
+    assert snapshot.open_tx_hashes == {"a"}
+    assert stub.calls == ["open"]
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+import bot.order_management as order_management
+from bot.order_management import OrderTrackingStore
+
+EMPTY = {"buy_orders": {}, "sell_orders": {}, "canceled_orders": {}}
+
+
+def test_missing_file_loads_empty_tracking(tmp_path):
+    store = OrderTrackingStore(tmp_path / "MILK_tracking.json", "MILK")
+    assert store.load() == EMPTY
+
+
+def test_missing_sections_are_initialized(tmp_path):
+    path = tmp_path / "MILK_tracking.json"
+    path.write_text(json.dumps({"buy_orders": {"a": {}}}))
+    assert OrderTrackingStore(path, "MILK").load() == {**EMPTY, "buy_orders": {"a": {}}}
+
+
+def test_flush_writes_only_when_dirty(tmp_path):
+    path = tmp_path / "MILK_tracking.json"
+    store = OrderTrackingStore(path, "MILK")
+    order_tracking = store.load()
+    store.flush(order_tracking)
+    assert not path.exists()
+
+    order_tracking["sell_orders"]["b#1"] = {"toAmount": "2"}
+    store.mark_dirty()
+    store.flush(order_tracking)
+    assert not store.dirty
+    assert OrderTrackingStore(path, "MILK").load() == order_tracking
+    assert not list(tmp_path.glob("*.tmp"))
+
+    # Changes that were not marked are only written with the next marked flush
+    order_tracking["buy_orders"]["a"] = {}
+    store.flush(order_tracking)
+    assert OrderTrackingStore(path, "MILK").load()["buy_orders"] == {}
+
+
+def test_failed_flush_keeps_the_previous_tracking(tmp_path, monkeypatch):
+    path = tmp_path / "MILK_tracking.json"
+    store = OrderTrackingStore(path, "MILK")
+    store.mark_dirty()
+    store.flush(EMPTY)
+
+    def fail(obj, file, **kwargs):
+        file.write('{"buy_orders": {')
+        raise OSError("disk full")
+
+    monkeypatch.setattr(order_management.json, "dump", fail)
+    store.mark_dirty()
+    with pytest.raises(OSError):
+        store.flush({**EMPTY, "buy_orders": {"a": {}}})
+    monkeypatch.undo()
+    assert store.dirty
+    assert json.loads(path.read_text()) == EMPTY
@@ -0,0 +1,31 @@
+from types import SimpleNamespace
+
+import bot.price as price
+from bot.token_state import TokenState
+
+RESPONSE = {"quoteDecimalPlaces": 6, "askPrice": 0.3, "bidPrice": 0.2, "price": 0.25}
+
+
+def make_bot():
+    state = TokenState("MILK", {}, None, None, None)
+    return SimpleNamespace(
+        token_states={"MILK": state}, order_history=SimpleNamespace(cycle=1)
+    )
+
+
+def test_price_is_fetched_once_per_cycle(monkeypatch):
+    queries = []
+    monkeypatch.setattr(
+        price, "query_price_endpoint", lambda *args: queries.append(args) or RESPONSE
+    )
+    bot = make_bot()
+
+    # Prefetched by the async data collection, reused by the strategy
+    price.fetch_price(bot, "MILK", "policy", "hexname")
+    price.fetch_price_if_stale(bot, "MILK", "policy", "hexname")
+    assert len(queries) == 1
+    assert bot.token_states["MILK"].price_data["price"] == 250000
+
+    bot.order_history.cycle += 1
+    price.fetch_price_if_stale(bot, "MILK", "policy", "hexname")
+    assert len(queries) == 2
@@ -0,0 +1,108 @@
+from bot.order_history import OrderSnapshot
+from bot.reconciliation import reconcile_orders
+from bot.utils.order_utils import format_order
+
+PAIR = ("aa", "bb")
+
+
+def order(tx_hash, side="buy", output_idx=0, pair=PAIR):
+    ada = {"address": {"policyId": "", "name": ""}}
+    token = {"address": {"policyId": pair[0], "name": pair[1]}}
+    return {
+        "txHash": tx_hash,
+        "outputIdx": output_idx,
+        "fromToken": ada if side == "buy" else token,
+        "toToken": token if side == "buy" else ada,
+        "fromAmount": "1000000",
+        "toAmount": "10",
+        "attachedLvl": "2500000",
+        "placedAt": 1,
+        "finalizedAt": None,
+    }
+
+
+def tracked(tx_height=None):
+    return {"toAmount": "10", "tx_height": tx_height}
+
+
+def tracking(buy=None, sell=None, canceled=None):
+    return {
+        "buy_orders": buy or {},
+        "sell_orders": sell or {},
+        "canceled_orders": canceled or {},
+    }
+
+
+def test_snapshot_indexes_open_orders_by_pair_side_and_key():
+    snapshot = OrderSnapshot(
+        1,
+        1,
+        {
+            "open": [order("a"), order("b", "sell", 2), order("c", pair=("cc", "dd"))],
+            "matched": [order("d")],
+            "canceled": [],
+        },
+    )
+    sides = snapshot.open_orders_by_side(PAIR)
+    assert list(sides["buy"]) == ["a"] and list(sides["sell"]) == ["b#2"]
+    assert snapshot.open_tx_hashes == {"a", "b#2", "c"}
+    assert [o["txHash"] for o in snapshot.orders("matched", PAIR)] == ["d"]
+    assert snapshot.open_orders_by_side(("ee", "ff")) == {"buy": {}, "sell": {}}
+
+
+def test_reconcile_orders():
+    order_tracking = tracking(
+        buy={"open": tracked(5), "gone": tracked(1), "fresh": tracked()},
+        sell={"canceled#1": tracked(5)},
+        canceled={"known": tracked(5)},
+    )
+    open_orders = {
+        "buy": {"open": order("open"), "new": order("new"), "known": order("known")},
+        "sell": {},
+    }
+    heights = []
+
+    def current_height():
+        heights.append(100)
+        return 100
+
+    diff = reconcile_orders(
+        order_tracking,
+        open_orders,
+        {"canceled#1"},
+        {"fresh": 99},
+        current_height,
+        timeout=10,
+    )
+    assert diff.confirmed == {"buy": ["open"], "sell": []}
+    assert diff.expired == {"buy": ["gone"], "sell": []}
+    assert diff.cancelled == {"buy": [], "sell": ["canceled#1"]}
+    # Orders the bot already canceled are not tracked again
+    assert diff.added == {"buy": ["new"], "sell": []}
+    assert diff.changed()
+    assert len(heights) == 1
+
+    assert set(order_tracking["buy_orders"]) == {"open", "fresh", "new"}
+    assert order_tracking["buy_orders"]["fresh"]["tx_height"] == 99
+    assert order_tracking["buy_orders"]["new"] == format_order(order("new"))["new"]
+    assert order_tracking["sell_orders"] == {}
+
+
+def test_reconcile_orders_without_missing_orders_skips_the_tip():
+    order_tracking = tracking(buy={"open": tracked(5)})
+
+    def current_height():
+        raise AssertionError("tip queried")
+
+    diff = reconcile_orders(
+        order_tracking, {"buy": {"open": order("open")}}, set(), {}, current_height, 10
+    )
+    assert not diff.changed()
+    assert order_tracking == tracking(buy={"open": tracked(5)})
+
+
+def test_unknown_heights_never_expire():
+    order_tracking = tracking(buy={"pending": tracked()})
+    diff = reconcile_orders(order_tracking, {}, set(), {"pending": None}, lambda: None, 10)
+    assert not diff.changed()
+    assert list(order_tracking["buy_orders"]) == ["pending"]
@@ -0,0 +1,63 @@
+import pytest
+from pycardano import (
+    Address,
+    ExecutionUnits,
+    Network,
+    PaymentSigningKey,
+    PaymentVerificationKey,
+    PlutusData,
+    PlutusV2Script,
+    Redeemer,
+    RedeemerTag,
+    Transaction,
+    TransactionBody,
+    TransactionFailedException,
+    TransactionOutput,
+    TransactionWitnessSet,
+    Value,
+)
+
+from bot.simulated_ledger import SimulatedChainContext
+from configs.config import SIMULATED_EX_UNITS
+
+ADDRESS = Address(
+    PaymentVerificationKey.from_signing_key(PaymentSigningKey.generate()).hash(),
+    network=Network.TESTNET,
+)
+
+
+def script_tx(inputs) -> Transaction:
+    """A tx spending inputs with a PlutusV2 script and redeemer in its witness set."""
+    body = TransactionBody(
+        inputs=inputs, outputs=[TransactionOutput(ADDRESS, 5_000_000)], fee=200_000
+    )
+    redeemer = Redeemer(PlutusData(), ExecutionUnits(0, 0))
+    redeemer.tag = RedeemerTag.SPEND
+    redeemer.index = 0
+    witness = TransactionWitnessSet(
+        plutus_v2_script=[PlutusV2Script(b"\x49\x48\x01\x00\x00\x22\x20\x01\x01")],
+        redeemer=[redeemer],
+    )
+    return Transaction(body, witness)
+
+
+def test_submit_applies_script_tx():
+    context = SimulatedChainContext(Network.TESTNET)
+    funds = context.fund(ADDRESS, Value(10_000_000))
+    tx = script_tx([funds.input])
+
+    assert context.submit_tx(tx) == str(tx.id)
+    assert [utxo.input.transaction_id for utxo in context.utxos(ADDRESS)] == [tx.id]
+    assert context.tx_block_height(str(tx.id)) is not None
+
+    # The input is spent now
+    with pytest.raises(TransactionFailedException):
+        context.submit_tx(tx)
+
+
+def test_evaluate_script_tx():
+    context = SimulatedChainContext(Network.TESTNET)
+    funds = context.fund(ADDRESS, Value(10_000_000))
+    assert context.evaluate_tx(script_tx([funds.input])) == {
+        "spend:0": ExecutionUnits(*SIMULATED_EX_UNITS)
+    }
@@ -0,0 +1,153 @@
+import json
+from functools import partial
+
+from bot.inventory_management import InventoryLog
+from bot.order_history import FinalizedOrderStore
+from bot.order_management import OrderTrackingStore
+from bot.sqlite_store import (
+    SqliteFinalizedOrderStore,
+    SqliteInventoryLog,
+    SqliteOrderTrackingStore,
+    SqliteStore,
+)
+
+
+def order(tx_hash, finalized_at, output_idx=0):
+    return {
+        "txHash": tx_hash,
+        "outputIdx": output_idx,
+        "fromToken": {"address": {"policyId": "", "name": ""}},
+        "fromAmount": "1000000",
+        "toToken": {"address": {"policyId": "aa", "name": "bb"}},
+        "toAmount": "10",
+        "attachedLvl": "2500000",
+        "placedAt": 1,
+        "finalizedAt": finalized_at,
+    }
+
+
+def tracking(buy=None, sell=None, canceled=None):
+    return {
+        "buy_orders": buy or {},
+        "sell_orders": sell or {},
+        "canceled_orders": canceled or {},
+    }
+
+
+def test_tracking_flush_only_writes_changes(tmp_path):
+    store = SqliteStore(tmp_path / "bot.db")
+    tracking_store = SqliteOrderTrackingStore(store, "MILK")
+    order_tracking = tracking_store.load()
+    assert order_tracking == tracking()
+
+    order_tracking["buy_orders"]["a"] = {"toAmount": "1"}
+    order_tracking["sell_orders"]["b#1"] = {"toAmount": "2"}
+    tracking_store.mark_dirty()
+    tracking_store.flush(order_tracking)
+
+    del order_tracking["buy_orders"]["a"]
+    order_tracking["canceled_orders"]["a"] = {"toAmount": "1"}
+    tracking_store.mark_dirty()
+    tracking_store.flush(order_tracking)
+
+    reloaded = SqliteOrderTrackingStore(store, "MILK").load()
+    assert reloaded == tracking(
+        sell={"b#1": {"toAmount": "2"}}, canceled={"a": {"toAmount": "1"}}
+    )
+    assert [status for _, status, _ in store.find_order("b")] == ["sell"]
+
+
+def test_tracking_imports_json_file_once(tmp_path):
+    path = tmp_path / "MILK_tracking.json"
+    path.write_text(json.dumps(tracking(buy={"a": {"toAmount": "1"}})))
+    store = SqliteStore(tmp_path / "bot.db")
+    legacy_store = partial(OrderTrackingStore, path, "MILK")
+
+    tracking_store = SqliteOrderTrackingStore(store, "MILK", legacy_store=legacy_store)
+    order_tracking = tracking_store.load()
+    assert order_tracking == tracking(buy={"a": {"toAmount": "1"}})
+    assert tracking_store.dirty
+    # The import is only recorded once the tracking is flushed
+    assert not store.is_migrated("MILK", "json_order_tracking")
+    tracking_store.flush(order_tracking)
+    assert store.is_migrated("MILK", "json_order_tracking")
+
+    # Once emptied, the stale JSON orders are not imported again
+    del order_tracking["buy_orders"]["a"]
+    tracking_store.mark_dirty()
+    tracking_store.flush(order_tracking)
+
+    def fail():
+        raise AssertionError("legacy store opened")
+
+    reopened = SqliteOrderTrackingStore(store, "MILK", legacy_store=fail)
+    assert reopened.load() == tracking()
+    assert not reopened.dirty
+
+
+def test_finalized_orders_import_history_and_dedup(tmp_path):
+    legacy = FinalizedOrderStore(tmp_path / "MILK_history.jsonl", tmp_path / "MILK_wm.json")
+    legacy.append({"matched": [order("a", 10)], "canceled": [order("b", 20)]})
+    store = SqliteStore(tmp_path / "bot.db")
+
+    finalized = SqliteFinalizedOrderStore(store, "MILK", legacy_store=lambda: legacy)
+    assert [record["txHash"] for record in finalized.read()] == ["a", "b"]
+    assert finalized.watermark == 20
+    assert finalized.watermark_tx_hashes == {"b"}
+
+    new = finalized.append({"matched": [order("b", 20), order("c", 20, 1)]})
+    assert [o["txHash"] for o in new["matched"]] == ["c"]
+    assert finalized.watermark_tx_hashes == {"b", "c#1"}
+
+    # Reopening does not import the history again
+    reopened = SqliteFinalizedOrderStore(store, "MILK", legacy_store=lambda: legacy)
+    assert len(list(reopened.read())) == 3
+    assert reopened.watermark == 20
+
+
+def test_inventory_imports_jsonl_log(tmp_path):
+    legacy = InventoryLog(tmp_path / "MILK_inventory.jsonl", tmp_path / "MILK_latest.json")
+    records = [
+        {"timestamp": f"2024-01-0{day}T00:00:00", "address": "addr", "inventory": {"Loveless": day}}
+        for day in (1, 2)
+    ]
+    for record in records:
+        legacy.append(record)
+    store = SqliteStore(tmp_path / "bot.db")
+
+    inventory_log = SqliteInventoryLog(store, "MILK", legacy_log=lambda: legacy)
+    assert inventory_log.latest == records[-1]
+    assert list(inventory_log.read()) == records
+    assert list(inventory_log.read("2024-01-02")) == records[1:]
+
+    assert len(list(SqliteInventoryLog(store, "MILK", legacy_log=lambda: legacy).read())) == 2
+    assert list(SqliteInventoryLog(store, "OTHER").read()) == []
+
+
+def test_empty_legacy_files_are_only_checked_once(tmp_path):
+    store = SqliteStore(tmp_path / "bot.db")
+    opened = []
+
+    def legacy_log():
+        opened.append(True)
+        return InventoryLog(tmp_path / "MILK_inventory.jsonl", tmp_path / "MILK_latest.json")
+
+    SqliteInventoryLog(store, "MILK", legacy_log=legacy_log)
+    inventory_log = SqliteInventoryLog(store, "MILK", legacy_log=legacy_log)
+    assert inventory_log.latest is None
+    assert len(opened) == 1
+    assert store.execute("PRAGMA synchronous") == [(2,)]
+
+
+def test_tracked_orders_indexed_by_status_and_time(tmp_path):
+    store = SqliteStore(tmp_path / "bot.db")
+    columns = [
+        row[2] for row in store.execute("PRAGMA index_info(tracked_orders_status)")
+    ]
+    assert columns == ["token", "status", "updated_at"]
+    plan = store.execute(
+        "EXPLAIN QUERY PLAN SELECT order_key FROM tracked_orders "
+        "WHERE token = ? AND status = ? AND updated_at < ?",
+        ("MILK", "buy", 0),
+    )
+    assert "tracked_orders_status" in plan[0][-1]
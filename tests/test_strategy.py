@@ -0,0 +1,114 @@
+from types import SimpleNamespace
+
+from pycardano import InvalidTransactionException
+
+import bot.strategy as strategy_module
+from bot.strategy import StandardMarketMakingStrategy
+from bot.transactions import TransactionTooLargeException
+
+CONFIG = {"name": "standard_market_making", "n_orders": 2, "delta": 0.05}
+
+
+def run_batches(items, batch_size, fail):
+    """Submit items, failing every batch for which fail(batch) returns an exception."""
+    submitted = []
+
+    def submit(batch, utxos):
+        error = fail(batch)
+        if error:
+            raise error
+        submitted.append(list(batch))
+        return utxos
+
+    strategy = StandardMarketMakingStrategy(CONFIG)
+    strategy.submit_batches(items, batch_size, submit, [])
+    return submitted
+
+
+def test_batches_are_halved_when_too_large():
+    too_large = TransactionTooLargeException("Transaction exceeds the max execution units")
+    submitted = run_batches(
+        list(range(5)), 4, lambda batch: too_large if len(batch) > 2 else None
+    )
+    assert submitted == [[0, 1], [2, 3], [4]]
+
+
+def test_batches_are_halved_when_over_max_tx_size():
+    # Raised by pycardano's builder itself
+    too_large = InvalidTransactionException(
+        "Transaction size (17000) exceeds the max limit (16384)."
+    )
+    submitted = run_batches(
+        list(range(4)), 4, lambda batch: too_large if len(batch) > 1 else None
+    )
+    assert submitted == [[0], [1], [2], [3]]
+
+
+def test_other_invalid_transactions_stop_the_submission():
+    calls = []
+
+    def fail(batch):
+        calls.append(batch)
+        return InvalidTransactionException("The input UTxOs cannot cover the outputs")
+
+    assert run_batches(list(range(8)), 4, fail) == []
+    assert len(calls) == 1
+
+
+def test_execute_sequential_cancels_then_places_alternating(monkeypatch):
+    calls = []
+
+    def cancel_order(order, address, key_path, utxos, order_tracking):
+        calls.append(("cancel", order["txHash"]))
+        return {order["txHash"]: {}}, utxos
+
+    def placer(side):
+        def place(token_name, policy_id, hexname, address, amount, decimals, price, key_path, utxos):
+            calls.append((side, price))
+            return {f"{side}{price}": {}}, utxos
+
+        return place
+
+    monkeypatch.setattr(strategy_module, "cancel_order", cancel_order)
+    monkeypatch.setattr(strategy_module, "place_buy_order", placer("buy"))
+    monkeypatch.setattr(strategy_module, "place_sell_order", placer("sell"))
+    monkeypatch.setattr(strategy_module, "save_order_tracking", lambda bot, token: None)
+
+    # A buy order at 0.5 ADA, far from the mid price of 1 ADA
+    stale = {
+        "txHash": "stale",
+        "fromToken": {"address": {"policyId": "", "name": ""}},
+        "toToken": {"address": {"policyId": "aa", "name": "bb"}},
+        "fromAmount": "5000000",
+        "toAmount": "10",
+    }
+    state = SimpleNamespace(
+        open_orders=[stale],
+        order_tracking={
+            "buy_orders": {"stale": {}},
+            "sell_orders": {},
+            "canceled_orders": {},
+        },
+    )
+    bot = SimpleNamespace(
+        token_states={"MILK": state},
+        health_monitor=SimpleNamespace(is_healthy=lambda: True),
+    )
+    strategy = StandardMarketMakingStrategy({**CONFIG, "order_refresh_threshold": 0.2})
+    strategy.update_mid_price(1_000_000)
+    token_info = {"policy_id": "aa", "hexname": "bb", "amount": 1, "decimals": 0}
+
+    strategy.execute_sequential(
+        bot, "MILK", token_info, None, None,
+        [-1, 900_000, 850_000], [1_100_000, 1_150_000, 1_200_000], [],
+    )
+    # A non-positive price only skips its own side, the limit of 2 orders per
+    # side is reached after the second sell
+    assert calls == [
+        ("cancel", "stale"),
+        ("sell", 1_100_000),
+        ("buy", 900_000),
+        ("sell", 1_150_000),
+        ("buy", 850_000),
+    ]
+    assert "stale" in state.order_tracking["canceled_orders"]
@@ -0,0 +1,17 @@
+import subprocess
+import sys
+from pathlib import Path
+
+
+def test_import_does_not_load_pycardano_or_numpy():
+    code = (
+        "import sys, bot.token_state; "
+        "print(sorted(m for m in ('pycardano', 'numpy') if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).resolve().parents[1],
+    )
+    assert result.stdout.strip() == "[]"
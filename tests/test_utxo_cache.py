@@ -0,0 +1,184 @@
+import pytest
+from pycardano import (
+    Address,
+    Network,
+    PaymentSigningKey,
+    PaymentVerificationKey,
+    Transaction,
+    TransactionBody,
+    TransactionId,
+    TransactionInput,
+    TransactionOutput,
+    TransactionWitnessSet,
+    UTxO,
+)
+
+import bot.utils.transaction_utils as transaction_utils
+import bot.utxo_cache as utxo_cache
+from bot.utxo_cache import UTxOCache, utxo_key
+
+ADDRESS = Address(
+    PaymentVerificationKey.from_signing_key(PaymentSigningKey.generate()).hash(),
+    network=Network.TESTNET,
+)
+
+
+class StubChain:
+    def __init__(self):
+        self.onchain = []
+        self.queries = 0
+        self.submit_error = None
+
+    def utxos(self, address):
+        self.queries += 1
+        return list(self.onchain)
+
+    def submit_tx(self, tx):
+        if self.submit_error:
+            raise self.submit_error
+
+
+@pytest.fixture
+def chain(monkeypatch):
+    stub = StubChain()
+    monkeypatch.setattr(utxo_cache, "get_chain_context", lambda: stub)
+    monkeypatch.setattr(transaction_utils, "get_chain_context", lambda: stub)
+    return stub
+
+
+def wallet_utxo(n: int, amount: int = 10_000_000) -> UTxO:
+    tx_in = TransactionInput(TransactionId(n.to_bytes(32, "big")), 0)
+    return UTxO(tx_in, TransactionOutput(ADDRESS, amount))
+
+
+def spend(inputs, amount: int = 5_000_000) -> Transaction:
+    """A tx spending inputs with one change output back to the wallet."""
+    body = TransactionBody(
+        inputs=[utxo.input for utxo in inputs],
+        outputs=[TransactionOutput(ADDRESS, amount)],
+        fee=200_000,
+    )
+    return Transaction(body, TransactionWitnessSet())
+
+
+def change(tx: Transaction) -> UTxO:
+    return UTxO(TransactionInput(tx.id, 0), tx.transaction_body.outputs[0])
+
+
+def keys(utxos):
+    return {utxo_key(utxo) for utxo in utxos}
+
+
+def test_chain_is_queried_once_per_cycle(chain):
+    chain.onchain = [wallet_utxo(1)]
+    cache = UTxOCache()
+    cache.utxos(ADDRESS)
+    cache.utxos(ADDRESS)
+    assert chain.queries == 1
+    cache.new_cycle()
+    cache.utxos(ADDRESS)
+    assert chain.queries == 2
+
+
+def test_pending_outputs_are_spendable_and_inputs_hidden(chain):
+    funds = wallet_utxo(1)
+    chain.onchain = [funds]
+    cache = UTxOCache()
+    assert keys(cache.utxos(ADDRESS)) == keys([funds])
+
+    tx = spend([funds])
+    cache.record_tx(ADDRESS, tx)
+    assert keys(cache.utxos(ADDRESS)) == keys([change(tx)])
+
+
+def test_chain_of_three_txs_is_confirmed_at_once(chain):
+    funds = wallet_utxo(1)
+    chain.onchain = [funds]
+    cache = UTxOCache()
+    cache.utxos(ADDRESS)
+    tx_a = spend([funds])
+    tx_b = spend([change(tx_a)])
+    tx_c = spend([change(tx_b)])
+    for tx in (tx_a, tx_b, tx_c):
+        cache.record_tx(ADDRESS, tx)
+
+    # All three txs made it onchain, only the change of C is left
+    chain.onchain = [change(tx_c)]
+    cache.new_cycle()
+    assert keys(cache.utxos(ADDRESS)) == keys([change(tx_c)])
+    assert not cache._entry(ADDRESS).pending
+
+
+def test_unconfirmed_tail_of_a_chain_stays_pending(chain):
+    funds = wallet_utxo(1)
+    chain.onchain = [funds]
+    cache = UTxOCache()
+    cache.utxos(ADDRESS)
+    tx_a = spend([funds])
+    tx_b = spend([change(tx_a)])
+    cache.record_tx(ADDRESS, tx_a)
+    cache.record_tx(ADDRESS, tx_b)
+
+    # Only A is onchain so far
+    chain.onchain = [change(tx_a)]
+    cache.new_cycle()
+    assert keys(cache.utxos(ADDRESS)) == keys([change(tx_b)])
+    assert list(cache._entry(ADDRESS).pending) == [tx_b.id]
+
+
+def test_invalidate_refetches_the_chain(chain):
+    funds, more = wallet_utxo(1), wallet_utxo(2)
+    chain.onchain = [funds]
+    cache = UTxOCache()
+    cache.utxos(ADDRESS)
+    chain.onchain = [funds, more]
+    assert keys(cache.utxos(ADDRESS)) == keys([funds])
+    cache.invalidate(ADDRESS)
+    assert keys(cache.utxos(ADDRESS)) == keys([funds, more])
+
+
+def test_tx_with_inputs_gone_is_confirmed(chain):
+    funds, more = wallet_utxo(1), wallet_utxo(2)
+    chain.onchain = [funds, more]
+    cache = UTxOCache()
+    cache.utxos(ADDRESS)
+    cache.record_tx(ADDRESS, spend([funds]))
+
+    # The inputs were spent, but the change was already spent elsewhere
+    chain.onchain = [more]
+    cache.new_cycle()
+    assert keys(cache.utxos(ADDRESS)) == keys([more])
+    assert not cache._entry(ADDRESS).pending
+
+
+def test_timed_out_tx_releases_its_inputs_and_chained_txs(chain, monkeypatch):
+    funds = wallet_utxo(1)
+    chain.onchain = [funds]
+    cache = UTxOCache()
+    cache.utxos(ADDRESS)
+    tx_a = spend([funds])
+    cache.record_tx(ADDRESS, tx_a)
+    cache.record_tx(ADDRESS, spend([change(tx_a)]))
+
+    monkeypatch.setattr(utxo_cache, "PENDING_TX_TIMEOUT", -1)
+    cache.new_cycle()
+    assert keys(cache.utxos(ADDRESS)) == keys([funds])
+    assert not cache._entry(ADDRESS).pending
+
+
+def test_submit_tx_records_or_invalidates(chain, monkeypatch):
+    funds = wallet_utxo(1)
+    chain.onchain = [funds]
+    cache = UTxOCache()
+    monkeypatch.setattr(transaction_utils, "get_utxo_cache", lambda: cache)
+    cache.utxos(ADDRESS)
+
+    tx = spend([funds])
+    assert transaction_utils.submit_tx(tx, ADDRESS, "test") == str(tx.id)
+    assert keys(cache.utxos(ADDRESS)) == keys([change(tx)])
+
+    chain.submit_error = RuntimeError("rejected")
+    with pytest.raises(RuntimeError):
+        transaction_utils.submit_tx(spend([change(tx)]), ADDRESS, "test")
+    cache.utxos(ADDRESS)
+    assert chain.queries == 2